@@ -0,0 +1,228 @@
+# MonitorManager 拓扑切换延迟基准测试
+# 使用模拟后端重复执行 MonitorApp 的各项操作，统计 p50/p95/p99 延迟与外部进程调用次数
+#
+# 用法:
+#   python benchmark.py --iterations 20 --monitors 3 --subprocess-ms 1200 --settle-ms 500
+#   python benchmark.py --mode worker --json bench.json
+#
+# 延迟 = 操作本身 + 等待模拟后端生效 + 刷新显示器信息
+# applies = 实际执行的队列操作数（worker 模式下连续点击会被合并）
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+# 无显示环境下运行（构建机），不影响真实托盘
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('PYSTRAY_BACKEND', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QCoreApplication, QEventLoop
+
+import main
+from monitor_core import SimulatedDisplayBackend
+from monitor_core import metrics
+from monitor_core.metrics import percentile
+
+# worker 模式下的连续点击次数（合并后应最多执行两次）
+BURST_CLICKS = 5
+
+
+def build_operations(app: 'main.MonitorApp', monitor_count: int) -> List[Tuple[str, Callable, tuple]]:
+    """构建待测操作列表: (名称, 函数, 参数)"""
+    operations = []
+    for num in range(1, monitor_count + 1):
+        operations.append((f'single_{num}', app.switch_to_single_display, (num,)))
+    # 单屏之后先恢复扩展，双屏扩展才能选到 1、2 号显示器
+    operations.append(('extend_all', app.run_displayswitch_legacy, ('/extend',)))
+    if monitor_count >= 2:
+        for primary_orientation in main.ORIENTATION_NAMES:
+            for secondary_orientation in main.ORIENTATION_NAMES:
+                operations.append((
+                    f'extend_1_2_o{primary_orientation}{secondary_orientation}',
+                    app.extend_two_monitors_with_orientation,
+                    (1, 2, primary_orientation, secondary_orientation),
+                ))
+    operations.append(('clone', app.run_displayswitch_legacy, ('/clone',)))
+    operations.append(('save_config', app.save_config, ()))
+    operations.append(('load_config', app.load_config, ()))
+    return operations
+
+
+def wait_for_settle(backend: SimulatedDisplayBackend, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while not backend.is_settled() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def run_direct(app: 'main.MonitorApp', func: Callable, args: tuple):
+    """在当前线程直接调用操作函数"""
+    func(*args)
+
+
+def wait_until_interactive(app: 'main.MonitorApp'):
+    """等待后台首次枚举完成并填充控件"""
+    loop = QEventLoop()
+    while app.time_to_interactive is None:
+        loop.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 10)
+
+
+def wait_for_idle(app: 'main.MonitorApp'):
+    """等待执行线程处理完排队的请求（启动后的模式表读取），不计入第一个操作"""
+    loop = QEventLoop()
+    while not app.operation_queue.is_idle():
+        loop.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 10)
+    loop.processEvents()
+
+
+def wait_for_handle(handle):
+    """处理事件直到请求完成，并让 GUI 线程处理完成信号"""
+    loop = QEventLoop()
+    while not handle.done:
+        loop.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 10)
+    loop.processEvents()
+
+
+def run_worker(app: 'main.MonitorApp', func: Callable, args: tuple):
+    """经由操作队列与常驻执行线程执行并等待完成"""
+    wait_for_handle(app.submit_operation(main.TOPOLOGY_OPERATION, func.__name__, func, *args))
+
+
+def run_burst(app: 'main.MonitorApp', monitor_count: int, clicks: int = BURST_CLICKS):
+    """模拟连续快速点击多个单显示器入口，只等待最后一次完成"""
+    handles = []
+    for click in range(clicks):
+        num = click % monitor_count + 1
+        handles.append(app.submit_operation(main.TOPOLOGY_OPERATION, f"仅显示器{num}",
+                                            app.switch_to_single_display, num))
+    wait_for_handle(handles[-1])
+
+
+def run_benchmark(iterations: int, monitor_count: int, api_ms: float, subprocess_ms: float,
+                  settle_ms: float, mode: str, atomic: bool = False) -> Dict[str, Dict]:
+    backend = SimulatedDisplayBackend(
+        monitor_count=monitor_count,
+        api_latency=api_ms / 1000.0,
+        subprocess_latency=subprocess_ms / 1000.0,
+        settle_delay=settle_ms / 1000.0,
+        atomic=atomic,
+    )
+    app = main.MonitorApp(backend)
+    wait_until_interactive(app)
+    wait_for_idle(app)
+    # 每次运行从空的生效历史开始，不读写用户的 settle_history.json
+    app.settle_detector.history_file = None
+    app.settle_detector.history.clear()
+    runner = run_worker if mode == 'worker' else run_direct
+
+    operations = build_operations(app, monitor_count)
+    if mode == 'worker' and monitor_count >= 2:
+        operations.append((f'burst_single_x{BURST_CLICKS}', None, ()))
+
+    samples = {}
+    counters = {}
+    for _ in range(iterations):
+        for name, func, args in operations:
+            backend.reset_stats()
+            executed_before = app.operation_queue.stats['executed']
+            start = time.perf_counter()
+            if func is None:
+                run_burst(app, monitor_count)
+            else:
+                runner(app, func, args)
+            wait_for_settle(backend)
+            app.force_update_display_info()
+            elapsed = (time.perf_counter() - start) * 1000.0
+
+            samples.setdefault(name, []).append(elapsed)
+            totals = counters.setdefault(name, {'subprocess_spawns': 0, 'api_calls': 0, 'applies': 0})
+            totals['subprocess_spawns'] += backend.stats['subprocess_spawns']
+            totals['api_calls'] += backend.stats['api_calls']
+            totals['applies'] += app.operation_queue.stats['executed'] - executed_before
+        QCoreApplication.processEvents()
+    app.executor.shutdown()
+
+    results = {}
+    for name, values in samples.items():
+        count = len(values)
+        results[name] = {
+            'count': count,
+            'p50_ms': percentile(values, 50),
+            'p95_ms': percentile(values, 95),
+            'p99_ms': percentile(values, 99),
+            'mean_ms': sum(values) / count,
+            'subprocess_spawns_per_op': counters[name]['subprocess_spawns'] / count,
+            'api_calls_per_op': counters[name]['api_calls'] / count,
+            'applies_per_op': counters[name]['applies'] / count,
+        }
+    return results
+
+
+def format_report(results: Dict[str, Dict]) -> str:
+    header = (f"{'operation':<22}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+              f"{'mean ms':>10}{'spawns':>8}{'api':>7}{'applies':>9}")
+    lines = [header, '-' * len(header)]
+    for name, r in results.items():
+        lines.append(f"{name:<22}{r['count']:>5}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+                     f"{r['p99_ms']:>10.1f}{r['mean_ms']:>10.1f}"
+                     f"{r['subprocess_spawns_per_op']:>8.1f}{r['api_calls_per_op']:>7.1f}"
+                     f"{r['applies_per_op']:>9.1f}")
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MonitorManager 拓扑切换延迟基准测试")
+    parser.add_argument('--iterations', type=int, default=10, help="每个操作的重复次数")
+    parser.add_argument('--monitors', type=int, default=3, help="模拟显示器数量")
+    parser.add_argument('--api-ms', type=float, default=5.0, help="每次 Win32 API 调用耗时")
+    parser.add_argument('--subprocess-ms', type=float, default=200.0, help="每次外部进程调用耗时")
+    parser.add_argument('--settle-ms', type=float, default=300.0, help="更改生效延迟")
+    parser.add_argument('--mode', choices=['direct', 'worker'], default='direct',
+                        help="direct: 直接调用; worker: 经由工作线程执行")
+    parser.add_argument('--atomic', action='store_true',
+                        help="模拟 CCD 后端: 拓扑切换以单次 SetDisplayConfig 完成")
+    parser.add_argument('--json', dest='json_path', help="将结果写入 JSON 文件")
+    parser.add_argument('--metrics-dir', help="导出分操作/分步骤的耗时直方图（metrics.json / metrics.prom）")
+    parser.add_argument('--log', action='store_true', help="将 INFO 级别日志输出到终端")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    if args.log:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    else:
+        logging.disable(logging.INFO)
+
+    qt_app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 配置文件写入临时目录，避免覆盖用户的 monitor_config.cfg
+        main.CONFIG_FILE = os.path.join(tmp_dir, 'monitor_config.cfg')
+        results = run_benchmark(args.iterations, args.monitors, args.api_ms,
+                                args.subprocess_ms, args.settle_ms, args.mode, args.atomic)
+
+    print(format_report(results))
+    if args.metrics_dir:
+        metrics.registry.set_label('backend', 'simulated-atomic' if args.atomic else 'simulated')
+        json_path, prom_path = metrics.registry.export(args.metrics_dir)
+        print(f"\n耗时直方图已写入 {json_path}, {prom_path}")
+    if args.json_path:
+        report = {
+            'config': vars(args),
+            'results': results,
+        }
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"\n结果已写入 {args.json_path}")
+    qt_app.quit()
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,204 @@
+# monitorctl 启动与单条命令延迟基准测试
+# - process: 以子进程运行 monitorctl（模拟后端），包含解释器启动、导入与命令本身；
+#   python 一行为空解释器启动基线
+# - in-process: 在本进程内直接调用 DisplayController，只计命令本身（可设置模拟调用延迟）
+# 同时检查 monitorctl 没有导入 Qt / pystray / PIL
+#
+# 用法:
+#   python benchmark_cli.py --iterations 20 --monitors 3 --subprocess-ms 200 --settle-ms 300
+#   python benchmark_cli.py --json cli_bench.json
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import subprocess
+from typing import Callable, Dict, List, Optional, Tuple
+
+from monitor_core import SimulatedDisplayBackend, ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT
+from monitor_core.controller import DisplayController
+from monitor_core.metrics import percentile
+from monitor_core.settle import SettleDetector
+
+MONITORCTL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'monitorctl.py')
+
+# monitorctl 不允许导入的顶层模块
+FORBIDDEN_MODULES = ('PyQt6', 'pystray', 'PIL')
+
+
+def summarize(values: List[float]) -> Dict:
+    return {
+        'count': len(values),
+        'p50_ms': percentile(values, 50),
+        'p95_ms': percentile(values, 95),
+        'p99_ms': percentile(values, 99),
+        'mean_ms': sum(values) / len(values) if values else 0.0,
+    }
+
+
+def process_commands(monitor_count: int, config_path: str) -> List[Tuple[str, List[str]]]:
+    commands = [('status', ['status']), ('list', ['list'])]
+    for num in range(1, monitor_count + 1):
+        commands.append((f'single_{num}', ['single', str(num)]))
+    if monitor_count >= 2:
+        commands.append(('extend_1_2_rot90', ['extend', '1', '2', '--rotate-b', '90']))
+    commands += [
+        ('extend_all', ['extend-all']),
+        ('clone', ['clone']),
+        ('save', ['save', config_path]),
+        ('load', ['load', config_path]),
+    ]
+    return commands
+
+
+def run_process(args: List[str], env: Optional[Dict[str, str]] = None) -> float:
+    start = time.perf_counter()
+    completed = subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env)
+    elapsed = (time.perf_counter() - start) * 1000.0
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} 失败: {completed.stderr.decode(errors='replace').strip()}")
+    return elapsed
+
+
+def run_process_benchmark(iterations: int, monitor_count: int, tmp_dir: str) -> Dict[str, Dict]:
+    """子进程端到端耗时；模拟后端的状态不跨进程保留，每次都从全部扩展开始
+
+    数据目录指向临时目录，模拟显示器的持久键不写入用户的 monitor_identity.json
+    """
+    env = dict(os.environ, MONITOR_MANAGER_SIM_MONITORS=str(monitor_count),
+               MONITOR_MANAGER_DATA_DIR=tmp_dir)
+    base = [sys.executable, MONITORCTL, '--backend', 'simulated', '--no-wait']
+    samples = {'python': []}
+    commands = process_commands(monitor_count, os.path.join(tmp_dir, 'monitor_config.cfg'))
+    for _ in range(iterations):
+        samples['python'].append(run_process([sys.executable, '-c', 'pass']))
+        for name, command in commands:
+            samples.setdefault(name, []).append(run_process(base + command, env))
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def check_imports(tmp_dir: str) -> Dict:
+    """用 -X importtime 运行一次 monitorctl，返回导入的禁止模块与导入总耗时"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', MONITORCTL, '--backend', 'simulated', 'status'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        env=dict(os.environ, MONITOR_MANAGER_DATA_DIR=tmp_dir))
+    forbidden = set()
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = line.split('|')
+        try:
+            cumulative = int(parts[1])
+        except ValueError:
+            continue  # 表头
+        name = parts[2].rstrip()
+        if not name.startswith(' '):
+            continue
+        module = name.strip()
+        if module.split('.')[0] in FORBIDDEN_MODULES:
+            forbidden.add(module.split('.')[0])
+        # 顶层导入（缩进一个空格）的累计耗时之和
+        if name.startswith(' ') and not name.startswith('  '):
+            total_us += cumulative
+    return {'forbidden': sorted(forbidden), 'import_ms': round(total_us / 1000.0, 1)}
+
+
+def in_process_operations(controller: DisplayController, monitor_count: int,
+                          config_path: str) -> List[Tuple[str, Callable, tuple]]:
+    operations = [('status', controller.status, ())]
+    for num in range(1, monitor_count + 1):
+        operations.append((f'single_{num}', controller.single_display, (num,)))
+    # 与 benchmark.py 相同：单屏之后先恢复扩展，再测双屏扩展
+    operations.append(('extend_all', controller.display_switch, ('/extend',)))
+    if monitor_count >= 2:
+        operations.append(('extend_1_2', controller.extend_pair,
+                           (1, 2, ORIENTATION_LANDSCAPE, ORIENTATION_LANDSCAPE)))
+        operations.append(('extend_1_2_rot90', controller.extend_pair,
+                           (1, 2, ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT)))
+    operations += [
+        ('clone', controller.display_switch, ('/clone',)),
+        ('save', controller.save_config, (config_path,)),
+        ('load', controller.load_config, (config_path,)),
+    ]
+    return operations
+
+
+def run_in_process_benchmark(iterations: int, monitor_count: int, api_ms: float,
+                             subprocess_ms: float, settle_ms: float, tmp_dir: str) -> Dict[str, Dict]:
+    backend = SimulatedDisplayBackend(
+        monitor_count=monitor_count,
+        api_latency=api_ms / 1000.0,
+        subprocess_latency=subprocess_ms / 1000.0,
+        settle_delay=settle_ms / 1000.0,
+    )
+    # 生效历史只在内存中，不读写用户的 settle_history.json
+    controller = DisplayController(backend, SettleDetector(backend))
+    # 与界面相同，模式表在启动时读取一次，不计入扩展操作的耗时
+    controller.mode_tables.load(controller.enumerate(), backend)
+    operations = in_process_operations(controller, monitor_count,
+                                       os.path.join(tmp_dir, 'monitor_config.cfg'))
+    samples = {}
+    for _ in range(iterations):
+        for name, func, args in operations:
+            start = time.perf_counter()
+            func(*args)
+            samples.setdefault(name, []).append((time.perf_counter() - start) * 1000.0)
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def format_table(title: str, results: Dict[str, Dict]) -> str:
+    header = f"{'command':<22}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}"
+    lines = [title, header, '-' * len(header)]
+    for name, r in results.items():
+        lines.append(f"{name:<22}{r['count']:>5}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+                     f"{r['p99_ms']:>10.1f}{r['mean_ms']:>10.1f}")
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="monitorctl 启动与命令延迟基准测试")
+    parser.add_argument('--iterations', type=int, default=10, help="每条命令的重复次数")
+    parser.add_argument('--monitors', type=int, default=3, help="模拟显示器数量")
+    parser.add_argument('--api-ms', type=float, default=5.0, help="进程内: 每次 Win32 API 调用耗时")
+    parser.add_argument('--subprocess-ms', type=float, default=200.0, help="进程内: 每次外部进程调用耗时")
+    parser.add_argument('--settle-ms', type=float, default=300.0, help="进程内: 更改生效延迟")
+    parser.add_argument('--json', dest='json_path', help="将结果写入 JSON 文件")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv=None) -> int:
+    args = parse_args(argv)
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        imports = check_imports(tmp_dir)
+        process = run_process_benchmark(args.iterations, args.monitors, tmp_dir)
+        in_process = run_in_process_benchmark(args.iterations, args.monitors, args.api_ms,
+                                              args.subprocess_ms, args.settle_ms, tmp_dir)
+
+    print(format_table("子进程（含解释器启动与导入）", process))
+    print()
+    print(format_table("进程内（仅命令本身）", in_process))
+    print(f"\n顶层导入耗时 {imports['import_ms']:.1f} ms")
+    if imports['forbidden']:
+        print(f"错误: monitorctl 导入了 {', '.join(imports['forbidden'])}")
+    if args.json_path:
+        report = {
+            'config': vars(args),
+            'imports': imports,
+            'process': process,
+            'in_process': in_process,
+        }
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"\n结果已写入 {args.json_path}")
+    return 1 if imports['forbidden'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,144 @@
+# 单实例服务端
+# 常驻实例在 monitor_core.ipc.server_address() 上监听 QLocalServer，
+# 处理后续启动（或脚本、快捷方式）转发来的命令；协议见 monitor_core/ipc.py
+
+import os
+import logging
+from typing import Dict, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+from monitor_core import ipc
+from monitor_core.operation_queue import OperationHandle
+from monitor_core.planner import topology_mode, primary_monitor_id
+
+
+def handle_response(handle: OperationHandle) -> Dict:
+    """操作句柄 -> 响应；未完成时只报告已排队"""
+    response = {'ok': not handle.done or handle.succeeded, 'op_id': handle.op_id,
+                'state': handle.state, 'message': handle.description}
+    if handle.done:
+        if handle.error is not None:
+            response['message'] = f"{handle.description}: {handle.error}"
+        elif handle.result is not None:
+            response['message'] = f"{handle.description}: {handle.result}"
+    return response
+
+
+class InstanceServer(QObject):
+    """在 GUI 线程中接收并执行命令；wait 请求在操作完成后经信号切回 GUI 线程再响应"""
+
+    reply_ready = pyqtSignal(object, object)  # (QLocalSocket, 响应)
+
+    def __init__(self, main_window, address: Optional[str] = None):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.address = address or ipc.server_address()
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.on_new_connection)
+        self.reply_ready.connect(self.send_reply)
+        self.buffers: Dict[QLocalSocket, bytes] = {}
+
+    def start(self) -> bool:
+        """开始监听；调用前已确认没有实例响应，残留的套接字文件可以删除"""
+        if not self.server.listen(self.address):
+            QLocalServer.removeServer(self.address)
+            if not self.server.listen(self.address):
+                logging.warning(f"Instance server failed to listen on {self.address}: "
+                                f"{self.server.errorString()}")
+                return False
+        logging.info(f"Instance server listening on {self.address}")
+        return True
+
+    def stop(self):
+        self.server.close()
+
+    @pyqtSlot()
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            self.buffers[sock] = b''
+            sock.readyRead.connect(lambda s=sock: self.on_ready_read(s))
+            sock.disconnected.connect(lambda s=sock: self.on_disconnected(s))
+
+    def on_disconnected(self, sock: QLocalSocket):
+        self.buffers.pop(sock, None)
+        sock.deleteLater()
+
+    def on_ready_read(self, sock: QLocalSocket):
+        data = self.buffers.get(sock, b'') + bytes(sock.readAll())
+        *lines, rest = data.split(b'\n')
+        self.buffers[sock] = rest
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                request = ipc.validate_request(ipc.decode(line))
+            except ipc.IPCError as e:
+                self.send_reply(sock, {'ok': False, 'message': str(e)})
+                continue
+            logging.info(f"IPC command: {request['command']} {request['args']}")
+            self.execute(request, lambda response, s=sock: self.reply_ready.emit(s, response))
+
+    @pyqtSlot(object, object)
+    def send_reply(self, sock: QLocalSocket, response: Dict):
+        if sock not in self.buffers or sock.state() != QLocalSocket.LocalSocketState.ConnectedState:
+            return  # 客户端已断开
+        sock.write(ipc.encode(response))
+        sock.flush()
+
+    # --- 命令执行 ---
+    def execute(self, request: Dict, reply):
+        """执行命令并调用 reply(response)；也用于首个实例执行自己启动参数中的命令"""
+        main_window = self.main_window
+        command, args = request['command'], request['args']
+
+        handle = None
+        if command == 'single':
+            handle = main_window.request_single_display(args[0])
+        elif command in ('extend', 'clone'):
+            handle = main_window.request_display_switch(f'/{command}')
+        elif command == 'save_config':
+            handle = main_window.request_save_config()
+        elif command == 'load_config':
+            handle = main_window.request_load_config()
+
+        if handle is not None:
+            if request['wait']:
+                handle.add_done_callback(lambda h: reply(handle_response(h)))
+            else:
+                reply(handle_response(handle))
+            return
+
+        if command == 'ping':
+            reply({'ok': True, 'message': f"pid {os.getpid()}"})
+        elif command == 'show':
+            main_window.show()
+            main_window.raise_()
+            main_window.activateWindow()
+            reply({'ok': True, 'message': "已显示主窗口"})
+        elif command == 'refresh':
+            main_window.force_update_display_info()
+            reply({'ok': True, 'message': f"检测到 {len(main_window.monitors)} 台显示器"})
+        elif command == 'status':
+            reply({'ok': True, 'message': "当前状态", 'status': self.status()})
+        elif command == 'quit':
+            reply({'ok': True, 'message': "正在退出"})
+            main_window.quit_app_signal.emit()
+
+    def status(self) -> Dict:
+        main_window = self.main_window
+        monitors = main_window.monitors
+        queue = main_window.operation_queue
+        running = queue.running
+        return {
+            'mode': topology_mode(monitors),
+            'primary': primary_monitor_id(monitors),
+            'digest': main_window.monitors_digest,
+            'stale': main_window.monitors_stale,
+            'monitors': [{'id': m['id'], 'key': m.get('key'), 'description': m['description'],
+                          'is_primary': m['is_primary']} for m in monitors],
+            'running': running.description if running is not None else None,
+            'pending': queue.pending_count(),
+        }
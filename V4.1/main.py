@@ -5,45 +5,102 @@
 # - 批量操作优化
 # - 智能缓存机制
 
+import time
+STARTUP_T0 = time.perf_counter()
+
 import sys
-import subprocess
-import win32api
-import win32con
+from startup_profile import StartupProfiler, STARTUP_BUDGET_MS, format_report
+startup = StartupProfiler(STARTUP_T0, enabled='--profile-startup' in sys.argv)
+
 import logging
 import os
-import winreg
-import json
-from typing import Dict, List, Optional
+import threading
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional
+startup.imported('stdlib')
+
+launch_request = None
+if __name__ == '__main__':
+    # 单实例：已有实例时转发命令（无命令时让它显示主窗口）后立即退出，不加载界面与后端
+    from monitor_core import ipc
+    try:
+        launch_request = ipc.parse_command_args(sys.argv[1:])
+    except ipc.IPCError as e:
+        print(f"错误: {e}")
+        sys.exit(2)
+    if not startup.enabled:
+        probe = launch_request or ipc.make_request('ping' if '--silent' in sys.argv else 'show')
+        try:
+            response = ipc.send_command(probe)
+        except ipc.IPCError as e:
+            response = {'ok': False, 'message': str(e)}
+        if response is not None:
+            print(ipc.format_response(response))
+            sys.exit(0 if response.get('ok') else 1)
 
+# winreg、pystray、PIL 等只在首次使用时导入（托盘见 tray.py）
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QPushButton, QLabel, QHBoxLayout, QTextEdit,
+                             QPushButton, QLabel, QHBoxLayout, QPlainTextEdit,
                              QGridLayout, QMessageBox, QComboBox, QFrame,
-                             QCheckBox, QProgressBar)
+                             QCheckBox, QProgressBar, QLineEdit)
 from PyQt6.QtGui import QFont, QIcon
-from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QThread, QMutex, QMutexLocker
-import pystray
-from PIL import Image, ImageDraw, ImageFont
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QThread, QTimer
+startup.imported('PyQt6')
 
-# --- 全局配置 ---
-logging.basicConfig(
-    filename='monitor_manager.log', 
-    level=logging.INFO, 
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from monitor_core import (ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT,
+                          ORIENTATION_LANDSCAPE_FLIPPED, ORIENTATION_PORTRAIT_FLIPPED,
+                          BACKEND_ENV_VAR, DisplayBackend, create_display_backend,
+                          topology_digest)
+from monitor_core.operation_queue import (OperationHandle, OperationQueue,
+                                          OperationProgress, OperationResult)
+from monitor_core.display_events import DisplayChangeSource, create_change_source
+from monitor_core.settle import SETTLE_HISTORY_FILE_NAME, SettleDetector
+from monitor_core.controller import DisplayController
+from monitor_core import metrics
+from monitor_core.log_pipeline import operation_context, setup_logging, user_data_dir
+from monitor_core.snapshot_cache import SNAPSHOT_FILE_NAME, load_snapshot, save_snapshot
+from monitor_core.identity import IDENTITY_FILE_NAME, IdentityResolver, MonitorRef
+from monitor_core.native_modes import NATIVE_MODES_FILE_NAME, NativeModeCache
+from monitor_core.orientation import oriented_size
+from monitor_core.modes import (MODE_POLICY_BEST, MODE_POLICY_KEEP, MODE_POLICY_PREFERRED,
+                                DEFAULT_MODE_POLICY, ModePolicy)
+from monitor_core.preferences import (load_orientation_preferences, save_orientation_preferences,
+                                      migrate_orientation_preferences, MODE_POLICIES_FILE_NAME,
+                                      load_mode_policies, save_mode_policies)
+startup.imported('monitor_core')
 
+# --- 全局配置 ---
+# 日志由 monitor_core.log_pipeline 在启动时配置（每用户目录、后台线程写入）
 TOOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'MultiMonitorTool.exe')
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'monitor_config.cfg')
 ORIENTATION_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'monitor_orientation_config.json')
+STARTUP_PROFILE_FILE = os.path.join(user_data_dir(), 'startup_profile.json')
+SETTLE_HISTORY_FILE = os.path.join(user_data_dir(), SETTLE_HISTORY_FILE_NAME)
+METRICS_DIR = os.path.join(user_data_dir(), 'metrics')
+SNAPSHOT_FILE = os.path.join(user_data_dir(), SNAPSHOT_FILE_NAME)
+IDENTITY_FILE = os.path.join(user_data_dir(), IDENTITY_FILE_NAME)
+NATIVE_MODES_FILE = os.path.join(user_data_dir(), NATIVE_MODES_FILE_NAME)
+MODE_POLICIES_FILE = os.path.join(user_data_dir(), MODE_POLICIES_FILE_NAME)
+
+# 操作队列的合并键：所有改变拓扑的操作互相替换，只有最新的目标会被执行
+TOPOLOGY_OPERATION = 'topology'
+SAVE_CONFIG_OPERATION = 'save_config'
+MODE_OPERATION = 'mode:{}'  # 按显示器持久键合并：同一台显示器只保留最新选择的模式
+MODE_TABLES_OPERATION = 'mode_tables'  # 后台读取模式表，不写入事件日志
+
+# 执行器空闲时检查退出标志的间隔（秒）；退出时等待执行中操作完成的上限
+EXECUTOR_POLL_INTERVAL = 0.25
+EXECUTOR_SHUTDOWN_TIMEOUT_MS = 15000
+
+# 事件日志最多保留的条目数（托盘程序可能连续运行数周）
+EVENT_LOG_MAX_ENTRIES = 1000
+
+# 变更通知去抖：插拔/切换时 Windows 会连续广播多条消息
+CHANGE_DEBOUNCE_MS = 300
 
 APP_NAME = "MonitorManagerV7"
 STARTUP_REG_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
 
-# 显示方向常量
-ORIENTATION_LANDSCAPE = 0
-ORIENTATION_PORTRAIT = 1
-ORIENTATION_LANDSCAPE_FLIPPED = 2
-ORIENTATION_PORTRAIT_FLIPPED = 3
-
 ORIENTATION_NAMES = {
     ORIENTATION_LANDSCAPE: "横向",
     ORIENTATION_PORTRAIT: "纵向",
@@ -51,45 +108,173 @@ ORIENTATION_NAMES = {
     ORIENTATION_PORTRAIT_FLIPPED: "纵向翻转"
 }
 
+MODE_POLICY_NAMES = {
+    MODE_POLICY_BEST: "扩展时: 原生最高刷新率",
+    MODE_POLICY_KEEP: "扩展时: 保持当前模式",
+    MODE_POLICY_PREFERRED: "扩展时: 使用所选模式",
+}
+
 # --- 辅助函数 ---
-def create_dummy_icon(width=64, height=64):
-    image = Image.new('RGB', (width, height), color='dodgerblue')
-    draw = ImageDraw.Draw(image)
+def load_winreg():
+    """首次访问注册表时才导入 winreg；非 Windows 平台（模拟后端）返回 None"""
     try:
-        font = ImageFont.truetype("msyh.ttc", 40)
-    except IOError:
-        font = ImageFont.load_default()
-    draw.text((15, 5), "M", fill="white", font=font)
-    return image
+        import winreg
+        return winreg
+    except ImportError:
+        return None
 
 
 # --- 工作线程类 ---
-class MonitorOperationWorker(QThread):
-    """异步执行显示器操作的工作线程"""
-    operation_started = pyqtSignal(str)
-    operation_progress = pyqtSignal(str)
-    operation_completed = pyqtSignal(bool, str)
-    
-    def __init__(self, operation_func, *args, **kwargs):
+class OperationExecutor(QThread):
+    """常驻工作线程：依次从操作队列取出请求执行
+
+    整个程序生命周期只创建一次，避免每次操作都新建/销毁系统线程；
+    结果与进度通过带类型的信号送回 GUI 线程
+    """
+    operation_started = pyqtSignal(object)    # OperationHandle
+    operation_progress = pyqtSignal(object)   # OperationProgress
+    operation_completed = pyqtSignal(object)  # OperationResult
+
+    def __init__(self, queue: OperationQueue, poll_interval: float = EXECUTOR_POLL_INTERVAL):
         super().__init__()
-        self.operation_func = operation_func
-        self.args = args
-        self.kwargs = kwargs
-        self.success = False
-        self.message = ""
-    
+        self.setObjectName('OperationExecutor')
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.current: Optional[OperationHandle] = None
+        self._stopping = False
+
     def run(self):
-        try:
-            self.operation_started.emit(f"开始执行操作...")
-            result = self.operation_func(*self.args, **self.kwargs)
-            self.success = True
-            self.message = "操作成功完成"
-            self.operation_completed.emit(True, self.message)
-        except Exception as e:
-            self.success = False
-            self.message = f"操作失败: {str(e)}"
-            logging.error(f"Worker error: {e}", exc_info=True)
-            self.operation_completed.emit(False, self.message)
+        logging.info("Operation executor started")
+        while not self._stopping:
+            handle = self.queue.take(timeout=self.poll_interval)
+            if handle is None:
+                continue
+            self.current = handle
+            self.operation_started.emit(handle)
+            result, error = None, None
+            with operation_context(handle.op_id):
+                logging.info(f"Operation #{handle.op_id} started: {handle.description}")
+                try:
+                    result = handle.run()
+                except Exception as e:
+                    error = e
+                    logging.error(f"Operation #{handle.op_id} failed: {e}", exc_info=True)
+            self.current = None
+            outcome = self.queue.complete(handle, result, error)
+            logging.info(f"Operation #{handle.op_id} finished in {outcome.elapsed:.3f}s "
+                         f"(queued {outcome.queued:.3f}s, merged {outcome.merged})",
+                         extra={'op_id': handle.op_id, 'duration_ms': outcome.elapsed * 1000.0})
+            self.operation_completed.emit(outcome)
+        logging.info("Operation executor stopped")
+
+    def report_progress(self, message: str):
+        """由操作函数在执行线程中调用，报告当前请求的进度"""
+        handle = self.current
+        if handle is not None:
+            self.operation_progress.emit(OperationProgress(handle.op_id, handle.description, message))
+
+    def shutdown(self, timeout_ms: int = EXECUTOR_SHUTDOWN_TIMEOUT_MS) -> bool:
+        """丢弃排队中的请求，等待执行中的请求完成后退出线程
+
+        不终止执行中的线程：拓扑更改中途被杀会让显示配置停在中间状态
+        """
+        self._stopping = True
+        dropped = self.queue.cancel_pending()
+        if dropped:
+            logging.info(f"Dropped {len(dropped)} pending operations on shutdown")
+        handle = self.current
+        if handle is not None:
+            logging.info(f"Waiting for operation #{handle.op_id} to finish before exit")
+        finished = self.wait(timeout_ms)
+        if not finished:
+            logging.warning("Operation executor did not stop in time")
+        return finished
+
+
+# --- 事件日志 ---
+EVENT_LEVELS = ('INFO', 'PROGRESS', 'SUCCESS', 'WARNING', 'ERROR')
+EVENT_LEVEL_MARKS = {'SUCCESS': '✓ ', 'ERROR': '✗ '}
+
+
+class EventLogEntry(NamedTuple):
+    timestamp: float
+    level: str
+    op_id: Optional[int]
+    text: str
+
+    def format(self) -> str:
+        clock = time.strftime('%H:%M:%S', time.localtime(self.timestamp))
+        op = f" #{self.op_id}" if self.op_id is not None else ""
+        return f"{clock} [{self.level}]{op} {EVENT_LEVEL_MARKS.get(self.level, '')}{self.text}"
+
+
+class EventLogView(QWidget):
+    """有上限的操作事件日志，可按级别与操作编号过滤
+
+    条目保存在固定长度的环形缓冲中；QPlainTextEdit 同样限制块数，
+    追加只写入一行，超出上限时丢弃最旧的行，开销与运行时长无关
+    """
+
+    def __init__(self, max_entries: int = EVENT_LOG_MAX_ENTRIES, parent=None):
+        super().__init__(parent)
+        self.entries = deque(maxlen=max_entries)
+
+        self.level_filter = QComboBox()
+        self.level_filter.addItem("全部级别", None)
+        for level in EVENT_LEVELS:
+            self.level_filter.addItem(level, level)
+        self.op_filter = QLineEdit()
+        self.op_filter.setPlaceholderText("操作编号")
+        self.op_filter.setClearButtonEnabled(True)
+        self.op_filter.setMaximumWidth(120)
+        self.btn_clear = QPushButton("清空")
+
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setFont(QFont("Consolas", 10))
+        self.view.setMaximumBlockCount(max_entries)
+        self.view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("操作日志:"))
+        toolbar.addStretch()
+        toolbar.addWidget(self.level_filter)
+        toolbar.addWidget(self.op_filter)
+        toolbar.addWidget(self.btn_clear)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(toolbar)
+        layout.addWidget(self.view)
+
+        self.level_filter.currentIndexChanged.connect(self.apply_filter)
+        self.op_filter.textChanged.connect(self.apply_filter)
+        self.btn_clear.clicked.connect(self.clear)
+
+    def _op_filter_value(self) -> Optional[int]:
+        text = self.op_filter.text().strip().lstrip('#')
+        return int(text) if text.isdigit() else None
+
+    def _matches(self, entry: EventLogEntry, level: Optional[str], op_id: Optional[int]) -> bool:
+        return (level is None or entry.level == level) and (op_id is None or entry.op_id == op_id)
+
+    def log(self, level: str, text: str, op_id: Optional[int] = None):
+        entry = EventLogEntry(time.time(), level, op_id, text)
+        self.entries.append(entry)
+        if self._matches(entry, self.level_filter.currentData(), self._op_filter_value()):
+            self.view.appendPlainText(entry.format())
+
+    @pyqtSlot()
+    def apply_filter(self):
+        level, op_id = self.level_filter.currentData(), self._op_filter_value()
+        lines = [entry.format() for entry in self.entries if self._matches(entry, level, op_id)]
+        self.view.setPlainText('\n'.join(lines))
+        self.view.moveCursor(self.view.textCursor().MoveOperation.End)
+
+    @pyqtSlot()
+    def clear(self):
+        self.entries.clear()
+        self.view.clear()
 
 
 # --- 主窗口类 ---
@@ -98,26 +283,71 @@ class MonitorApp(QMainWindow):
     refresh_info_signal = pyqtSignal()
     switch_mode_signal = pyqtSignal(str)
     quit_app_signal = pyqtSignal()
+    display_changed_signal = pyqtSignal(str)
+    monitors_updated = pyqtSignal()  # 显示器快照刷新后发出（托盘菜单据此同步）
+    initial_monitors_ready = pyqtSignal(object)  # 后台首次枚举结果
+    startup_status_ready = pyqtSignal(object)  # 开机启动状态: True/False，None 表示不可用
+    interactive = pyqtSignal(float)  # 首次填充控件后发出，参数为启动到可交互的秒数
 
-    def __init__(self):
+    def __init__(self, backend: DisplayBackend, change_source: Optional[DisplayChangeSource] = None,
+                 started_at: Optional[float] = None, snapshot_file: Optional[str] = None,
+                 identity_file: Optional[str] = None, orientation_file: Optional[str] = None,
+                 native_modes_file: Optional[str] = None, mode_policies_file: Optional[str] = None):
         super().__init__()
+        self.backend = backend
+        self.change_source = change_source
+        self.snapshot_file = snapshot_file  # None 时不读写快照缓存
+        self.orientation_file = orientation_file  # None 时方向偏好只在内存中（基准测试）
+        self.mode_policies_file = mode_policies_file  # None 时模式策略只在内存中
+        self.saved_snapshot_digest = None
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.time_to_interactive: Optional[float] = None
+        self.settle_detector = SettleDetector(backend, SETTLE_HISTORY_FILE)
+        # identity_file / native_modes_file 为 None 时持久键映射与原生模式只在内存中
+        self.controller = DisplayController(backend, self.settle_detector, progress=self.report_progress,
+                                            identity=IdentityResolver(identity_file),
+                                            native_modes=NativeModeCache(native_modes_file),
+                                            mode_policies=load_mode_policies(mode_policies_file))
         self.monitors = []
+        self.monitors_digest = None
+        self.single_buttons = {}  # 显示器持久键 -> 单显示器按钮
+        self.mode_choices_source = None  # 分辨率/刷新率下拉框的来源 (显示器持久键, 模式表)
         self.monitor_native_resolutions = {}
         self.orientation_config = self.load_orientation_config()
-        self.operation_mutex = QMutex()  # 使用 QMutex 替代布尔锁
-        self.current_worker = None
+        self.operation_queue = OperationQueue()
+        self.executor = OperationExecutor(self.operation_queue)
         self.monitors_cache_valid = False
+        self.monitors_loaded = False  # 首次枚举完成前界面与托盘显示“正在检测”
+        self.monitors_stale = False  # 当前显示的是上次启动保存的快照，尚未经枚举确认
         
         self.toggle_window_signal.connect(self.toggle_visibility)
         self.refresh_info_signal.connect(self.update_display_info)
         self.switch_mode_signal.connect(self.handle_switch_mode_signal)
         self.quit_app_signal.connect(self.quit_application)
+        self.display_changed_signal.connect(self.on_display_changed)
+        self.initial_monitors_ready.connect(self.on_initial_monitors)
+        self.startup_status_ready.connect(self.apply_startup_status)
+        self.executor.operation_started.connect(self.on_operation_started)
+        self.executor.operation_progress.connect(self.on_operation_progress)
+        self.executor.operation_completed.connect(self.on_operation_completed)
+        
+        self.change_debounce_timer = QTimer(self)
+        self.change_debounce_timer.setSingleShot(True)
+        self.change_debounce_timer.setInterval(CHANGE_DEBOUNCE_MS)
+        self.change_debounce_timer.timeout.connect(self.refresh_if_changed)
         
         icon_path = 'icon.png'
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
             
         self.init_ui()
+        self.render_cached_snapshot()
+        self.executor.start()
+        self.start_initial_load()
+        
+        if self.change_source is not None:
+            # 回调在通知线程中执行，经信号切回 GUI 线程
+            self.change_source.start(self.display_changed_signal.emit)
 
     def init_ui(self):
         self.setWindowTitle("显示器切换工具 V7.0 (性能优化版)")
@@ -129,10 +359,12 @@ class MonitorApp(QMainWindow):
         # --- 信息显示区 ---
         self.info_label = QLabel("当前显示器信息:")
         self.info_label.setFont(QFont("Microsoft YaHei", 12))
-        self.info_display = QTextEdit()
+        self.info_display = QPlainTextEdit()
         self.info_display.setReadOnly(True)
         self.info_display.setFont(QFont("Consolas", 10))
-        self.info_display.setFixedHeight(150)
+        self.info_display.setFixedHeight(120)
+        self.info_display.setPlainText("正在检测显示器…")
+        self.event_log = EventLogView()
         
         # --- 进度条 ---
         self.progress_bar = QProgressBar()
@@ -202,12 +434,41 @@ class MonitorApp(QMainWindow):
         advanced_layout.addWidget(advanced_label)
         advanced_layout.addLayout(selection_layout)
         advanced_layout.addWidget(self.btn_apply_extend)
+        self.advanced_extend_frame.hide()  # 首次枚举后按显示器数量显示
+
+        # --- 显示模式区 ---
+        self.mode_frame = QFrame()
+        self.mode_frame.setFrameShape(QFrame.Shape.StyledPanel)
+        mode_layout = QHBoxLayout(self.mode_frame)
+        mode_label = QLabel("显示模式:")
+        mode_label.setFont(QFont("Microsoft YaHei", 10, QFont.Weight.Bold))
+        self.mode_monitor_combo = QComboBox()
+        self.mode_monitor_combo.setMinimumHeight(30)
+        self.resolution_combo = QComboBox()
+        self.resolution_combo.setMinimumHeight(30)
+        self.refresh_combo = QComboBox()
+        self.refresh_combo.setMinimumHeight(30)
+        self.btn_apply_mode = QPushButton("应用分辨率/刷新率")
+        self.btn_apply_mode.setMinimumHeight(30)
+        self.mode_policy_combo = QComboBox()
+        self.mode_policy_combo.setMinimumHeight(30)
+        for kind, name in MODE_POLICY_NAMES.items():
+            self.mode_policy_combo.addItem(name, kind)
+        mode_layout.addWidget(mode_label)
+        mode_layout.addWidget(self.mode_monitor_combo, 2)
+        mode_layout.addWidget(self.resolution_combo, 1)
+        mode_layout.addWidget(self.refresh_combo, 1)
+        mode_layout.addWidget(self.btn_apply_mode)
+        mode_layout.addWidget(self.mode_policy_combo, 1)
+        self.mode_frame.hide()  # 首次枚举后显示
 
         # --- 设置区 ---
         settings_layout = QHBoxLayout()
         self.startup_checkbox = QCheckBox("开机后自动启动 (延时60秒静默运行)")
         settings_layout.addWidget(self.startup_checkbox)
         settings_layout.addStretch()
+        self.btn_export_metrics = QPushButton("导出性能指标")
+        settings_layout.addWidget(self.btn_export_metrics)
 
         # --- 主布局 ---
         main_layout.addWidget(self.info_label)
@@ -219,28 +480,70 @@ class MonitorApp(QMainWindow):
         main_layout.addLayout(self.dynamic_buttons_layout)
         main_layout.addWidget(self.create_separator())
         main_layout.addWidget(self.advanced_extend_frame)
+        main_layout.addWidget(self.mode_frame)
         main_layout.addWidget(self.create_separator())
         main_layout.addLayout(settings_layout)
-        main_layout.addStretch()
+        main_layout.addWidget(self.event_log, 1)
 
         # --- 信号连接 ---
         self.btn_refresh.clicked.connect(self.force_update_display_info)
-        self.btn_extend.clicked.connect(lambda: self.execute_async_operation(
-            self.run_displayswitch_legacy, '/extend'))
-        self.btn_clone.clicked.connect(lambda: self.execute_async_operation(
-            self.run_displayswitch_legacy, '/clone'))
-        self.btn_save_config.clicked.connect(lambda: self.execute_async_operation(
-            self.save_config))
-        self.btn_load_config.clicked.connect(lambda: self.execute_async_operation(
-            self.load_config))
+        self.btn_extend.clicked.connect(lambda: self.request_display_switch('/extend'))
+        self.btn_clone.clicked.connect(lambda: self.request_display_switch('/clone'))
+        self.btn_save_config.clicked.connect(self.request_save_config)
+        self.btn_load_config.clicked.connect(self.request_load_config)
         self.btn_apply_extend.clicked.connect(self.apply_advanced_extend_async)
+        self.btn_apply_mode.clicked.connect(self.apply_mode_async)
         self.startup_checkbox.stateChanged.connect(self.set_startup_status)
+        self.btn_export_metrics.clicked.connect(self.export_metrics)
         
         self.primary_monitor_combo.currentIndexChanged.connect(self.load_primary_orientation)
         self.secondary_monitor_combo.currentIndexChanged.connect(self.load_secondary_orientation)
-        
+        self.mode_monitor_combo.currentIndexChanged.connect(self.load_mode_choices)
+        self.resolution_combo.currentIndexChanged.connect(self.load_refresh_choices)
+        self.mode_policy_combo.activated.connect(self.set_mode_policy)
+
+    def start_initial_load(self):
+        """首次枚举与注册表读取放到后台线程，窗口与托盘先以占位状态出现"""
+        threading.Thread(target=self._initial_load, name='initial-load', daemon=True).start()
+
+    def _initial_load(self):
+        # 结果经信号切回 GUI 线程；两项互不依赖，枚举较慢，先读注册表
+        self.startup_status_ready.emit(self.read_startup_status())
+        self.initial_monitors_ready.emit(self.get_all_monitors())
+
+    def render_cached_snapshot(self):
+        """用上次保存的快照立即渲染界面与托盘菜单，后台枚举完成后再校验"""
+        if not self.snapshot_file:
+            return
+        snapshot = load_snapshot(self.snapshot_file, self.backend.name)
+        if snapshot is None:
+            return
+        self.monitors = snapshot.monitors
+        self.monitors_digest = snapshot.digest
+        self.monitor_native_resolutions = snapshot.native_resolutions
+        self.saved_snapshot_digest = snapshot.digest
+        self.monitors_stale = True
+        self.monitors_cache_valid = True  # 校验结果到达前不在 GUI 线程同步枚举
+        logging.info(f"Rendering cached snapshot: {len(snapshot.monitors)} monitors, "
+                     f"saved {snapshot.age:.0f}s ago")
         self.update_display_info()
-        self.check_startup_status()
+
+    @pyqtSlot(object)
+    def on_initial_monitors(self, monitors: List[Dict]):
+        if self.monitors_loaded and not self.monitors_stale:
+            # 期间已有同步刷新（如点击“刷新信息”），以那次为准
+            return
+        self.apply_monitors(monitors)
+
+    def mark_interactive(self):
+        """首次填充控件：记录启动到可交互的耗时"""
+        elapsed = time.perf_counter() - self.started_at
+        self.time_to_interactive = elapsed
+        metrics.registry.observe(metrics.OPERATION, metrics.OPERATION_TIME_TO_INTERACTIVE, elapsed)
+        source = "cached snapshot" if self.monitors_stale else "enumeration"
+        logging.info(f"Interactive after {elapsed * 1000:.0f} ms ({source})",
+                     extra={'duration_ms': elapsed * 1000})
+        self.interactive.emit(elapsed)
 
     def create_separator(self):
         line = QFrame()
@@ -252,63 +555,76 @@ class MonitorApp(QMainWindow):
         event.ignore()
         self.hide()
 
-    def set_buttons_enabled(self, enabled):
-        """启用或禁用所有操作按钮"""
-        self.btn_extend.setEnabled(enabled)
-        self.btn_clone.setEnabled(enabled)
-        self.btn_refresh.setEnabled(enabled)
-        self.btn_save_config.setEnabled(enabled)
-        self.btn_load_config.setEnabled(enabled)
-        self.btn_apply_extend.setEnabled(enabled)
-        self.primary_monitor_combo.setEnabled(enabled)
-        self.secondary_monitor_combo.setEnabled(enabled)
-        self.primary_orientation_combo.setEnabled(enabled)
-        self.secondary_orientation_combo.setEnabled(enabled)
-        
-        for i in range(self.dynamic_buttons_layout.count()):
-            widget = self.dynamic_buttons_layout.itemAt(i).widget()
-            if widget:
-                widget.setEnabled(enabled)
-
-    def execute_async_operation(self, func, *args, **kwargs):
-        """异步执行操作"""
-        locker = QMutexLocker(self.operation_mutex)
-        if self.current_worker and self.current_worker.isRunning():
-            self.info_display.append("[WARNING] 操作正在进行中，请稍候...\n")
+    def submit_operation(self, kind: str, description: str, func, *args, **kwargs) -> OperationHandle:
+        """提交操作到队列（线程安全，托盘线程也可直接调用）
+
+        正在执行的操作不会被打断；排队中同类操作只保留最新的一个
+        """
+        handle = self.operation_queue.submit(kind, func, *args, description=description, **kwargs)
+        logging.info(f"Operation #{handle.op_id} queued: {description}")
+        return handle
+
+    def request_single_display(self, monitor: MonitorRef) -> OperationHandle:
+        """提交切换到单显示器（按钮与托盘菜单传持久键，命令通道也可传编号）"""
+        return self.submit_operation(TOPOLOGY_OPERATION, f"仅显示器 {monitor}",
+                                     self.switch_to_single_display, monitor)
+
+    def request_set_mode(self, monitor: MonitorRef, width: int, height: int,
+                         frequency: Optional[int] = None) -> OperationHandle:
+        """提交设置分辨率/刷新率（下拉框与托盘菜单传持久键与模式表中的横向宽高）"""
+        rate = f" @ {frequency}Hz" if frequency else ""
+        return self.submit_operation(MODE_OPERATION.format(monitor), f"显示器 {monitor} 模式 {width}x{height}{rate}",
+                                     self.set_display_mode, monitor, width, height, frequency)
+
+    def request_display_switch(self, arg: str) -> OperationHandle:
+        """提交 DisplaySwitch 扩展/复制（按钮、托盘与命令通道共用）"""
+        description = {'/extend': "扩展(所有)", '/clone': "复制(所有)"}.get(arg, f"DisplaySwitch {arg}")
+        return self.submit_operation(TOPOLOGY_OPERATION, description, self.run_displayswitch_legacy, arg)
+
+    def request_save_config(self) -> OperationHandle:
+        return self.submit_operation(SAVE_CONFIG_OPERATION, "保存配置", self.save_config)
+
+    def request_load_config(self) -> OperationHandle:
+        return self.submit_operation(TOPOLOGY_OPERATION, "加载配置", self.load_config)
+
+    def report_progress(self, message: str):
+        """操作函数（在执行线程中）报告进度"""
+        self.executor.report_progress(message)
+
+    @pyqtSlot(object)
+    def on_operation_started(self, handle: OperationHandle):
+        if handle.kind == MODE_TABLES_OPERATION:
             return
-        
-        self.set_buttons_enabled(False)
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)  # 不确定进度
-        
-        self.current_worker = MonitorOperationWorker(func, *args, **kwargs)
-        self.current_worker.operation_started.connect(self.on_operation_started)
-        self.current_worker.operation_progress.connect(self.on_operation_progress)
-        self.current_worker.operation_completed.connect(self.on_operation_completed)
-        self.current_worker.start()
+        if handle.merged:
+            self.event_log.log('INFO', f"已合并 {len(handle.merged)} 个未执行的操作，"
+                                       f"直接执行最新的: {handle.description}", handle.op_id)
+        else:
+            self.event_log.log('INFO', f"开始执行: {handle.description}", handle.op_id)
 
-    @pyqtSlot(str)
-    def on_operation_started(self, message):
-        self.info_display.append(f"[INFO] {message}")
+    @pyqtSlot(object)
+    def on_operation_progress(self, progress: OperationProgress):
+        self.event_log.log('PROGRESS', progress.message, progress.op_id)
 
-    @pyqtSlot(str)
-    def on_operation_progress(self, message):
-        self.info_display.append(f"[PROGRESS] {message}")
+    @pyqtSlot(object)
+    def on_operation_completed(self, outcome: OperationResult):
+        if self.operation_queue.is_idle():
+            self.progress_bar.setVisible(False)
 
-    @pyqtSlot(bool, str)
-    def on_operation_completed(self, success, message):
-        self.progress_bar.setVisible(False)
-        self.set_buttons_enabled(True)
-        
-        if success:
-            self.info_display.append(f"[SUCCESS] ✓ {message}")
-            # 智能刷新：只在需要时刷新
-            self.update_display_info()
+        if outcome.kind == MODE_TABLES_OPERATION:
+            self.on_mode_tables_loaded()
+            return
+        if outcome.success:
+            message = "操作成功完成"
+            if outcome.result is not None:
+                # 切换类操作返回 SettleResult，附带实测生效耗时
+                message += f"，{outcome.result}"
+            self.event_log.log('SUCCESS', message, outcome.op_id)
+            # 智能刷新：只在拓扑真正变化时更新界面
+            self.refresh_if_changed()
         else:
-            self.info_display.append(f"[ERROR] ✗ {message}")
-        
-        self.info_display.append("")  # 空行分隔
-        self.current_worker = None
+            self.event_log.log('ERROR', f"操作失败: {outcome.error}", outcome.op_id)
 
     @pyqtSlot()
     def toggle_visibility(self):
@@ -320,301 +636,362 @@ class MonitorApp(QMainWindow):
 
     @pyqtSlot()
     def force_update_display_info(self):
-        """强制刷新显示器信息"""
+        """强制刷新显示器信息：重建身份索引，并重新获取当前显示器的原生模式"""
+        self.monitors_cache_valid = False
+        self.controller.identity.invalidate()
+        self.controller.native_modes.invalidate([m['key'] for m in self.monitors if m.get('key')])
+        self.update_display_info()
+
+    @pyqtSlot(str)
+    def on_display_changed(self, reason: str):
+        """收到系统显示变更通知：使缓存失效，去抖后再比较刷新"""
+        logging.info(f"Display change notification: {reason}")
         self.monitors_cache_valid = False
+        self.controller.identity.invalidate()
+        if reason == 'WM_DEVICECHANGE':
+            # 插拔后模式列表可能不同（换了显示器或接口），下次枚举时重新读取
+            self.controller.mode_tables.invalidate()
+        self.change_debounce_timer.start()
+
+    @pyqtSlot()
+    def refresh_if_changed(self):
+        """重新枚举，仅当拓扑摘要变化时刷新界面"""
+        self.apply_monitors(self.get_all_monitors())
+
+    def apply_monitors(self, monitors: List[Dict]):
+        """应用一次枚举结果：拓扑摘要变化或当前仍是缓存快照时才刷新界面（控件只更新差异）"""
+        digest = topology_digest(monitors)
+        self.monitors_cache_valid = True
+        if digest == self.monitors_digest and not self.monitors_stale:
+            logging.info("Topology unchanged, refresh skipped")
+            return
+        if self.monitors_stale:
+            state = "confirmed" if digest == self.monitors_digest else "outdated"
+            logging.info(f"Cached snapshot {state} by enumeration")
+            self.monitors_stale = False
+        self.monitors = monitors
+        self.monitors_digest = digest
         self.update_display_info()
 
     @pyqtSlot()
     def update_display_info(self):
         """更新显示器信息（使用缓存机制）"""
         if not self.monitors_cache_valid:
-            self.info_display.clear()
             self.monitors = self.get_all_monitors()
+            self.monitors_digest = topology_digest(self.monitors)
             self.monitors_cache_valid = True
+            self.monitors_stale = False
+        self.monitors_loaded = True
         
-        info_text = f"检测到 {len(self.monitors)} 台显示器\n" + "-" * 60 + "\n"
+        stale_note = "（上次记录，正在校验…）" if self.monitors_stale else ""
+        info_text = f"检测到 {len(self.monitors)} 台显示器{stale_note}\n" + "-" * 60 + "\n"
         for monitor in self.monitors:
             is_primary_str = " (主)" if monitor['is_primary'] else ""
             info_text += f"{monitor['description']}{is_primary_str}\n"
-        self.info_display.setText(info_text)
+        # 摘要只在内容变化时重写，操作事件写入单独的日志区
+        if self.info_display.toPlainText() != info_text:
+            self.info_display.setPlainText(info_text)
         
         logging.info(f"Display info updated: {len(self.monitors)} monitors")
+        if not self.monitors_stale and migrate_orientation_preferences(self.orientation_config, self.monitors):
+            self.save_orientation_config()
         self.update_monitor_controls()
+        self.monitors_updated.emit()
+        if self.time_to_interactive is None:
+            self.mark_interactive()
+        self.persist_snapshot()
+
+    def persist_snapshot(self):
+        """经枚举确认的新拓扑写入快照缓存，供下次启动立即渲染"""
+        if (not self.snapshot_file or self.monitors_stale or not self.monitors
+                or self.monitors_digest == self.saved_snapshot_digest):
+            return
+        snapshot = save_snapshot(self.snapshot_file, self.backend.name,
+                                 self.monitors, self.monitor_native_resolutions)
+        if snapshot is not None:
+            self.saved_snapshot_digest = snapshot.digest
 
     def get_all_monitors(self) -> List[Dict]:
         """获取所有显示器信息（优化版）"""
         monitors_list = []
-        self.monitor_native_resolutions.clear()
-        
         try:
-            i = 0
-            while True:
-                try:
-                    device = win32api.EnumDisplayDevices(None, i)
-                except:
-                    break
-                    
-                if device.StateFlags & win32con.DISPLAY_DEVICE_ATTACHED_TO_DESKTOP:
-                    settings = win32api.EnumDisplaySettings(device.DeviceName, win32con.ENUM_CURRENT_SETTINGS)
-                    is_primary = (settings.Position_x == 0 and settings.Position_y == 0)
-                    
-                    # 计算原生分辨率
-                    current_orientation = settings.DisplayOrientation
-                    if current_orientation in [ORIENTATION_PORTRAIT, ORIENTATION_PORTRAIT_FLIPPED]:
-                        native_width = settings.PelsHeight
-                        native_height = settings.PelsWidth
-                    else:
-                        native_width = settings.PelsWidth
-                        native_height = settings.PelsHeight
-                    
-                    self.monitor_native_resolutions[device.DeviceName] = {
-                        'width': native_width,
-                        'height': native_height
-                    }
-                    
-                    description = (f"显示器{i+1}: {settings.PelsWidth}x{settings.PelsHeight} "
-                                 f"@ {settings.DisplayFrequency}Hz")
-
-                    monitors_list.append({
-                        'id': i + 1,
-                        'device': device,
-                        'device_name': device.DeviceName,
-                        'settings': settings, 
-                        'is_primary': is_primary,
-                        'description': description
-                    })
-                i += 1
+            monitors_list = self.controller.enumerate()
+            self.request_mode_tables(monitors_list)
         except Exception as e:
             logging.error(f"Error getting monitors: {e}")
-        
+        self.monitor_native_resolutions = self.controller.native_resolutions
         return monitors_list
 
-    def update_monitor_controls(self):
-        """更新监视器控制界面"""
-        # 清空动态按钮
-        while self.dynamic_buttons_layout.count():
-            child = self.dynamic_buttons_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-        
-        self.primary_monitor_combo.clear()
-        self.secondary_monitor_combo.clear()
+    def request_mode_tables(self, monitors: List[Dict]):
+        """缺少模式表的显示器（首次见到或插拔后）提交到执行线程读取，界面与托盘只查表"""
+        missing = [m for m in monitors if self.controller.mode_tables.peek(m) is None]
+        if missing:
+            self.submit_operation(MODE_TABLES_OPERATION, "读取显示模式列表",
+                                  self.controller.mode_tables.load, missing, self.backend)
 
-        # 创建单显示器按钮
-        for monitor in self.monitors:
-            button = QPushButton(f"仅显示 {monitor['description']}")
-            button.setMinimumHeight(35)
-            button.clicked.connect(
-                lambda checked, num=monitor['id']: self.execute_async_operation(
-                    self.switch_to_single_display, num)
-            )
-            self.dynamic_buttons_layout.addWidget(button)
+    def on_mode_tables_loaded(self):
+        """模式表读取完成（GUI 线程）：填充模式下拉框并同步托盘菜单的模式子菜单"""
+        if not self.monitors_loaded:
+            return
+        self.refresh_mode_choices()
+        self.monitors_updated.emit()
+
+    def update_monitor_controls(self):
+        """更新监视器控制界面（与上一次快照比较，只增删或改名变化的控件）"""
+        self.reconcile_single_buttons()
 
         # 更新双显示器选择
         if len(self.monitors) >= 2:
             self.advanced_extend_frame.show()
-            descriptions = [m['description'] for m in self.monitors]
-            self.primary_monitor_combo.addItems(descriptions)
-            self.secondary_monitor_combo.addItems(descriptions)
-            if len(self.monitors) > 1:
-                self.secondary_monitor_combo.setCurrentIndex(1)
+            primary_changed = self.reconcile_monitor_combo(self.primary_monitor_combo, 0)
+            secondary_changed = self.reconcile_monitor_combo(self.secondary_monitor_combo, 1)
+            # 选择的显示器变化时才重新加载方向
+            if primary_changed:
+                self.load_primary_orientation()
+            if secondary_changed:
+                self.load_secondary_orientation()
         else:
             self.advanced_extend_frame.hide()
 
+        self.mode_frame.setVisible(bool(self.monitors))
+        self.reconcile_monitor_combo(self.mode_monitor_combo, 0)
+        self.refresh_mode_choices()
+
+    def reconcile_single_buttons(self):
+        """按显示器持久键增删/改名单显示器按钮，保持与 self.monitors 相同的顺序"""
+        wanted_keys = [m['key'] for m in self.monitors]
+        for monitor_key in list(self.single_buttons):
+            if monitor_key not in wanted_keys:
+                button = self.single_buttons.pop(monitor_key)
+                self.dynamic_buttons_layout.removeWidget(button)
+                button.deleteLater()
+
+        for index, monitor in enumerate(self.monitors):
+            text = f"仅显示 {monitor['description']}"
+            button = self.single_buttons.get(monitor['key'])
+            if button is None:
+                button = QPushButton(text)
+                button.setMinimumHeight(35)
+                button.clicked.connect(
+                    lambda checked, key=monitor['key']: self.request_single_display(key)
+                )
+                self.single_buttons[monitor['key']] = button
+                self.dynamic_buttons_layout.insertWidget(index, button)
+                continue
+            if button.text() != text:
+                button.setText(text)
+            if self.dynamic_buttons_layout.indexOf(button) != index:
+                self.dynamic_buttons_layout.removeWidget(button)
+                self.dynamic_buttons_layout.insertWidget(index, button)
+
+    def reconcile_monitor_combo(self, combo: QComboBox, default_index: int) -> bool:
+        """就地更新下拉框条目（itemData 为显示器持久键），按键保持原选择
+
+        返回所选显示器是否发生变化
+        """
+        previous_key = combo.currentData()
+        combo.blockSignals(True)
+        for index, monitor in enumerate(self.monitors):
+            if index < combo.count():
+                if combo.itemData(index) != monitor['key']:
+                    combo.setItemData(index, monitor['key'])
+                if combo.itemText(index) != monitor['description']:
+                    combo.setItemText(index, monitor['description'])
+            else:
+                combo.addItem(monitor['description'], monitor['key'])
+        while combo.count() > len(self.monitors):
+            combo.removeItem(combo.count() - 1)
+
+        index = combo.findData(previous_key) if previous_key is not None else -1
+        if index < 0:
+            index = min(default_index, combo.count() - 1)
+        combo.setCurrentIndex(index)
+        combo.blockSignals(False)
+        return combo.currentData() != previous_key
+
     def load_orientation_config(self) -> Dict:
         """加载方向配置"""
-        if os.path.exists(ORIENTATION_CONFIG_FILE):
-            try:
-                with open(ORIENTATION_CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logging.error(f"Failed to load orientation config: {e}")
-        return {}
+        return load_orientation_preferences(self.orientation_file)
 
     def save_orientation_config(self):
         """保存方向配置"""
-        try:
-            with open(ORIENTATION_CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.orientation_config, f, indent=4, ensure_ascii=False)
-            logging.info("Orientation config saved")
-        except Exception as e:
-            logging.error(f"Failed to save orientation config: {e}")
+        if self.orientation_file:
+            save_orientation_preferences(self.orientation_file, self.orientation_config)
 
     def load_primary_orientation(self):
         """加载主显示器方向"""
-        if self.primary_monitor_combo.currentIndex() >= 0:
-            monitor_id = self.monitors[self.primary_monitor_combo.currentIndex()]['id']
-            orientation = self.orientation_config.get(str(monitor_id), ORIENTATION_LANDSCAPE)
+        monitor_key = self.primary_monitor_combo.currentData()
+        if monitor_key is not None:
+            orientation = self.orientation_config.get(monitor_key, ORIENTATION_LANDSCAPE)
             self.primary_orientation_combo.setCurrentIndex(orientation)
 
     def load_secondary_orientation(self):
         """加载副显示器方向"""
-        if self.secondary_monitor_combo.currentIndex() >= 0:
-            monitor_id = self.monitors[self.secondary_monitor_combo.currentIndex()]['id']
-            orientation = self.orientation_config.get(str(monitor_id), ORIENTATION_LANDSCAPE)
+        monitor_key = self.secondary_monitor_combo.currentData()
+        if monitor_key is not None:
+            orientation = self.orientation_config.get(monitor_key, ORIENTATION_LANDSCAPE)
             self.secondary_orientation_combo.setCurrentIndex(orientation)
 
+    def mode_monitor(self) -> Optional[Dict]:
+        """显示模式区选中的显示器"""
+        monitor_key = self.mode_monitor_combo.currentData()
+        return next((m for m in self.monitors if m['key'] == monitor_key), None)
+
+    @staticmethod
+    def current_resolution(monitor: Dict) -> tuple:
+        """当前模式的横向宽高（模式表按横向记录）"""
+        return oriented_size(monitor['width'], monitor['height'], monitor['orientation'])
+
+    def refresh_mode_choices(self):
+        """选中的显示器或其模式表变化时才重新填充，刷新不会重置用户尚未应用的选择"""
+        monitor = self.mode_monitor()
+        table = self.controller.mode_tables.peek(monitor) if monitor is not None else None
+        key = monitor['key'] if monitor is not None else None
+        if self.mode_choices_source is None:
+            self.load_mode_choices()
+            return
+        loaded_key, loaded_table = self.mode_choices_source
+        if key != loaded_key or table is not loaded_table:
+            self.load_mode_choices()
+
+    def load_mode_choices(self):
+        """按选中显示器的模式表填充分辨率（只查缓存，不调用后端），选中当前分辨率"""
+        monitor = self.mode_monitor()
+        table = self.controller.mode_tables.peek(monitor) if monitor is not None else None
+        self.mode_choices_source = (monitor['key'] if monitor is not None else None, table)
+        self.resolution_combo.blockSignals(True)
+        self.resolution_combo.clear()
+        if table is not None:
+            resolutions = table.resolutions()
+            for width, height in resolutions:
+                self.resolution_combo.addItem(f"{width}x{height}", (width, height))
+            current = self.current_resolution(monitor)
+            self.resolution_combo.setCurrentIndex(resolutions.index(current) if current in resolutions else 0)
+        self.resolution_combo.blockSignals(False)
+        self.load_refresh_choices()
+        if monitor is not None:
+            policy = self.controller.mode_policies.get(monitor['key'], DEFAULT_MODE_POLICY)
+            self.mode_policy_combo.setCurrentIndex(self.mode_policy_combo.findData(policy.kind))
+
+    def load_refresh_choices(self):
+        """填充所选分辨率支持的刷新率；是当前分辨率时选中当前刷新率，否则选最高"""
+        monitor = self.mode_monitor()
+        table = self.controller.mode_tables.peek(monitor) if monitor is not None else None
+        resolution = self.resolution_combo.currentData()
+        self.refresh_combo.clear()
+        if table is not None and resolution is not None:
+            for frequency in table.refresh_rates(*resolution):
+                self.refresh_combo.addItem(f"{frequency}Hz", frequency)
+            if resolution == self.current_resolution(monitor):
+                self.refresh_combo.setCurrentIndex(max(self.refresh_combo.findData(monitor['frequency']), 0))
+        self.btn_apply_mode.setEnabled(self.refresh_combo.count() > 0)
+
+    def apply_mode_async(self):
+        """异步应用选中的分辨率与刷新率"""
+        monitor_key = self.mode_monitor_combo.currentData()
+        resolution = self.resolution_combo.currentData()
+        frequency = self.refresh_combo.currentData()
+        if monitor_key is None or resolution is None or frequency is None:
+            return
+        if self.mode_policy_combo.currentData() == MODE_POLICY_PREFERRED:
+            # “使用所选模式”：扩展时也恢复到最近一次手动应用的模式
+            self.set_mode_policy()
+        self.request_set_mode(monitor_key, *resolution, frequency)
+
+    def set_mode_policy(self):
+        """保存选中显示器的模式策略；“使用所选模式”记录当前选择的分辨率与刷新率"""
+        monitor_key = self.mode_monitor_combo.currentData()
+        kind = self.mode_policy_combo.currentData()
+        if monitor_key is None:
+            return
+        resolution = self.resolution_combo.currentData()
+        if kind == MODE_POLICY_PREFERRED and resolution is not None:
+            policy = ModePolicy(kind, *resolution, self.refresh_combo.currentData() or 0)
+        elif kind == MODE_POLICY_PREFERRED:
+            return  # 模式表尚未读取，没有可记录的模式
+        else:
+            policy = ModePolicy(kind)
+        self.controller.mode_policies[monitor_key] = policy
+        logging.info(f"Mode policy for {monitor_key}: {policy}")
+        if self.mode_policies_file:
+            save_mode_policies(self.mode_policies_file, self.controller.mode_policies)
+
     def apply_advanced_extend_async(self):
         """异步应用高级扩展设置"""
-        primary_idx = self.primary_monitor_combo.currentIndex()
-        secondary_idx = self.secondary_monitor_combo.currentIndex()
+        primary_key = self.primary_monitor_combo.currentData()
+        secondary_key = self.secondary_monitor_combo.currentData()
 
-        if primary_idx == secondary_idx:
+        if primary_key == secondary_key:
             QMessageBox.warning(self, "选择错误", "主显示器和扩展副屏不能是同一台显示器！")
             return
         
-        primary_monitor_num = self.monitors[primary_idx]['id']
-        secondary_monitor_num = self.monitors[secondary_idx]['id']
-        
         primary_orientation = self.primary_orientation_combo.currentIndex()
         secondary_orientation = self.secondary_orientation_combo.currentIndex()
         
         # 保存方向配置
-        self.orientation_config[str(primary_monitor_num)] = primary_orientation
-        self.orientation_config[str(secondary_monitor_num)] = secondary_orientation
+        self.orientation_config[primary_key] = primary_orientation
+        self.orientation_config[secondary_key] = secondary_orientation
         self.save_orientation_config()
         
-        # 异步执行
-        self.execute_async_operation(
+        # 异步执行；按持久键提交，执行时再解析编号
+        self.submit_operation(
+            TOPOLOGY_OPERATION,
+            f"扩展 显示器 {primary_key} + 显示器 {secondary_key}",
             self.extend_two_monitors_with_orientation,
-            primary_monitor_num, secondary_monitor_num,
+            primary_key, secondary_key,
             primary_orientation, secondary_orientation
         )
 
-    def set_monitor_orientation(self, device_name: str, orientation: int) -> bool:
-        """设置显示器方向（优化版）"""
-        try:
-            if device_name not in self.monitor_native_resolutions:
-                logging.error(f"Native resolution not found for {device_name}")
-                return False
-            
-            native_res = self.monitor_native_resolutions[device_name]
-            native_width = native_res['width']
-            native_height = native_res['height']
-            
-            current_settings = win32api.EnumDisplaySettings(device_name, win32con.ENUM_CURRENT_SETTINGS)
-            current_settings.DisplayOrientation = orientation
-            
-            # 根据方向设置分辨率
-            if orientation in [ORIENTATION_PORTRAIT, ORIENTATION_PORTRAIT_FLIPPED]:
-                current_settings.PelsWidth = native_height
-                current_settings.PelsHeight = native_width
-            else:
-                current_settings.PelsWidth = native_width
-                current_settings.PelsHeight = native_height
-            
-            # 一次性应用更改（使用 CDS_UPDATEREGISTRY 保存到注册表）
-            result = win32api.ChangeDisplaySettingsEx(
-                device_name,
-                current_settings,
-                win32con.CDS_UPDATEREGISTRY | win32con.CDS_NORESET
-            )
-            
-            if result == win32con.DISP_CHANGE_SUCCESSFUL:
-                logging.info(f"Orientation set for {device_name}: {ORIENTATION_NAMES[orientation]}")
-                return True
-            else:
-                logging.error(f"Failed to set orientation: error code {result}")
-                return False
-                
-        except Exception as e:
-            logging.error(f"Exception in set_monitor_orientation: {e}")
-            return False
-
-    def extend_two_monitors_with_orientation(self, primary_num: int, secondary_num: int, 
+    def extend_two_monitors_with_orientation(self, primary: MonitorRef, secondary: MonitorRef,
                                             primary_orientation: int, secondary_orientation: int):
-        """扩展双显示器（优化版 - 减少延迟）"""
-        logging.info(f"Extending monitors {primary_num} and {secondary_num}")
-        
-        try:
-            # 步骤1：使用 MultiMonitorTool 批量配置
-            cmds = [TOOL_PATH]
-            for m in self.monitors:
-                if m['id'] not in (primary_num, secondary_num):
-                    cmds.extend(['/disable', str(m['id'])])
-            cmds.extend(['/enable', str(primary_num), '/enable', str(secondary_num), 
-                        '/setprimary', str(primary_num)])
-            subprocess.run(cmds, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            
-            # 步骤2：批量设置方向（使用 NORESET 标志延迟应用）
-            primary_device = self.monitors[primary_num - 1]['device_name']
-            secondary_device = self.monitors[secondary_num - 1]['device_name']
-            
-            result1 = self.set_monitor_orientation(primary_device, primary_orientation)
-            result2 = self.set_monitor_orientation(secondary_device, secondary_orientation)
-            
-            # 步骤3：一次性应用所有更改
-            win32api.ChangeDisplaySettingsEx(None, None, 0)
-            
-            # 步骤4：启用扩展模式
-            subprocess.run(['DisplaySwitch.exe', '/extend'], 
-                         check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            
-            if result1 and result2:
-                logging.info("Extend with orientation successful")
-            else:
-                logging.warning("Extend completed but some orientations may not be applied")
-            
-        except Exception as e:
-            logging.error(f"Extend failed: {e}")
-            raise
+        """扩展双显示器（按当前状态规划，只执行需要的步骤；模式策略选出的模式随同一次应用生效）"""
+        return self.controller.extend_pair(primary, secondary,
+                                           primary_orientation, secondary_orientation)
+
+    def set_display_mode(self, monitor: MonitorRef, width: int, height: int, frequency: Optional[int]):
+        """设置分辨率与刷新率（模式表查找，不重新枚举模式列表）"""
+        return self.controller.set_mode(monitor, width, height, frequency)
 
-    def switch_to_single_display(self, monitor_num: int):
+    def switch_to_single_display(self, monitor: MonitorRef):
         """切换到单显示器（优化版）"""
-        logging.info(f"Switching to monitor {monitor_num}")
-        try:
-            cmds = [TOOL_PATH]
-            for m in self.monitors:
-                if m['id'] != monitor_num:
-                    cmds.extend(['/disable', str(m['id'])])
-            cmds.extend(['/enable', str(monitor_num), '/setprimary', str(monitor_num)])
-            subprocess.run(cmds, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            logging.info(f"Switched to monitor {monitor_num} successfully")
-        except Exception as e:
-            logging.error(f"Failed to switch: {e}")
-            raise
+        return self.controller.single_display(monitor)
 
     def save_config(self):
         """保存配置"""
-        try:
-            subprocess.run([TOOL_PATH, '/SaveConfig', CONFIG_FILE], 
-                         check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            logging.info("Config saved")
-        except Exception as e:
-            logging.error(f"Save config failed: {e}")
-            raise
+        self.controller.save_config(CONFIG_FILE)
 
     def load_config(self):
         """加载配置"""
-        if not os.path.exists(CONFIG_FILE):
-            raise FileNotFoundError("无已保存的配置文件")
-        try:
-            subprocess.run([TOOL_PATH, '/LoadConfig', CONFIG_FILE], 
-                         check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            logging.info("Config loaded")
-        except Exception as e:
-            logging.error(f"Load config failed: {e}")
-            raise
+        return self.controller.load_config(CONFIG_FILE)
 
     @pyqtSlot(str)
     def handle_switch_mode_signal(self, arg: str):
         """处理托盘图标的切换模式信号"""
-        self.execute_async_operation(self.run_displayswitch_legacy, arg)
+        self.request_display_switch(arg)
 
     def run_displayswitch_legacy(self, arg: str):
         """执行Windows DisplaySwitch命令"""
+        return self.controller.display_switch(arg)
+
+    @pyqtSlot()
+    def export_metrics(self):
+        """导出各操作/步骤的耗时直方图（JSON 与 Prometheus 文本格式）"""
         try:
-            subprocess.run(['DisplaySwitch.exe', arg], 
-                         check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            logging.info(f"DisplaySwitch {arg} executed successfully")
+            json_path, prom_path = metrics.registry.export(METRICS_DIR)
+            self.event_log.log('SUCCESS', f"性能指标已导出: {json_path}, {prom_path}")
+            logging.info(f"Metrics exported to {METRICS_DIR}")
         except Exception as e:
-            logging.error(f"DisplaySwitch failed: {e}")
-            raise
+            logging.error(f"Metrics export failed: {e}")
+            QMessageBox.warning(self, "错误", f"导出性能指标失败: {e}")
 
     @pyqtSlot()
     def quit_application(self):
         """退出应用程序"""
         logging.info("Application quit by user")
+        if self.change_source is not None:
+            self.change_source.stop()
+        # 等待执行中的拓扑更改完成，不在中途终止
+        self.executor.shutdown()
         QApplication.instance().quit()
 
     @pyqtSlot(int)
@@ -635,11 +1012,12 @@ class MonitorApp(QMainWindow):
                 app_path = f'python.exe "{app_path}"'
             
             command = f'cmd /c "timeout /t 60 && {app_path} --silent"'
+            winreg = load_winreg()
             key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, STARTUP_REG_KEY, 0, winreg.KEY_SET_VALUE)
             winreg.SetValueEx(key, APP_NAME, 0, winreg.REG_SZ, command)
             winreg.CloseKey(key)
             
-            self.info_display.append("\n[SUCCESS] 已启用开机自启动 (延时60秒)")
+            self.event_log.log('SUCCESS', "已启用开机自启动 (延时60秒)")
             logging.info("Startup enabled")
             
         except Exception as e:
@@ -650,105 +1028,48 @@ class MonitorApp(QMainWindow):
 
     def remove_from_startup(self):
         """从开机启动移除"""
+        winreg = load_winreg()
         try:
             key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, STARTUP_REG_KEY, 0, winreg.KEY_SET_VALUE)
             winreg.DeleteValue(key, APP_NAME)
             winreg.CloseKey(key)
-            self.info_display.append("\n[SUCCESS] 已禁用开机自启动")
+            self.event_log.log('SUCCESS', "已禁用开机自启动")
             logging.info("Startup disabled")
         except FileNotFoundError:
             pass
         except Exception as e:
             QMessageBox.warning(self, "错误", f"禁用自启动失败: {e}")
 
-    def check_startup_status(self):
-        """检查开机启动状态"""
+    def read_startup_status(self) -> Optional[bool]:
+        """读取开机启动状态（不访问控件，可在后台线程调用）；None 表示不可用"""
+        winreg = load_winreg()
+        if winreg is None:
+            return None
         try:
             key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, STARTUP_REG_KEY, 0, winreg.KEY_READ)
             value, regtype = winreg.QueryValueEx(key, APP_NAME)
             winreg.CloseKey(key)
-            self.startup_checkbox.blockSignals(True)
-            self.startup_checkbox.setChecked(True)
-            self.startup_checkbox.blockSignals(False)
+            return True
         except FileNotFoundError:
-            self.startup_checkbox.blockSignals(True)
-            self.startup_checkbox.setChecked(False)
-            self.startup_checkbox.blockSignals(False)
-
-
-# --- 托盘图标设置 ---
-def setup_tray_icon(main_window):
-    """设置系统托盘图标"""
-    icon_path = 'icon.png'
-    if os.path.exists(icon_path):
-        try:
-            icon_image = Image.open(icon_path)
-        except:
-            icon_image = create_dummy_icon()
-    else:
-        icon_image = create_dummy_icon()
-
-    def on_show_window(icon, item):
-        main_window.toggle_window_signal.emit()
-
-    def on_quit(icon, item):
-        icon.stop()
-        main_window.quit_app_signal.emit()
-
-    def on_extend(icon, item):
-        main_window.switch_mode_signal.emit('/extend')
-
-    def on_clone(icon, item):
-        main_window.switch_mode_signal.emit('/clone')
-
-    def create_single_monitor_items():
-        items = []
-        for monitor in main_window.monitors:
-            def make_handler(monitor_num):
-                def handler(icon, item):
-                    main_window.execute_async_operation(
-                        main_window.switch_to_single_display, monitor_num
-                    )
-                return handler
-            items.append(pystray.MenuItem(
-                f'仅 {monitor["description"]}', 
-                make_handler(monitor['id'])
-            ))
-        return items
-
-    menu_items = [
-        pystray.MenuItem('显示主窗口', on_show_window, default=True),
-        pystray.Menu.SEPARATOR,
-        pystray.MenuItem('扩展模式(所有)', on_extend),
-        pystray.MenuItem('复制模式(所有)', on_clone),
-        pystray.Menu.SEPARATOR,
-    ]
-    
-    if len(main_window.monitors) > 0:
-        menu_items.extend(create_single_monitor_items())
-        menu_items.append(pystray.Menu.SEPARATOR)
-    
-    menu_items.append(pystray.MenuItem('退出', on_quit))
-
-    tray_menu = pystray.Menu(*menu_items)
-    tray_icon = pystray.Icon(
-        "monitor_manager", 
-        icon_image, 
-        "显示器切换工具 V7.0", 
-        tray_menu
-    )
-
-    def run_tray():
-        tray_icon.run()
+            return False
+        except Exception as e:
+            logging.error(f"Error reading startup status: {e}")
+            return False
 
-    from threading import Thread
-    tray_thread = Thread(target=run_tray, daemon=True)
-    tray_thread.start()
+    @pyqtSlot(object)
+    def apply_startup_status(self, enabled: Optional[bool]):
+        if enabled is None:
+            self.startup_checkbox.setEnabled(False)
+            return
+        self.startup_checkbox.blockSignals(True)
+        self.startup_checkbox.setChecked(enabled)
+        self.startup_checkbox.blockSignals(False)
 
 
 # --- 主程序入口 ---
 if __name__ == '__main__':
-    if not os.path.exists(TOOL_PATH):
+    backend_name = os.environ.get(BACKEND_ENV_VAR, 'win32')
+    if backend_name != 'simulated' and not os.path.exists(TOOL_PATH):
         print("=" * 70)
         print("错误: 缺少 MultiMonitorTool.exe!")
         print("=" * 70)
@@ -761,23 +1082,72 @@ if __name__ == '__main__':
         input("\n按任意键退出...")
         sys.exit(1)
     
+    log_pipeline = setup_logging(json_lines=True if '--json-log' in sys.argv else None)
     logging.info("=== Application Started V7.0 (Performance Optimized) ===")
+    logging.info(f"Logging to {', '.join(log_pipeline.paths)}")
     
     is_silent = '--silent' in sys.argv
     
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
+    startup.mark('qapplication')
     
     # 设置应用程序样式（可选）
     app.setStyle('Fusion')
     
-    main_window = MonitorApp()
-    setup_tray_icon(main_window)
+    backend = create_display_backend(backend_name, tool_path=TOOL_PATH)
+    logging.info(f"Display backend: {backend.name}")
+    metrics.registry.set_label('backend', backend.name)
+    startup.mark('backend')
+    
+    if startup.enabled:
+        # 托盘（静默启动时）与窗口都出现后写出报告并退出
+        startup.expected = ('tray', 'interactive') if is_silent else ('tray', 'window', 'interactive')
+        startup.info.update({'silent': is_silent, 'backend': backend.name,
+                             'frozen': bool(getattr(sys, 'frozen', False)),
+                             'python': sys.version.split()[0]})
+
+        def write_startup_report(profiler):
+            report = profiler.write(STARTUP_PROFILE_FILE)
+            print(format_report(report))
+            print(f"\n报告已写入 {STARTUP_PROFILE_FILE}")
+            logging.info(f"Startup profile: tray {report['time_to_tray_ms']} ms, "
+                         f"window {report['time_to_window_ms']} ms, "
+                         f"interactive {report['time_to_interactive_ms']} ms, budget {STARTUP_BUDGET_MS} ms")
+            main_window.quit_app_signal.emit()
+
+        startup.on_complete = write_startup_report
+    
+    main_window = MonitorApp(backend, create_change_source(backend), started_at=STARTUP_T0,
+                             snapshot_file=SNAPSHOT_FILE, identity_file=IDENTITY_FILE,
+                             orientation_file=ORIENTATION_CONFIG_FILE, native_modes_file=NATIVE_MODES_FILE,
+                             mode_policies_file=MODE_POLICIES_FILE)
+    startup.mark('window_constructed')
+    main_window.interactive.connect(lambda elapsed: startup.mark('interactive', at=STARTUP_T0 + elapsed))
+    if main_window.time_to_interactive is not None:
+        # 快照缓存已在构造期间完成渲染
+        startup.mark('interactive', at=STARTUP_T0 + main_window.time_to_interactive)
+    with startup.importing('tray (pystray, PIL)'):
+        from tray import setup_tray_icon
+    setup_tray_icon(main_window, on_ready=lambda: startup.mark('tray'))
+    with startup.importing('instance (QtNetwork)'):
+        from instance import InstanceServer
+    instance_server = InstanceServer(main_window)
+    instance_server.start()
+    if launch_request is not None:
+        # 启动时没有运行中的实例：由本实例执行命令行中的命令
+        instance_server.execute(launch_request, lambda response: logging.info(
+            f"Launch command: {ipc.format_response(response)}"))
     
     if not is_silent:
         main_window.show()
+        # 首次进入事件循环时窗口已完成显示
+        QTimer.singleShot(0, lambda: startup.mark('window'))
         logging.info("Main window displayed")
     else:
         logging.info("Starting in silent mode")
     
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    instance_server.stop()
+    log_pipeline.stop()
+    sys.exit(exit_code)
@@ -0,0 +1,37 @@
+# MonitorManager 核心库：与 GUI 无关的显示器控制逻辑
+# 导出的名称在首次访问时才导入所在模块（PEP 562）：转发命令的客户端只需
+# `from monitor_core import ipc`，不会连带加载后端、控制器等模块
+
+import importlib
+
+_EXPORTS = {
+    'ORIENTATION_LANDSCAPE': 'backend',
+    'ORIENTATION_PORTRAIT': 'backend',
+    'ORIENTATION_LANDSCAPE_FLIPPED': 'backend',
+    'ORIENTATION_PORTRAIT_FLIPPED': 'backend',
+    'PORTRAIT_ORIENTATIONS': 'backend',
+    'BACKEND_ENV_VAR': 'backend',
+    'DisplayBackend': 'backend',
+    'DisplayBackendError': 'backend',
+    'Win32DisplayBackend': 'backend',
+    'SimulatedDisplayBackend': 'backend',
+    'create_display_backend': 'backend',
+    'topology_digest': 'backend',
+    'DisplayController': 'controller',
+    'DisplayTransaction': 'controller',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
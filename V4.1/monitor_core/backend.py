@@ -0,0 +1,702 @@
+# 显示后端抽象层
+# - DisplayBackend: 枚举 / 拓扑切换 / 方向与显示模式设置 / 配置保存加载 的统一接口
+# - Win32DisplayBackend: 调用 win32api、MultiMonitorTool.exe 与 DisplaySwitch.exe
+# - SimulatedDisplayBackend: 内存中模拟 N 台显示器，支持调用延迟与异步生效，
+#   用于在非 Windows 构建机上做基准测试和回归测试
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from .edid import build_edid
+from .metrics import (timed_step, STEP_MULTIMONITORTOOL, STEP_DISPLAYSWITCH,
+                      STEP_CHANGE_SETTINGS, STEP_GLOBAL_APPLY, STEP_SET_DISPLAY_CONFIG)
+
+try:
+    import pywintypes
+    import win32api
+    import win32con
+except ImportError:  # 非 Windows 平台
+    pywintypes = None
+    win32api = None
+    win32con = None
+
+# 显示方向常量
+ORIENTATION_LANDSCAPE = 0
+ORIENTATION_PORTRAIT = 1
+ORIENTATION_LANDSCAPE_FLIPPED = 2
+ORIENTATION_PORTRAIT_FLIPPED = 3
+
+PORTRAIT_ORIENTATIONS = (ORIENTATION_PORTRAIT, ORIENTATION_PORTRAIT_FLIPPED)
+
+BACKEND_ENV_VAR = 'MONITOR_MANAGER_BACKEND'
+SIM_MONITORS_ENV_VAR = 'MONITOR_MANAGER_SIM_MONITORS'
+
+CREATE_NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+# EnumDisplayDevices 标志: 返回显示器的设备接口路径（用作稳定标识，见 identity.py）
+EDD_GET_DEVICE_INTERFACE_NAME = 0x00000001
+
+# DEVMODE.Fields: 旋转时只提交方向、分辨率与刷新率，其余保持注册表中的当前值
+DM_DISPLAYORIENTATION = 0x00000080
+DM_BITSPERPEL = 0x00040000
+DM_PELSWIDTH = 0x00080000
+DM_PELSHEIGHT = 0x00100000
+DM_DISPLAYFREQUENCY = 0x00400000
+
+# DEVMODE.DisplayFlags: 隔行扫描模式不列入模式表
+DM_INTERLACED = 0x00000002
+
+# 显示器 EDID 的注册表位置: DISPLAY\<硬件 ID>\<实例 ID>\Device Parameters\EDID
+EDID_REGISTRY_KEY = 'SYSTEM\\CurrentControlSet\\Enum\\DISPLAY\\{}\\{}\\Device Parameters'
+
+
+class DisplayBackendError(Exception):
+    """显示后端操作失败"""
+
+
+DIGEST_FIELDS = ('id', 'device_name', 'width', 'height', 'frequency', 'orientation',
+                 'position_x', 'position_y')
+
+
+def monitor_number(device_name: str) -> Optional[int]:
+    r"""显示器编号: GDI 设备名 \\.\DISPLAY3 -> 3
+
+    CCD 快照、EnumDisplayDevices 回退枚举与 MultiMonitorTool 参数统一使用这一编号
+    """
+    match = re.search(r'DISPLAY(\d+)$', device_name)
+    return int(match.group(1)) if match else None
+
+
+def gdi_device_name(monitor_num: int) -> str:
+    """显示器编号对应的 GDI 设备名"""
+    return f'\\\\.\\DISPLAY{monitor_num}'
+
+
+def topology_digest(monitors: List[Dict]) -> str:
+    """拓扑摘要：显示器集合、模式、方向或位置任一变化时改变"""
+    rows = sorted(tuple(m[field] for field in DIGEST_FIELDS) for m in monitors)
+    return hashlib.sha1(repr(rows).encode('utf-8')).hexdigest()[:16]
+
+
+# --- 后端接口 ---
+class DisplayBackend:
+    """显示后端接口
+
+    enumerate_monitors 返回的每个显示器为普通字典:
+    id, device_name, width, height, frequency, orientation,
+    position_x, position_y, is_primary, target_name, device_path
+    （target_name / device_path 无法获取时为空字符串）
+
+    atomic 为 True 的后端实现 apply_topology，一次调用完成整个拓扑切换
+    """
+    name = 'base'
+    atomic = False
+
+    def enumerate_monitors(self) -> List[Dict]:
+        """枚举当前连接到桌面的显示器"""
+        raise NotImplementedError
+
+    def read_edid(self, device_path: str) -> Optional[bytes]:
+        """读取显示器的原始 EDID；不支持或读取失败时返回 None"""
+        return None
+
+    def preferred_mode(self, device_name: str) -> Optional[Tuple[int, int, int]]:
+        """显示模式列表中的原生模式 (横向宽, 高, 刷新率)；不支持时返回 None"""
+        return None
+
+    def list_modes(self, device_name: str) -> List[Tuple[int, int, int, int]]:
+        """支持的全部显示模式 (横向宽, 高, 刷新率, 色深)；逐项枚举，开销大，由 modes.ModeTableCache 缓存"""
+        return []
+
+    def topology_digest(self) -> str:
+        """当前拓扑摘要，用于判断是否真的发生了变化"""
+        return topology_digest(self.enumerate_monitors())
+
+    def set_topology(self, enable: List[int], disable: List[int],
+                     primary: Optional[int] = None):
+        """启用/禁用显示器并设置主显示器（对应 MultiMonitorTool）"""
+        raise NotImplementedError
+
+    def set_orientation(self, device_name: str, orientation: int,
+                        width: int, height: int, frequency: int = 0) -> bool:
+        """写入方向与分辨率（frequency 为 0 时由驱动选择），延迟到 apply_pending 时生效"""
+        raise NotImplementedError
+
+    def set_display_mode(self, device_name: str, width: int, height: int,
+                         frequency: int, bits_per_pixel: int = 0) -> bool:
+        """写入分辨率（当前方向下的宽高）与刷新率，方向不变；延迟到 apply_pending 时生效"""
+        raise NotImplementedError
+
+    def apply_pending(self):
+        """一次性应用所有延迟的显示设置"""
+        raise NotImplementedError
+
+    def display_switch(self, arg: str):
+        """执行 DisplaySwitch 模式切换（/extend, /clone ...）"""
+        raise NotImplementedError
+
+    def apply_topology(self, active: List[int], primary: int, orientations: Dict[int, int],
+                       modes: Optional[Dict[int, Tuple[int, int, int, int]]] = None):
+        """原子地应用扩展拓扑: 仅启用 active，primary 为主显示器，
+        orientations 中未列出的显示器保持当前方向，
+        modes {编号: (横向宽, 高, 刷新率, 色深)} 中未列出的显示器保持当前模式"""
+        raise NotImplementedError
+
+    def save_config(self, path: str):
+        """保存当前显示配置到文件"""
+        raise NotImplementedError
+
+    def load_config(self, path: str):
+        """从文件加载显示配置"""
+        raise NotImplementedError
+
+
+# --- Windows 后端 ---
+class Win32DisplayBackend(DisplayBackend):
+    """基于 win32api 与外部工具的真实后端"""
+    name = 'win32'
+
+    def __init__(self, tool_path: str):
+        if win32api is None:
+            raise DisplayBackendError("win32api 不可用，无法使用 Win32 后端")
+        self.tool_path = tool_path
+        # 优先使用 QueryDisplayConfig 快照枚举（Windows 7 及以上）
+        try:
+            from .ccd import DisplayConfigReader
+            self.reader = DisplayConfigReader()
+        except Exception as e:
+            logging.warning(f"QueryDisplayConfig unavailable, using EnumDisplayDevices: {e}")
+            self.reader = None
+
+    def _run(self, cmds: List[str], step: str = STEP_MULTIMONITORTOOL):
+        with timed_step(step):
+            subprocess.run(cmds, check=True, creationflags=CREATE_NO_WINDOW)
+
+    def enumerate_monitors(self) -> List[Dict]:
+        if self.reader is not None:
+            try:
+                return [monitor._asdict() for monitor in self.reader.snapshot()]
+            except Exception as e:
+                logging.warning(f"QueryDisplayConfig snapshot failed, falling back: {e}")
+        return self.enumerate_monitors_legacy()
+
+    def enumerate_monitors_legacy(self) -> List[Dict]:
+        """EnumDisplayDevices + EnumDisplaySettings 循环（3N+1 次调用）"""
+        monitors_list = []
+        i = 0
+        while True:
+            try:
+                device = win32api.EnumDisplayDevices(None, i)
+            except Exception:
+                break
+
+            if device.StateFlags & win32con.DISPLAY_DEVICE_ATTACHED_TO_DESKTOP:
+                settings = win32api.EnumDisplaySettings(device.DeviceName, win32con.ENUM_CURRENT_SETTINGS)
+                try:
+                    device_path = win32api.EnumDisplayDevices(
+                        device.DeviceName, 0, EDD_GET_DEVICE_INTERFACE_NAME).DeviceID
+                except Exception:
+                    device_path = ''
+                monitors_list.append({
+                    'id': monitor_number(device.DeviceName) or i + 1,
+                    'device_name': device.DeviceName,
+                    'width': settings.PelsWidth,
+                    'height': settings.PelsHeight,
+                    'frequency': settings.DisplayFrequency,
+                    'orientation': settings.DisplayOrientation,
+                    'position_x': settings.Position_x,
+                    'position_y': settings.Position_y,
+                    'is_primary': settings.Position_x == 0 and settings.Position_y == 0,
+                    'target_name': '',
+                    'device_path': device_path,
+                })
+            i += 1
+        return monitors_list
+
+    def read_edid(self, device_path: str) -> Optional[bytes]:
+        parts = device_path.split('#')
+        if len(parts) < 3:
+            return None
+        import winreg
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, EDID_REGISTRY_KEY.format(parts[1], parts[2])) as key:
+                value, _ = winreg.QueryValueEx(key, 'EDID')
+            return bytes(value)
+        except OSError:
+            return None
+
+    def set_topology(self, enable: List[int], disable: List[int],
+                     primary: Optional[int] = None):
+        # 按 GDI 设备名指定显示器，不依赖 MultiMonitorTool 自己的编号
+        cmds = [self.tool_path]
+        for num in disable:
+            cmds.extend(['/disable', gdi_device_name(num)])
+        for num in enable:
+            cmds.extend(['/enable', gdi_device_name(num)])
+        if primary is not None:
+            cmds.extend(['/setprimary', gdi_device_name(primary)])
+        self._run(cmds)
+
+    def list_modes(self, device_name: str) -> List[Tuple[int, int, int, int]]:
+        """EnumDisplaySettings 按序号递增直到失败（每个模式一次调用）；纵向列出的模式按横向记录"""
+        modes = []
+        i = 0
+        while True:
+            try:
+                mode = win32api.EnumDisplaySettings(device_name, i)
+            except Exception:
+                break
+            if not mode.PelsWidth:
+                break
+            if not mode.DisplayFlags & DM_INTERLACED:
+                width, height = max(mode.PelsWidth, mode.PelsHeight), min(mode.PelsWidth, mode.PelsHeight)
+                modes.append((width, height, mode.DisplayFrequency, mode.BitsPerPel))
+            i += 1
+        return modes
+
+    def preferred_mode(self, device_name: str) -> Optional[Tuple[int, int, int]]:
+        """模式列表中面积最大的模式，同分辨率取最高刷新率"""
+        modes = self.list_modes(device_name)
+        if not modes:
+            return None
+        width, height, frequency, _ = max(modes, key=lambda m: (m[0] * m[1], m[2]))
+        return width, height, frequency
+
+    def set_orientation(self, device_name: str, orientation: int,
+                        width: int, height: int, frequency: int = 0) -> bool:
+        # 宽高来自原生模式缓存，直接构造 DEVMODE，不再查询当前设置
+        devmode = pywintypes.DEVMODEType()
+        devmode.DisplayOrientation = orientation
+        devmode.Fields = DM_DISPLAYORIENTATION
+        return self._stage_mode(device_name, devmode, width, height, frequency)
+
+    def set_display_mode(self, device_name: str, width: int, height: int,
+                         frequency: int, bits_per_pixel: int = 0) -> bool:
+        # 目标模式来自模式表，只提交分辨率、刷新率与色深，方向保持注册表中的当前值
+        devmode = pywintypes.DEVMODEType()
+        devmode.Fields = 0
+        if bits_per_pixel:
+            devmode.BitsPerPel = bits_per_pixel
+            devmode.Fields |= DM_BITSPERPEL
+        return self._stage_mode(device_name, devmode, width, height, frequency)
+
+    def _stage_mode(self, device_name: str, devmode, width: int, height: int, frequency: int) -> bool:
+        devmode.PelsWidth = width
+        devmode.PelsHeight = height
+        devmode.Fields |= DM_PELSWIDTH | DM_PELSHEIGHT
+        if frequency:
+            devmode.DisplayFrequency = frequency
+            devmode.Fields |= DM_DISPLAYFREQUENCY
+
+        # 使用 CDS_UPDATEREGISTRY 保存到注册表，CDS_NORESET 延迟应用
+        with timed_step(STEP_CHANGE_SETTINGS):
+            result = win32api.ChangeDisplaySettingsEx(
+                device_name,
+                devmode,
+                win32con.CDS_UPDATEREGISTRY | win32con.CDS_NORESET
+            )
+        if result != win32con.DISP_CHANGE_SUCCESSFUL:
+            logging.error(f"ChangeDisplaySettingsEx failed for {device_name}: error code {result}")
+            return False
+        return True
+
+    def apply_pending(self):
+        with timed_step(STEP_GLOBAL_APPLY):
+            win32api.ChangeDisplaySettingsEx(None, None, 0)
+
+    def display_switch(self, arg: str):
+        self._run(['DisplaySwitch.exe', arg], STEP_DISPLAYSWITCH)
+
+    def save_config(self, path: str):
+        self._run([self.tool_path, '/SaveConfig', path])
+
+    def load_config(self, path: str):
+        self._run([self.tool_path, '/LoadConfig', path])
+
+
+# --- 模拟后端 ---
+class SimulatedDisplayBackend(DisplayBackend):
+    """内存中的模拟后端
+
+    api_latency: 每次 Win32 API 调用的耗时（秒）
+    subprocess_latency: 每次外部进程（MultiMonitorTool / DisplaySwitch）的耗时（秒）
+    settle_delay: 更改提交后到 enumerate_monitors 可见的延迟（秒），模拟 Windows 异步生效
+    atomic: 模拟 CCD 后端，apply_topology 以单次 API 调用完成
+    """
+    name = 'simulated'
+
+    DEFAULT_MODES = [
+        (2560, 1440, 165),
+        (1920, 1080, 60),
+        (1920, 1080, 144),
+        (3840, 2160, 60),
+    ]
+
+    # list_modes 生成的模式: 不超过原生分辨率的常见分辨率 x 不超过原生刷新率的常见刷新率 x 色深
+    STANDARD_RESOLUTIONS = [
+        (3840, 2160), (3200, 1800), (2560, 1600), (2560, 1440), (1920, 1200), (1920, 1080),
+        (1680, 1050), (1600, 900), (1440, 900), (1366, 768), (1280, 1024), (1280, 800),
+        (1280, 720), (1024, 768), (800, 600),
+    ]
+    STANDARD_REFRESH_RATES = [165, 144, 120, 100, 75, 60, 59, 50]
+    BITS_PER_PIXEL = [8, 16, 32]
+
+    def __init__(self, monitor_count: int = 2, api_latency: float = 0.0,
+                 subprocess_latency: float = 0.0, settle_delay: float = 0.0,
+                 modes: Optional[List[tuple]] = None, atomic: bool = False):
+        self.atomic = atomic
+        self.api_latency = api_latency
+        self.subprocess_latency = subprocess_latency
+        self.settle_delay = settle_delay
+        self.lock = threading.RLock()
+        self.stats = {'subprocess_spawns': 0, 'api_calls': 0}
+        self._change_listeners = []
+
+        modes = modes or self.DEFAULT_MODES
+        self._connected = []
+        for i in range(monitor_count):
+            width, height, frequency = modes[i % len(modes)]
+            self._connected.append({
+                'id': i + 1,
+                'device_name': f'\\\\.\\DISPLAY{i + 1}',
+                'native_width': width,
+                'native_height': height,
+                'frequency': frequency,
+                'target_name': f'SIM{i + 1:04d}',
+                'device_path': f'\\\\?\\DISPLAY#SIM{i + 1:04d}#{i + 1}',
+                'edid': build_edid('SIM', i + 1, 1000 + i + 1, f'SIM PANEL {i + 1}',
+                                   width, height, frequency),
+                'connected': True,
+            })
+
+        # 每台显示器的目标状态；_visible 为 enumerate 可见的已生效状态
+        self._target = {
+            m['id']: {
+                'active': True,
+                'orientation': ORIENTATION_LANDSCAPE,
+                'primary': m['id'] == 1,
+                'clone': False,
+                'mode': None,  # 非原生模式时为横向 [宽, 高, 刷新率]
+            }
+            for m in self._connected
+        }
+        self._pending_orientation = {}
+        self._pending_mode = {}
+        self._visible = self._copy_state(self._target)
+        self._settle_deadline = 0.0
+
+    # --- 内部工具 ---
+    @staticmethod
+    def _copy_state(state: Dict) -> Dict:
+        return {k: dict(v) for k, v in state.items()}
+
+    def _api_call(self, step: Optional[str] = None):
+        self.stats['api_calls'] += 1
+        if step is None:
+            # 枚举等查询调用不单独计时
+            if self.api_latency:
+                time.sleep(self.api_latency)
+            return
+        with timed_step(step):
+            if self.api_latency:
+                time.sleep(self.api_latency)
+
+    def _spawn(self, step: str = STEP_MULTIMONITORTOOL):
+        self.stats['subprocess_spawns'] += 1
+        with timed_step(step):
+            if self.subprocess_latency:
+                time.sleep(self.subprocess_latency)
+
+    def _topology_call(self, step: str = STEP_MULTIMONITORTOOL):
+        """拓扑切换: CCD 为进程内 API 调用，否则为外部进程"""
+        if self.atomic:
+            self._api_call(STEP_SET_DISPLAY_CONFIG)
+        else:
+            self._spawn(step)
+
+    def _commit(self, reason: str = 'WM_DISPLAYCHANGE'):
+        """提交目标状态，settle_delay 后对枚举可见并通知监听者"""
+        if self.settle_delay:
+            self._settle_deadline = time.monotonic() + self.settle_delay
+            timer = threading.Timer(self.settle_delay, self._notify_change, (reason,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._visible = self._copy_state(self._target)
+            self._notify_change(reason)
+
+    def _notify_change(self, reason: str):
+        with self.lock:
+            self._settle()
+            listeners = list(self._change_listeners)
+        for listener in listeners:
+            listener(reason)
+
+    def _settle(self):
+        if self._settle_deadline and time.monotonic() >= self._settle_deadline:
+            self._visible = self._copy_state(self._target)
+            self._settle_deadline = 0.0
+
+    def _ensure_primary(self):
+        connected = {m['id'] for m in self._connected if m['connected']}
+        active = [mid for mid, s in self._target.items() if s['active'] and mid in connected]
+        if active and not any(self._target[mid]['primary'] for mid in active):
+            self._target[active[0]]['primary'] = True
+
+    def _by_device(self, device_name: str) -> Optional[Dict]:
+        for m in self._connected:
+            if m['device_name'] == device_name:
+                return m
+        return None
+
+    def read_edid(self, device_path: str) -> Optional[bytes]:
+        # 真实后端为一次注册表读取，耗时可忽略，不计入 API 调用
+        with self.lock:
+            return next((m['edid'] for m in self._connected if m['device_path'] == device_path), None)
+
+    def add_change_listener(self, listener):
+        """注册变更回调（模拟 WM_DISPLAYCHANGE / WM_DEVICECHANGE），在生效时调用"""
+        with self.lock:
+            self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener):
+        with self.lock:
+            if listener in self._change_listeners:
+                self._change_listeners.remove(listener)
+
+    def hotplug(self, monitor_num: int, connected: bool):
+        """模拟显示器插拔"""
+        with self.lock:
+            for m in self._connected:
+                if m['id'] == monitor_num:
+                    m['connected'] = connected
+            state = self._target[monitor_num]
+            state['active'] = connected
+            if not connected:
+                state['primary'] = False
+            self._ensure_primary()
+            self._commit('WM_DEVICECHANGE')
+
+    def reset_stats(self):
+        """清零调用计数"""
+        with self.lock:
+            self.stats = {'subprocess_spawns': 0, 'api_calls': 0}
+
+    def is_settled(self) -> bool:
+        """所有已提交的更改是否均已生效"""
+        with self.lock:
+            self._settle()
+            return self._settle_deadline == 0.0
+
+    # --- DisplayBackend 接口 ---
+    def enumerate_monitors(self) -> List[Dict]:
+        with self.lock:
+            self._api_call()
+            self._settle()
+            monitors_list = []
+            # 主显示器位于 (0, 0)，其余依次向右排列；复制模式下全部重叠在 (0, 0)
+            active = [m for m in self._connected
+                      if m['connected'] and self._visible[m['id']]['active']]
+            active.sort(key=lambda m: not self._visible[m['id']]['primary'])
+            x_offset = 0
+            for m in active:
+                state = self._visible[m['id']]
+                width, height, frequency = state['mode'] or (m['native_width'], m['native_height'],
+                                                             m['frequency'])
+                if state['orientation'] in PORTRAIT_ORIENTATIONS:
+                    width, height = height, width
+                if state['clone']:
+                    position_x = 0
+                else:
+                    position_x = x_offset
+                    x_offset += width
+                monitors_list.append({
+                    'id': m['id'],
+                    'device_name': m['device_name'],
+                    'width': width,
+                    'height': height,
+                    'frequency': frequency,
+                    'orientation': state['orientation'],
+                    'position_x': position_x,
+                    'position_y': 0,
+                    'is_primary': position_x == 0,
+                    'target_name': m['target_name'],
+                    'device_path': m['device_path'],
+                })
+            monitors_list.sort(key=lambda m: m['id'])
+            return monitors_list
+
+    def set_topology(self, enable: List[int], disable: List[int],
+                     primary: Optional[int] = None):
+        with self.lock:
+            self._topology_call()
+            for num in disable:
+                if num in self._target:
+                    self._target[num]['active'] = False
+                    self._target[num]['primary'] = False
+            connected = {m['id'] for m in self._connected if m['connected']}
+            for num in enable:
+                if num in connected:
+                    self._target[num]['active'] = True
+            if primary in self._target:
+                for mid, state in self._target.items():
+                    state['primary'] = mid == primary
+            for state in self._target.values():
+                state['clone'] = False
+            self._ensure_primary()
+            self._commit()
+
+    def preferred_mode(self, device_name: str) -> Optional[Tuple[int, int, int]]:
+        with self.lock:
+            self._api_call()
+            monitor = self._by_device(device_name)
+            if monitor is None:
+                return None
+            return monitor['native_width'], monitor['native_height'], monitor['frequency']
+
+    def _modes_of(self, monitor: Dict) -> List[Tuple[int, int, int, int]]:
+        native_width, native_height, native_frequency = (monitor['native_width'], monitor['native_height'],
+                                                         monitor['frequency'])
+        resolutions = [(w, h) for w, h in self.STANDARD_RESOLUTIONS
+                       if w <= native_width and h <= native_height and (w, h) != (native_width, native_height)]
+        rates = sorted({native_frequency} | {f for f in self.STANDARD_REFRESH_RATES if f < native_frequency},
+                       reverse=True)
+        return [(w, h, f, bpp) for w, h in [(native_width, native_height)] + resolutions
+                for f in rates for bpp in self.BITS_PER_PIXEL]
+
+    def list_modes(self, device_name: str) -> List[Tuple[int, int, int, int]]:
+        with self.lock:
+            monitor = self._by_device(device_name)
+            if monitor is None:
+                return []
+            modes = self._modes_of(monitor)
+            # 与 EnumDisplaySettings 一样每个模式一次调用（再加上结束时失败的一次）
+            for _ in range(len(modes) + 1):
+                self._api_call()
+            return modes
+
+    def set_orientation(self, device_name: str, orientation: int,
+                        width: int, height: int, frequency: int = 0) -> bool:
+        with self.lock:
+            self._api_call(STEP_CHANGE_SETTINGS)
+            monitor = self._by_device(device_name)
+            if monitor is None:
+                return False
+            self._pending_orientation[monitor['id']] = orientation
+            # 与 Win32 一样连同分辨率一起写入（规划器给出原生分辨率）
+            if orientation in PORTRAIT_ORIENTATIONS:
+                width, height = height, width
+            self._pending_mode[monitor['id']] = (width, height, frequency or monitor['frequency'])
+            return True
+
+    def set_display_mode(self, device_name: str, width: int, height: int,
+                         frequency: int, bits_per_pixel: int = 0) -> bool:
+        with self.lock:
+            self._api_call(STEP_CHANGE_SETTINGS)
+            monitor = self._by_device(device_name)
+            if monitor is None:
+                return False
+            if self._target[monitor['id']]['orientation'] in PORTRAIT_ORIENTATIONS:
+                width, height = height, width
+            # 与 ChangeDisplaySettingsEx 一样拒绝不在模式列表中的模式（DISP_CHANGE_BADMODE）
+            if not any(mode[:3] == (width, height, frequency) and bits_per_pixel in (0, mode[3])
+                       for mode in self._modes_of(monitor)):
+                logging.error(f"Simulated mode {width}x{height} @ {frequency}Hz not supported by {device_name}")
+                return False
+            self._pending_mode[monitor['id']] = (width, height, frequency)
+            return True
+
+    def apply_pending(self):
+        with self.lock:
+            self._api_call(STEP_GLOBAL_APPLY)
+            for mid, orientation in self._pending_orientation.items():
+                self._target[mid]['orientation'] = orientation
+            self._pending_orientation.clear()
+            self._apply_pending_modes()
+            self._commit()
+
+    def _apply_pending_modes(self):
+        for mid, mode in self._pending_mode.items():
+            m = next(m for m in self._connected if m['id'] == mid)
+            native = (m['native_width'], m['native_height'], m['frequency'])
+            self._target[mid]['mode'] = None if mode == native else list(mode)
+        self._pending_mode.clear()
+
+    def display_switch(self, arg: str):
+        with self.lock:
+            self._topology_call(STEP_DISPLAYSWITCH)
+            if arg == '/extend':
+                active = [mid for mid, s in self._target.items() if s['active']]
+                if len(active) < 2:
+                    for state in self._target.values():
+                        state['active'] = True
+                for state in self._target.values():
+                    state['clone'] = False
+            elif arg == '/clone':
+                for state in self._target.values():
+                    state['active'] = True
+                    state['clone'] = True
+            elif arg in ('/internal', '/external'):
+                keep = self._connected[0 if arg == '/internal' else -1]['id']
+                for mid, state in self._target.items():
+                    state['active'] = mid == keep
+                    state['primary'] = mid == keep
+                    state['clone'] = False
+            else:
+                raise DisplayBackendError(f"Unknown DisplaySwitch argument: {arg}")
+            self._ensure_primary()
+            self._commit()
+
+    def apply_topology(self, active: List[int], primary: int, orientations: Dict[int, int],
+                       modes: Optional[Dict[int, Tuple[int, int, int, int]]] = None):
+        if not self.atomic:
+            raise NotImplementedError
+        with self.lock:
+            self._api_call(STEP_SET_DISPLAY_CONFIG)
+            for mid, state in self._target.items():
+                state['active'] = mid in active
+                state['primary'] = mid == primary
+                state['clone'] = False
+                if mid in orientations:
+                    state['orientation'] = orientations[mid]
+            for mid, mode in (modes or {}).items():
+                self._pending_mode[mid] = tuple(mode[:3])
+            self._apply_pending_modes()
+            self._commit()
+
+    def save_config(self, path: str):
+        with self.lock:
+            self._spawn()
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({str(k): v for k, v in self._target.items()}, f, indent=4)
+
+    def load_config(self, path: str):
+        with self.lock:
+            self._spawn()
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            for key, state in saved.items():
+                if int(key) in self._target:
+                    self._target[int(key)].update(state)
+            self._commit()
+
+
+def create_display_backend(name: Optional[str] = None, tool_path: str = '') -> DisplayBackend:
+    """按名称（win32 / ccd / simulated）创建显示后端，未指定时读取环境变量 MONITOR_MANAGER_BACKEND"""
+    name = name or os.environ.get(BACKEND_ENV_VAR, 'win32')
+    if name == 'simulated':
+        count = int(os.environ.get(SIM_MONITORS_ENV_VAR, '2'))
+        return SimulatedDisplayBackend(monitor_count=count)
+    if name == 'win32':
+        return Win32DisplayBackend(tool_path)
+    if name == 'ccd':
+        from .ccd import CcdDisplayBackend
+        return CcdDisplayBackend(tool_path)
+    raise DisplayBackendError(f"Unknown display backend: {name}")
@@ -0,0 +1,646 @@
+# Windows CCD (Connecting and Configuring Displays) API 后端
+# - 纯 Python ctypes 实现，替代 V4.0 的 DisplayCore.dll
+# - 单屏 / 双屏扩展（含旋转）通过构造 DISPLAYCONFIG_PATH_INFO / DISPLAYCONFIG_MODE_INFO
+#   数组，一次 SetDisplayConfig 原子应用，不再启动 MultiMonitorTool / DisplaySwitch
+# - 复制 / 全部扩展使用 SDC_TOPOLOGY_* 标志，同样是一次进程内调用
+# - 模式策略选出的分辨率用于排布源模式；分辨率、刷新率与色深随后统一经 DEVMODE
+#   （ChangeDisplaySettingsEx）写入，与 Win32 后端相同
+# - DisplayConfigReader: 一次 QueryDisplayConfig 读取活动拓扑到复用的缓冲区，
+#   解码为紧凑的不可变快照，替代 EnumDisplayDevices / EnumDisplaySettings 循环
+# - 路径与模式数组的处理、快照解码均为纯函数，可在 Linux 上用录制的缓冲区测试
+
+import sys
+import ctypes
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .backend import (ORIENTATION_LANDSCAPE, PORTRAIT_ORIENTATIONS, DisplayBackendError,
+                      Win32DisplayBackend, gdi_device_name, monitor_number)
+from .metrics import timed_step, STEP_DISPLAYSWITCH, STEP_SET_DISPLAY_CONFIG
+from .orientation import oriented_size
+
+# --- 常量 ---
+ERROR_SUCCESS = 0
+ERROR_INSUFFICIENT_BUFFER = 122
+
+QDC_ALL_PATHS = 0x00000001
+QDC_ONLY_ACTIVE_PATHS = 0x00000002
+
+SDC_TOPOLOGY_INTERNAL = 0x00000001
+SDC_TOPOLOGY_CLONE = 0x00000002
+SDC_TOPOLOGY_EXTEND = 0x00000004
+SDC_TOPOLOGY_EXTERNAL = 0x00000008
+SDC_USE_SUPPLIED_DISPLAY_CONFIG = 0x00000020
+SDC_APPLY = 0x00000080
+SDC_SAVE_TO_DATABASE = 0x00000200
+SDC_ALLOW_CHANGES = 0x00000400
+
+DISPLAYCONFIG_PATH_ACTIVE = 0x00000001
+DISPLAYCONFIG_PATH_MODE_IDX_INVALID = 0xFFFFFFFF
+
+DISPLAYCONFIG_MODE_INFO_TYPE_SOURCE = 1
+DISPLAYCONFIG_MODE_INFO_TYPE_TARGET = 2
+
+# 色深 -> DISPLAYCONFIG_PIXELFORMAT
+PIXEL_FORMATS = {8: 1, 16: 2, 24: 3, 32: 4}
+DISPLAYCONFIG_PIXELFORMAT_32BPP = 4
+
+DISPLAYCONFIG_ROTATION_IDENTITY = 1
+
+DISPLAYCONFIG_DEVICE_INFO_GET_SOURCE_NAME = 1
+DISPLAYCONFIG_DEVICE_INFO_GET_TARGET_NAME = 2
+
+TOPOLOGY_FLAGS = {
+    '/internal': SDC_TOPOLOGY_INTERNAL,
+    '/clone': SDC_TOPOLOGY_CLONE,
+    '/extend': SDC_TOPOLOGY_EXTEND,
+    '/external': SDC_TOPOLOGY_EXTERNAL,
+}
+
+
+# --- 结构体（与 wingdi.h 布局一致；WCHAR 固定按 2 字节处理，保证 Linux 上布局相同）---
+class LUID(ctypes.Structure):
+    _fields_ = [('LowPart', ctypes.c_uint32), ('HighPart', ctypes.c_int32)]
+
+
+class DISPLAYCONFIG_RATIONAL(ctypes.Structure):
+    _fields_ = [('Numerator', ctypes.c_uint32), ('Denominator', ctypes.c_uint32)]
+
+
+class DISPLAYCONFIG_2DREGION(ctypes.Structure):
+    _fields_ = [('cx', ctypes.c_uint32), ('cy', ctypes.c_uint32)]
+
+
+class POINTL(ctypes.Structure):
+    _fields_ = [('x', ctypes.c_int32), ('y', ctypes.c_int32)]
+
+
+class RECTL(ctypes.Structure):
+    _fields_ = [('left', ctypes.c_int32), ('top', ctypes.c_int32),
+                ('right', ctypes.c_int32), ('bottom', ctypes.c_int32)]
+
+
+class DISPLAYCONFIG_PATH_SOURCE_INFO(ctypes.Structure):
+    _fields_ = [
+        ('adapterId', LUID),
+        ('id', ctypes.c_uint32),
+        ('modeInfoIdx', ctypes.c_uint32),
+        ('statusFlags', ctypes.c_uint32),
+    ]
+
+
+class DISPLAYCONFIG_PATH_TARGET_INFO(ctypes.Structure):
+    _fields_ = [
+        ('adapterId', LUID),
+        ('id', ctypes.c_uint32),
+        ('modeInfoIdx', ctypes.c_uint32),
+        ('outputTechnology', ctypes.c_uint32),
+        ('rotation', ctypes.c_uint32),
+        ('scaling', ctypes.c_uint32),
+        ('refreshRate', DISPLAYCONFIG_RATIONAL),
+        ('scanLineOrdering', ctypes.c_uint32),
+        ('targetAvailable', ctypes.c_int32),
+        ('statusFlags', ctypes.c_uint32),
+    ]
+
+
+class DISPLAYCONFIG_PATH_INFO(ctypes.Structure):
+    _fields_ = [
+        ('sourceInfo', DISPLAYCONFIG_PATH_SOURCE_INFO),
+        ('targetInfo', DISPLAYCONFIG_PATH_TARGET_INFO),
+        ('flags', ctypes.c_uint32),
+    ]
+
+
+class DISPLAYCONFIG_VIDEO_SIGNAL_INFO(ctypes.Structure):
+    _fields_ = [
+        ('pixelRate', ctypes.c_uint64),
+        ('hSyncFreq', DISPLAYCONFIG_RATIONAL),
+        ('vSyncFreq', DISPLAYCONFIG_RATIONAL),
+        ('activeSize', DISPLAYCONFIG_2DREGION),
+        ('totalSize', DISPLAYCONFIG_2DREGION),
+        ('videoStandard', ctypes.c_uint32),
+        ('scanLineOrdering', ctypes.c_uint32),
+    ]
+
+
+class DISPLAYCONFIG_TARGET_MODE(ctypes.Structure):
+    _fields_ = [('targetVideoSignalInfo', DISPLAYCONFIG_VIDEO_SIGNAL_INFO)]
+
+
+class DISPLAYCONFIG_SOURCE_MODE(ctypes.Structure):
+    _fields_ = [
+        ('width', ctypes.c_uint32),
+        ('height', ctypes.c_uint32),
+        ('pixelFormat', ctypes.c_uint32),
+        ('position', POINTL),
+    ]
+
+
+class DISPLAYCONFIG_DESKTOP_IMAGE_INFO(ctypes.Structure):
+    _fields_ = [
+        ('PathSourceSize', POINTL),
+        ('DesktopImageRegion', RECTL),
+        ('DesktopImageClip', RECTL),
+    ]
+
+
+class _DISPLAYCONFIG_MODE_INFO_UNION(ctypes.Union):
+    _fields_ = [
+        ('targetMode', DISPLAYCONFIG_TARGET_MODE),
+        ('sourceMode', DISPLAYCONFIG_SOURCE_MODE),
+        ('desktopImageInfo', DISPLAYCONFIG_DESKTOP_IMAGE_INFO),
+    ]
+
+
+class DISPLAYCONFIG_MODE_INFO(ctypes.Structure):
+    _anonymous_ = ('info',)
+    _fields_ = [
+        ('infoType', ctypes.c_uint32),
+        ('id', ctypes.c_uint32),
+        ('adapterId', LUID),
+        ('info', _DISPLAYCONFIG_MODE_INFO_UNION),
+    ]
+
+
+class DISPLAYCONFIG_DEVICE_INFO_HEADER(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_uint32),
+        ('size', ctypes.c_uint32),
+        ('adapterId', LUID),
+        ('id', ctypes.c_uint32),
+    ]
+
+
+class DISPLAYCONFIG_SOURCE_DEVICE_NAME(ctypes.Structure):
+    _fields_ = [
+        ('header', DISPLAYCONFIG_DEVICE_INFO_HEADER),
+        ('viewGdiDeviceName', ctypes.c_uint16 * 32),
+    ]
+
+
+class DISPLAYCONFIG_TARGET_DEVICE_NAME(ctypes.Structure):
+    _fields_ = [
+        ('header', DISPLAYCONFIG_DEVICE_INFO_HEADER),
+        ('flags', ctypes.c_uint32),
+        ('outputTechnology', ctypes.c_uint32),
+        ('edidManufactureId', ctypes.c_uint16),
+        ('edidProductCodeId', ctypes.c_uint16),
+        ('connectorInstance', ctypes.c_uint32),
+        ('monitorFriendlyDeviceName', ctypes.c_uint16 * 64),
+        ('monitorDevicePath', ctypes.c_uint16 * 128),
+    ]
+
+
+def wide_string(buffer) -> str:
+    """把 WCHAR 数组（c_uint16）解码为字符串"""
+    return bytes(buffer).decode('utf-16-le', errors='replace').split('\0', 1)[0]
+
+
+class CcdError(DisplayBackendError):
+    """CCD API 调用失败"""
+
+
+class SnapshotMonitor(NamedTuple):
+    """快照中的一台活动显示器（字段与 DisplayBackend.enumerate_monitors 的字典一致）"""
+    id: int
+    device_name: str
+    width: int
+    height: int
+    frequency: int
+    orientation: int
+    position_x: int
+    position_y: int
+    is_primary: bool
+    target_name: str
+    device_path: str
+
+
+class LayoutEntry(NamedTuple):
+    """拓扑中的一台显示器: 第一项为主显示器；orientation 为 None 时保持当前方向，
+    mode 为 (横向宽, 高, 刷新率, 色深)，None 时保持当前模式；
+    device_path 为该显示器上次所在目标的设备路径，启用时优先选择该目标"""
+    device_name: str
+    orientation: Optional[int]
+    mode: Optional[Tuple[int, int, int, int]] = None
+    device_path: str = ''
+
+
+# --- 纯函数: 路径/模式数组处理 ---
+def source_key(path: DISPLAYCONFIG_PATH_INFO) -> Tuple[int, int, int]:
+    info = path.sourceInfo
+    return info.adapterId.LowPart, info.adapterId.HighPart, info.id
+
+
+def target_key(path: DISPLAYCONFIG_PATH_INFO) -> Tuple[int, int, int]:
+    info = path.targetInfo
+    return info.adapterId.LowPart, info.adapterId.HighPart, info.id
+
+
+def is_active(path: DISPLAYCONFIG_PATH_INFO) -> bool:
+    return bool(path.flags & DISPLAYCONFIG_PATH_ACTIVE)
+
+
+def orientation_to_rotation(orientation: int) -> int:
+    """DMDO_* 方向（0-3）转换为 DISPLAYCONFIG_ROTATION（1-4）"""
+    return orientation + DISPLAYCONFIG_ROTATION_IDENTITY
+
+
+def rotation_to_orientation(rotation: int) -> int:
+    if not rotation:
+        return ORIENTATION_LANDSCAPE
+    return rotation - DISPLAYCONFIG_ROTATION_IDENTITY
+
+
+def copy_struct(struct):
+    return type(struct).from_buffer_copy(struct)
+
+
+def decode_paths(paths: Sequence[DISPLAYCONFIG_PATH_INFO],
+                 modes: Sequence[DISPLAYCONFIG_MODE_INFO],
+                 source_names: Dict[Tuple[int, int, int], str],
+                 target_names: Dict[Tuple[int, int, int], Tuple[str, str]]) -> Tuple[SnapshotMonitor, ...]:
+    """把活动路径解码为按编号排序的快照
+
+    target_names: 目标键 -> (友好名称, 设备路径)
+    编号取 GDI 设备名 \\\\.\\DISPLAYn 的 n（见 backend.monitor_number）；
+    复制模式下多条活动路径共用一个源，每个源只取第一条路径
+    刷新率与 EnumDisplaySettings 一致取整数部分（59.94Hz -> 59）
+    """
+    monitors = []
+    seen_sources = set()
+    for path in paths:
+        if not is_active(path) or source_key(path) in seen_sources:
+            continue
+        source_idx = path.sourceInfo.modeInfoIdx
+        if source_idx >= len(modes):
+            continue
+        seen_sources.add(source_key(path))
+        source_mode = modes[source_idx].sourceMode
+        device_name = source_names.get(source_key(path), '')
+        target_name, device_path = target_names.get(target_key(path), ('', ''))
+        rate = path.targetInfo.refreshRate
+        frequency = rate.Numerator // rate.Denominator if rate.Denominator else 0
+        position_x = source_mode.position.x
+        position_y = source_mode.position.y
+        monitors.append(SnapshotMonitor(
+            id=monitor_number(device_name) or len(monitors) + 1,
+            device_name=device_name,
+            width=source_mode.width,
+            height=source_mode.height,
+            frequency=frequency,
+            orientation=rotation_to_orientation(path.targetInfo.rotation),
+            position_x=position_x,
+            position_y=position_y,
+            is_primary=position_x == 0 and position_y == 0,
+            target_name=target_name,
+            device_path=device_path,
+        ))
+    return tuple(sorted(monitors, key=lambda m: m.id))
+
+
+def decode_display_config(path_buffer: bytes, mode_buffer: bytes,
+                          source_names: Dict[Tuple[int, int, int], str],
+                          target_names: Dict[Tuple[int, int, int], Tuple[str, str]]) -> Tuple[SnapshotMonitor, ...]:
+    """从录制的原始缓冲区（QueryDisplayConfig 输出）解码快照"""
+    num_paths = len(path_buffer) // ctypes.sizeof(DISPLAYCONFIG_PATH_INFO)
+    num_modes = len(mode_buffer) // ctypes.sizeof(DISPLAYCONFIG_MODE_INFO)
+    paths = (DISPLAYCONFIG_PATH_INFO * num_paths).from_buffer_copy(path_buffer)
+    modes = (DISPLAYCONFIG_MODE_INFO * num_modes).from_buffer_copy(mode_buffer)
+    return decode_paths(paths, modes, source_names, target_names)
+
+
+def select_paths(paths: Sequence[DISPLAYCONFIG_PATH_INFO],
+                 source_names: Dict[Tuple[int, int, int], str],
+                 device_names: List[str],
+                 target_names: Optional[Dict[Tuple[int, int, int], Tuple[str, str]]] = None,
+                 device_paths: Optional[List[str]] = None) -> List[int]:
+    """为每个 GDI 设备名（\\\\.\\DISPLAYn）选择一条路径，返回路径下标
+
+    先为所有已有活动路径的设备保留其目标，再为其余设备选择目标可用、且目标未被占用的
+    非活动路径；device_paths 给出各设备期望的目标设备路径（空字符串表示不限），
+    与之匹配的目标优先（target_names: 目标键 -> (友好名称, 设备路径)）
+    """
+    target_names = target_names or {}
+    device_paths = device_paths or [''] * len(device_names)
+    chosen: List[Optional[int]] = [None] * len(device_names)
+    used_targets = set()
+    for slot, device_name in enumerate(device_names):
+        active = [i for i, p in enumerate(paths)
+                  if is_active(p) and source_names.get(source_key(p)) == device_name]
+        if active:
+            chosen[slot] = active[0]
+            used_targets.add(target_key(paths[active[0]]))
+    for slot, device_name in enumerate(device_names):
+        if chosen[slot] is not None:
+            continue
+        pool = [i for i, p in enumerate(paths)
+                if source_names.get(source_key(p)) == device_name
+                and p.targetInfo.targetAvailable
+                and target_key(p) not in used_targets]
+        if not pool:
+            raise CcdError(f"No display path available for {device_name}")
+        wanted = device_paths[slot].lower()
+        matching = [i for i in pool
+                    if wanted and target_names.get(target_key(paths[i]), ('', ''))[1].lower() == wanted]
+        index = (matching or pool)[0]
+        chosen[slot] = index
+        used_targets.add(target_key(paths[index]))
+    return chosen
+
+
+def build_extend_config(paths: Sequence[DISPLAYCONFIG_PATH_INFO],
+                        modes: Sequence[DISPLAYCONFIG_MODE_INFO],
+                        source_names: Dict[Tuple[int, int, int], str],
+                        layout: List[LayoutEntry],
+                        target_names: Optional[Dict[Tuple[int, int, int], Tuple[str, str]]] = None):
+    """构造只包含 layout 中显示器的扩展拓扑
+
+    主显示器放在 (0, 0)，其余按顺序向右排列；旋转写入路径的 targetInfo.rotation，
+    横竖方向改变时同步交换源模式的宽高。新启用的路径没有模式信息，模式下标置为无效，
+    由 SDC_ALLOW_CHANGES 让系统选择模式与位置。
+    指定了 mode 的显示器: 源模式（新启用的路径则新建一个）只按该分辨率排布桌面，
+    目标模式下标置为无效；刷新率与色深不在这里设定，由 CcdDisplayBackend 随后经
+    DEVMODE（ChangeDisplaySettingsEx）写入。
+    返回 (路径数组, 模式数组)，可直接传给 SetDisplayConfig。
+    """
+    indices = select_paths(paths, source_names, [entry.device_name for entry in layout],
+                           target_names, [entry.device_path for entry in layout])
+
+    new_paths = []
+    new_modes = []
+    x_offset = 0
+    for entry, index in zip(layout, indices):
+        path = copy_struct(paths[index])
+        path.flags |= DISPLAYCONFIG_PATH_ACTIVE
+
+        current_rotation = path.targetInfo.rotation or DISPLAYCONFIG_ROTATION_IDENTITY
+        orientation = entry.orientation
+        if orientation is None:
+            orientation = rotation_to_orientation(current_rotation)
+        swap = ((rotation_to_orientation(current_rotation) in PORTRAIT_ORIENTATIONS)
+                != (orientation in PORTRAIT_ORIENTATIONS))
+        path.targetInfo.rotation = orientation_to_rotation(orientation)
+
+        source_idx = path.sourceInfo.modeInfoIdx
+        mode = None
+        if is_active(paths[index]) and source_idx < len(modes):
+            mode = copy_struct(modes[source_idx])
+            if swap:
+                mode.sourceMode.width, mode.sourceMode.height = (
+                    mode.sourceMode.height, mode.sourceMode.width)
+        elif entry.mode is not None:
+            mode = DISPLAYCONFIG_MODE_INFO()
+            mode.infoType = DISPLAYCONFIG_MODE_INFO_TYPE_SOURCE
+            mode.id = path.sourceInfo.id
+            mode.adapterId = path.sourceInfo.adapterId
+        if mode is not None:
+            if entry.mode is not None:
+                width, height, _, bits_per_pixel = entry.mode
+                mode.sourceMode.width, mode.sourceMode.height = oriented_size(width, height, orientation)
+                mode.sourceMode.pixelFormat = PIXEL_FORMATS.get(bits_per_pixel, DISPLAYCONFIG_PIXELFORMAT_32BPP)
+            mode.sourceMode.position.x = x_offset
+            mode.sourceMode.position.y = 0
+            x_offset += mode.sourceMode.width
+            path.sourceInfo.modeInfoIdx = len(new_modes)
+            new_modes.append(mode)
+        else:
+            path.sourceInfo.modeInfoIdx = DISPLAYCONFIG_PATH_MODE_IDX_INVALID
+
+        target_idx = path.targetInfo.modeInfoIdx
+        if entry.mode is not None:
+            # 旧时序与新分辨率不再匹配，交由系统临时选择，随后由 DEVMODE 指定刷新率
+            path.targetInfo.modeInfoIdx = DISPLAYCONFIG_PATH_MODE_IDX_INVALID
+        elif is_active(paths[index]) and target_idx < len(modes):
+            path.targetInfo.modeInfoIdx = len(new_modes)
+            new_modes.append(copy_struct(modes[target_idx]))
+        else:
+            path.targetInfo.modeInfoIdx = DISPLAYCONFIG_PATH_MODE_IDX_INVALID
+
+        new_paths.append(path)
+
+    path_array = (DISPLAYCONFIG_PATH_INFO * len(new_paths))(*new_paths)
+    mode_array = (DISPLAYCONFIG_MODE_INFO * len(new_modes))(*new_modes)
+    return path_array, mode_array
+
+
+# --- API 封装 ---
+def load_user32():
+    if sys.platform != 'win32':
+        raise CcdError("CCD API 仅在 Windows 上可用")
+    return ctypes.WinDLL('user32')
+
+
+class DisplayConfigReader:
+    """QueryDisplayConfig 读取器
+
+    活动拓扑读入复用的缓冲区，稳定状态下每次快照只需一次 QueryDisplayConfig；
+    源/目标名称按键缓存，只有出现新的源或目标时才调用 DisplayConfigGetDeviceInfo。
+    缓冲区、计数与名称缓存由同一把锁保护（界面线程与执行线程都会读取）
+    """
+    INITIAL_PATHS = 8
+    INITIAL_MODES = 16
+
+    def __init__(self):
+        user32 = load_user32()
+        self._get_buffer_sizes = user32.GetDisplayConfigBufferSizes
+        self._query_config = user32.QueryDisplayConfig
+        self._get_device_info = user32.DisplayConfigGetDeviceInfo
+        self._paths = (DISPLAYCONFIG_PATH_INFO * self.INITIAL_PATHS)()
+        self._modes = (DISPLAYCONFIG_MODE_INFO * self.INITIAL_MODES)()
+        self._num_paths = 0
+        self._num_modes = 0
+        self._source_names = {}
+        self._target_names = {}
+        self._lock = threading.RLock()
+
+    def query_config(self, flags: int = QDC_ALL_PATHS):
+        """QueryDisplayConfig，返回新分配的 (路径列表, 模式列表)"""
+        with self._lock:
+            while True:
+                num_paths = ctypes.c_uint32()
+                num_modes = ctypes.c_uint32()
+                result = self._get_buffer_sizes(flags, ctypes.byref(num_paths), ctypes.byref(num_modes))
+                if result != ERROR_SUCCESS:
+                    raise CcdError(f"GetDisplayConfigBufferSizes failed: {result}")
+                paths = (DISPLAYCONFIG_PATH_INFO * num_paths.value)()
+                modes = (DISPLAYCONFIG_MODE_INFO * num_modes.value)()
+                result = self._query_config(flags, ctypes.byref(num_paths), paths,
+                                            ctypes.byref(num_modes), modes, None)
+                # 两次调用之间拓扑发生变化时缓冲区可能不足，重试
+                if result == ERROR_INSUFFICIENT_BUFFER:
+                    continue
+                if result != ERROR_SUCCESS:
+                    raise CcdError(f"QueryDisplayConfig failed: {result}")
+                return paths[:num_paths.value], modes[:num_modes.value]
+
+    def _query_active_into_buffers(self):
+        """把活动拓扑读入复用缓冲区，容量不足时扩容后重试"""
+        while True:
+            num_paths = ctypes.c_uint32(len(self._paths))
+            num_modes = ctypes.c_uint32(len(self._modes))
+            result = self._query_config(QDC_ONLY_ACTIVE_PATHS, ctypes.byref(num_paths), self._paths,
+                                        ctypes.byref(num_modes), self._modes, None)
+            if result == ERROR_SUCCESS:
+                self._num_paths = num_paths.value
+                self._num_modes = num_modes.value
+                return
+            if result != ERROR_INSUFFICIENT_BUFFER:
+                raise CcdError(f"QueryDisplayConfig failed: {result}")
+            result = self._get_buffer_sizes(QDC_ONLY_ACTIVE_PATHS, ctypes.byref(num_paths),
+                                            ctypes.byref(num_modes))
+            if result != ERROR_SUCCESS:
+                raise CcdError(f"GetDisplayConfigBufferSizes failed: {result}")
+            self._paths = (DISPLAYCONFIG_PATH_INFO * max(num_paths.value, len(self._paths) * 2))()
+            self._modes = (DISPLAYCONFIG_MODE_INFO * max(num_modes.value, len(self._modes) * 2))()
+
+    def source_names(self, paths) -> Dict[Tuple[int, int, int], str]:
+        """每个源的 GDI 设备名（带缓存，返回副本）"""
+        with self._lock:
+            for path in paths:
+                key = source_key(path)
+                if key in self._source_names:
+                    continue
+                request = DISPLAYCONFIG_SOURCE_DEVICE_NAME()
+                request.header.type = DISPLAYCONFIG_DEVICE_INFO_GET_SOURCE_NAME
+                request.header.size = ctypes.sizeof(request)
+                request.header.adapterId = path.sourceInfo.adapterId
+                request.header.id = path.sourceInfo.id
+                if self._get_device_info(ctypes.byref(request.header)) == ERROR_SUCCESS:
+                    self._source_names[key] = wide_string(request.viewGdiDeviceName)
+            return dict(self._source_names)
+
+    def target_names(self, paths) -> Dict[Tuple[int, int, int], Tuple[str, str]]:
+        """每个目标的 (友好名称, 设备路径)（带缓存，返回副本）"""
+        with self._lock:
+            for path in paths:
+                key = target_key(path)
+                if key in self._target_names:
+                    continue
+                request = DISPLAYCONFIG_TARGET_DEVICE_NAME()
+                request.header.type = DISPLAYCONFIG_DEVICE_INFO_GET_TARGET_NAME
+                request.header.size = ctypes.sizeof(request)
+                request.header.adapterId = path.targetInfo.adapterId
+                request.header.id = path.targetInfo.id
+                if self._get_device_info(ctypes.byref(request.header)) == ERROR_SUCCESS:
+                    self._target_names[key] = (wide_string(request.monitorFriendlyDeviceName),
+                                               wide_string(request.monitorDevicePath))
+            return dict(self._target_names)
+
+    def snapshot(self) -> Tuple[SnapshotMonitor, ...]:
+        """读取当前活动拓扑的不可变快照（查询与解码在锁内完成，缓冲区不会被并发覆盖）"""
+        with self._lock:
+            self._query_active_into_buffers()
+            paths = self._paths[:self._num_paths]
+            modes = self._modes[:self._num_modes]
+            return decode_paths(paths, modes, self.source_names(paths), self.target_names(paths))
+
+    def recorded_buffers(self) -> Tuple[bytes, bytes]:
+        """最近一次快照的原始缓冲区，可配合 decode_display_config 离线复现"""
+        with self._lock:
+            path_size = ctypes.sizeof(DISPLAYCONFIG_PATH_INFO) * self._num_paths
+            mode_size = ctypes.sizeof(DISPLAYCONFIG_MODE_INFO) * self._num_modes
+            return bytes(self._paths)[:path_size], bytes(self._modes)[:mode_size]
+
+
+# --- CCD 后端 ---
+class CcdDisplayBackend(Win32DisplayBackend):
+    """通过 SetDisplayConfig 单次原子切换拓扑的后端
+
+    SetDisplayConfig 负责启用/禁用、主显示器、方向与桌面排布；显示模式（分辨率、刷新率、
+    色深）与 Win32DisplayBackend 一样经 DEVMODE 写入，SetDisplayConfig 不按刷新率选时序。
+    配置保存/加载仍沿用 Win32DisplayBackend（MultiMonitorTool）
+    """
+    name = 'ccd'
+    atomic = True
+
+    def __init__(self, tool_path: str):
+        super().__init__(tool_path)
+        if self.reader is None:
+            raise CcdError("CCD API 不可用")
+        self._set_config = load_user32().SetDisplayConfig
+        self._pending_orientations = {}
+        self._pending_modes = False
+        self._device_paths: Dict[int, str] = {}  # 显示器编号 -> 最近一次所在目标的设备路径
+
+    def set_config(self, path_array, mode_array):
+        flags = SDC_APPLY | SDC_USE_SUPPLIED_DISPLAY_CONFIG | SDC_ALLOW_CHANGES | SDC_SAVE_TO_DATABASE
+        with timed_step(STEP_SET_DISPLAY_CONFIG):
+            result = self._set_config(len(path_array), path_array, len(mode_array), mode_array, flags)
+        if result != ERROR_SUCCESS:
+            raise CcdError(f"SetDisplayConfig failed: {result}")
+
+    # --- DisplayBackend 接口 ---
+    def enumerate_monitors(self) -> List[Dict]:
+        monitors = super().enumerate_monitors()
+        # 记住各显示器所在的目标：重新启用时选回同一台物理显示器
+        self._device_paths.update({m['id']: m['device_path'] for m in monitors if m['device_path']})
+        return monitors
+
+    def apply_topology(self, active: List[int], primary: int, orientations: Dict[int, int],
+                       modes: Optional[Dict[int, Tuple[int, int, int, int]]] = None):
+        order = [primary] + [num for num in active if num != primary]
+        modes = modes or {}
+        current = {m['id']: m['orientation'] for m in self.enumerate_monitors()} if modes else {}
+        layout = [LayoutEntry(gdi_device_name(num), orientations.get(num), modes.get(num),
+                              self._device_paths.get(num, ''))
+                  for num in order]
+        paths, mode_infos = self.reader.query_config(QDC_ALL_PATHS)
+        path_array, mode_array = build_extend_config(paths, mode_infos, self.reader.source_names(paths), layout,
+                                                     self.reader.target_names(paths))
+        self.set_config(path_array, mode_array)
+        logging.info(f"SetDisplayConfig applied: {[entry.device_name for entry in layout]}")
+        if not modes:
+            return
+        # 拓扑与方向已生效，再按最终方向写入 DEVMODE 并一次性应用
+        for num, (width, height, frequency, bits_per_pixel) in modes.items():
+            orientation = orientations.get(num, current.get(num, ORIENTATION_LANDSCAPE))
+            width, height = oriented_size(width, height, orientation)
+            super().set_display_mode(gdi_device_name(num), width, height, frequency, bits_per_pixel)
+        super().apply_pending()
+
+    def set_topology(self, enable: List[int], disable: List[int],
+                     primary: Optional[int] = None):
+        monitors = self.enumerate_monitors()
+        active = [m['id'] for m in monitors if m['id'] not in disable]
+        active += [num for num in enable if num not in active]
+        if primary is None:
+            primary = next((m['id'] for m in monitors if m['is_primary'] and m['id'] in active),
+                           active[0])
+        self.apply_topology(active, primary, {})
+
+    def set_orientation(self, device_name: str, orientation: int,
+                        width: int, height: int, frequency: int = 0) -> bool:
+        # 暂存，在 apply_pending 时与拓扑一起一次性提交
+        self._pending_orientations[device_name] = orientation
+        return True
+
+    def set_display_mode(self, device_name: str, width: int, height: int,
+                         frequency: int, bits_per_pixel: int = 0) -> bool:
+        # 与 apply_topology 相同，模式经 DEVMODE 写入注册表，在 apply_pending 时应用
+        staged = super().set_display_mode(device_name, width, height, frequency, bits_per_pixel)
+        self._pending_modes = self._pending_modes or staged
+        return staged
+
+    def apply_pending(self):
+        if self._pending_modes:
+            # 先应用注册表中的模式，随后的拓扑查询才能读到新模式
+            self._pending_modes = False
+            super().apply_pending()
+        if not self._pending_orientations:
+            return
+        monitors = self.enumerate_monitors()
+        primary = next((m['id'] for m in monitors if m['is_primary']), monitors[0]['id'])
+        orientations = {m['id']: self._pending_orientations[m['device_name']]
+                        for m in monitors if m['device_name'] in self._pending_orientations}
+        self._pending_orientations.clear()
+        self.apply_topology([m['id'] for m in monitors], primary, orientations)
+
+    def display_switch(self, arg: str):
+        if arg not in TOPOLOGY_FLAGS:
+            raise CcdError(f"Unknown topology: {arg}")
+        with timed_step(STEP_DISPLAYSWITCH):
+            result = self._set_config(0, None, 0, None, SDC_APPLY | TOPOLOGY_FLAGS[arg])
+        if result != ERROR_SUCCESS:
+            raise CcdError(f"SetDisplayConfig({arg}) failed: {result}")
@@ -0,0 +1,376 @@
+# 显示器切换操作（与界面无关）
+# 单显示器、双屏扩展（含方向）、DisplaySwitch 扩展/复制、配置保存与加载，
+# 以及批量事务：with controller.transaction() as tx: ... 退出时一次规划、一次应用。
+# 显示器参数可以是当前编号或持久键（见 identity.py），执行时才解析为后端编号。
+# 枚举时读取各显示器的 EDID（见 edid.py），附加型号名称、序列号；原生分辨率来自持久化的
+# 原生模式缓存（见 native_modes.py），规划旋转时不再由当前模式反推。
+# 分辨率与刷新率在按显示器缓存的模式表（见 modes.py）中查找，切换时不再枚举模式列表；
+# 双屏扩展按各显示器的模式策略选出目标模式，与拓扑、方向在同一次应用中生效。
+# GUI 在常驻执行线程中调用，monitorctl 在命令行进程中直接调用；不导入 Qt / pystray / PIL。
+
+import os
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .backend import (DisplayBackend, DisplayBackendError, topology_digest,
+                      ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT_FLIPPED)
+from .edid import EdidInfo, edid_cache
+from .identity import IdentityResolver, MonitorRef
+from .metrics import registry, timed_operation, timed_step, STEP_REFRESH
+from .modes import DEFAULT_MODE_POLICY, DisplayMode, ModePolicy, ModeTable, ModeTableCache, select_mode
+from .native_modes import NativeModeCache
+from .orientation import native_size, oriented_size
+from .planner import plan_topology, execute_plan, describe_plan, topology_mode, primary_monitor_id
+from .settle import (SettleDetector, SettleResult, expect_topology, expect_mode,
+                     expect_extended, expect_clone)
+
+DISPLAY_SWITCH_EXPECTATIONS = {'/extend': expect_extended, '/clone': expect_clone}
+
+
+def describe_monitor(monitor: Dict) -> str:
+    name = monitor.get('name') or monitor.get('target_name')
+    name = f"{name} " if name else ""
+    return (f"显示器{monitor['id']}: {name}{monitor['width']}x{monitor['height']} "
+            f"@ {monitor['frequency']}Hz")
+
+
+class DisplayTransaction:
+    """批量拓扑更改：块内只记录目标，由 DisplayController.transaction 在退出时一次应用
+
+    目标从开始时的状态出发：启用当前已启用的显示器、保持当前主显示器、方向不变。
+    各方法接受编号或持久键，由 resolve 立即解析为编号（默认只接受编号）。
+    result 为提交后的 SettleResult（无需更改或不等待生效时为 None）
+    """
+
+    def __init__(self, monitors: List[Dict], kind: str = 'transaction',
+                 resolve: Optional[Callable[[MonitorRef], int]] = None):
+        self.kind = kind
+        self.resolve = resolve or int
+        self.active_ids: List[int] = [m['id'] for m in monitors]
+        self.primary_num: Optional[int] = primary_monitor_id(monitors)
+        self.orientations: Dict[int, int] = {}
+        self.result: Optional[SettleResult] = None
+
+    def enable(self, *monitors: MonitorRef) -> 'DisplayTransaction':
+        for num in map(self.resolve, monitors):
+            if num not in self.active_ids:
+                self.active_ids.append(num)
+        return self
+
+    def disable(self, *monitors: MonitorRef) -> 'DisplayTransaction':
+        nums = [self.resolve(monitor) for monitor in monitors]
+        self.active_ids = [num for num in self.active_ids if num not in nums]
+        if self.primary_num in nums:
+            self.primary_num = None  # 提交时取第一台启用的显示器
+        return self
+
+    def only(self, *monitors: MonitorRef) -> 'DisplayTransaction':
+        """只启用指定显示器；当前主显示器不在其中时第一台成为主显示器"""
+        self.active_ids = list(dict.fromkeys(map(self.resolve, monitors)))
+        if self.primary_num not in self.active_ids:
+            self.primary_num = self.active_ids[0] if self.active_ids else None
+        return self
+
+    def set_primary(self, monitor: MonitorRef) -> 'DisplayTransaction':
+        num = self.resolve(monitor)
+        self.enable(num)
+        self.primary_num = num
+        return self
+
+    def rotate(self, monitor: MonitorRef, orientation: int) -> 'DisplayTransaction':
+        if not ORIENTATION_LANDSCAPE <= orientation <= ORIENTATION_PORTRAIT_FLIPPED:
+            raise ValueError(f"无效的方向: {orientation}")
+        self.orientations[self.resolve(monitor)] = orientation
+        return self
+
+    def target(self) -> Tuple[List[int], int, Dict[int, int]]:
+        """校验并返回 (启用的显示器（主显示器在前）, 主显示器, 方向)"""
+        if not self.active_ids:
+            raise ValueError("至少需要启用一台显示器")
+        primary_num = self.primary_num if self.primary_num in self.active_ids else self.active_ids[0]
+        for num in self.orientations:
+            if num not in self.active_ids:
+                raise ValueError(f"显示器{num}未启用，无法设置方向")
+        active_ids = [primary_num] + [num for num in self.active_ids if num != primary_num]
+        return active_ids, primary_num, dict(self.orientations)
+
+
+class DisplayController:
+    """对一个显示后端执行切换操作
+
+    progress: 进度回调 progress(message)，GUI 用于写入事件日志
+    wait_settle: 为 False 时切换后不等待生效（命令行 --no-wait）
+    identity: 持久键解析器；收到显示变更通知时调用方应调用 identity.invalidate()
+    native_modes: 原生模式缓存（默认只在内存中）
+    mode_tables: 各显示器的模式表；收到 WM_DEVICECHANGE 时调用方应调用 mode_tables.invalidate()
+    mode_policies: 持久键 -> 模式策略，未列出的显示器使用 DEFAULT_MODE_POLICY（原生分辨率最高刷新率）
+    """
+
+    def __init__(self, backend: DisplayBackend, settle_detector: Optional[SettleDetector] = None,
+                 progress: Optional[Callable[[str], None]] = None, wait_settle: bool = True,
+                 identity: Optional[IdentityResolver] = None,
+                 native_modes: Optional[NativeModeCache] = None,
+                 mode_policies: Optional[Dict[str, ModePolicy]] = None):
+        self.backend = backend
+        self.settle_detector = settle_detector or SettleDetector(backend)
+        self.identity = identity or IdentityResolver()
+        self.native_modes = native_modes or NativeModeCache()
+        self.mode_tables = ModeTableCache()
+        self.mode_policies = mode_policies if mode_policies is not None else {}
+        self.progress = progress
+        self.wait_settle = wait_settle
+        self.native_resolutions: Dict[str, Dict] = {}
+        self.edids: Dict[str, EdidInfo] = {}  # device_path -> 最近一次读取的 EDID（含暂未启用的显示器）
+
+    def report(self, message: str):
+        if self.progress is not None:
+            self.progress(message)
+
+    def _settle(self, kind: str, expected=None) -> Optional[SettleResult]:
+        if not self.wait_settle:
+            return None
+        return self.settle_detector.wait(kind, expected)
+
+    # --- 查询 ---
+    def enumerate(self) -> List[Dict]:
+        """枚举显示器，附带 EDID 信息、description 与持久键 key，并记录各显示器的横向原生分辨率"""
+        with timed_step(STEP_REFRESH):
+            monitors = self.backend.enumerate_monitors()
+            self.read_edids(monitors)
+            self.annotate(monitors)
+        # 新建后整体替换：可能在后台线程调用，读取方不会看到填了一半的表
+        native_resolutions = {}
+        for monitor in monitors:
+            native_width, native_height = native_size(monitor)
+            native_resolutions[monitor['device_name']] = {'width': native_width, 'height': native_height}
+            monitor['description'] = describe_monitor(monitor)
+        self.native_resolutions = native_resolutions
+        return monitors
+
+    def read_edids(self, monitors: List[Dict]):
+        """读取各显示器的 EDID（解析结果按内容哈希缓存）并附加到枚举结果"""
+        edids = {}
+        for monitor in monitors:
+            device_path = monitor.get('device_path')
+            if not device_path:
+                continue
+            try:
+                blob = self.backend.read_edid(device_path)
+            except Exception as e:
+                logging.warning(f"Failed to read EDID for {monitor['device_name']}: {e}")
+                continue
+            info = edid_cache.get(blob) if blob else None
+            if info is not None:
+                edids[device_path] = info
+        # 保留暂未启用的显示器上次读到的 EDID：重新启用后规划时（不重新读取）面板指纹不变
+        self.edids = {**self.edids, **edids}
+        self.attach_edids(monitors)
+
+    def attach_edids(self, monitors: List[Dict]) -> List[Dict]:
+        """用最近一次读取的 EDID 附加 name / serial / edid_digest 与 EDID 原生模式"""
+        for monitor in monitors:
+            info = self.edids.get(monitor.get('device_path'))
+            if info is None:
+                continue
+            monitor['name'] = info.display_name
+            monitor['serial'] = info.serial
+            monitor['edid_digest'] = info.digest[:16]
+            native = info.native
+            if native is not None:
+                monitor['native_width'], monitor['native_height'] = native.width, native.height
+                monitor['native_frequency'] = round(native.refresh)
+        return monitors
+
+    def annotate(self, monitors: List[Dict]) -> List[Dict]:
+        """附加 EDID 信息、持久键与原生模式；除首次见到某块面板外不调用后端"""
+        self.attach_edids(monitors)
+        self.identity.annotate(monitors)
+        self.native_modes.attach(monitors, self.backend)
+        return monitors
+
+    def mode_table(self, monitor: Dict) -> ModeTable:
+        """显示器的模式表（首次使用时读取一次模式列表）"""
+        return self.mode_tables.get(monitor, self.backend)
+
+    def policy_modes(self, monitors: List[Dict], nums: List[int]) -> Dict[int, DisplayMode]:
+        """按模式策略为 nums 选出目标模式（横向）
+
+        已启用的显示器查它的模式表；未启用的显示器按持久键取上次的模式表与原生模式（没有时跳过，
+        启用后重新规划时再选）
+        """
+        by_id = {m['id']: m for m in monitors}
+        modes = {}
+        for num in nums:
+            monitor = by_id.get(num)
+            if monitor is not None:
+                key, table, native = monitor['key'], self.mode_table(monitor), native_size(monitor)
+            else:
+                key = self.identity.key_of(num)
+                table = self.mode_tables.last(key) if key else None
+                native_mode = self.native_modes.modes.get(key) if key else None
+                native = (native_mode.width, native_mode.height) if native_mode else None
+                if table is None:
+                    continue
+            policy = self.mode_policies.get(key, DEFAULT_MODE_POLICY)
+            mode = select_mode(table, native, policy)
+            if mode is not None:
+                modes[num] = mode
+        return modes
+
+    def resolve(self, monitor: MonitorRef) -> int:
+        """编号或持久键 -> 当前编号；索引失效或键未知时重新枚举一次"""
+        num = self.identity.resolve(monitor)
+        if num is None:
+            self.identity.invalidate()
+            self.enumerate()
+            num = self.identity.resolve(monitor)
+        if num is None:
+            raise ValueError(f"未找到显示器: {monitor}")
+        return num
+
+    def status(self, monitors: Optional[List[Dict]] = None) -> Dict:
+        """当前模式、主显示器与各显示器状态（可直接序列化为 JSON）"""
+        if monitors is None:
+            monitors = self.enumerate()
+        return {
+            'backend': self.backend.name,
+            'mode': topology_mode(monitors),
+            'primary': primary_monitor_id(monitors),
+            'digest': topology_digest(monitors),
+            'monitors': monitors,
+        }
+
+    # --- 切换 ---
+    def apply_target(self, kind: str, active_ids: List[int], primary_num: int,
+                     orientations: Optional[Dict[int, int]] = None,
+                     apply_mode_policy: bool = False) -> Optional[SettleResult]:
+        """按当前状态规划到目标拓扑，只执行需要的步骤，并等待生效一次
+
+        apply_mode_policy: 同时把启用的显示器切到模式策略选出的模式（并入同一次应用）
+        """
+        try:
+            # 附加缓存的原生模式，旋转时按真实原生分辨率计算宽高
+            current = self.annotate(self.backend.enumerate_monitors())
+            modes = self.policy_modes(current, active_ids) if apply_mode_policy else None
+            plan = plan_topology(current, active_ids, primary_num, orientations, self.backend.atomic, modes)
+            logging.info(f"{kind} plan: {describe_plan(plan)}")
+            self.report(f"规划: {describe_plan(plan)}")
+            success = execute_plan(self.backend, plan)
+            executed = bool(plan.steps)
+
+            if plan.unresolved:
+                # 目标显示器刚被启用：等启用生效（--no-wait 时也要等，否则重新枚举仍是旧拓扑），
+                # 再重新枚举、规划方向与模式
+                self.report("等待显示器启用生效...")
+                enabled = self.settle_detector.wait(f'{kind}:enable', expect_topology(active_ids, primary_num))
+                if not enabled.settled:
+                    logging.warning(f"{kind}: enable did not settle, planning against current state")
+                current = self.annotate(self.backend.enumerate_monitors())
+                modes = self.policy_modes(current, active_ids) if apply_mode_policy else None
+                plan = plan_topology(current, active_ids, primary_num, orientations, modes=modes)
+                logging.info(f"{kind} plan (after enable): {describe_plan(plan)}")
+                success = execute_plan(self.backend, plan) and success and not plan.unresolved
+                executed = executed or bool(plan.steps)
+
+            if not success:
+                logging.warning(f"{kind} completed but some orientations may not be applied")
+
+            if executed:
+                self.report("等待显示设置生效...")
+                return self._settle(kind, expect_topology(active_ids, primary_num, orientations, modes))
+        except Exception as e:
+            logging.error(f"{kind} failed: {e}")
+            raise
+
+    @contextmanager
+    def transaction(self, kind: str = 'transaction') -> Iterator[DisplayTransaction]:
+        """批量更改：块内记录目标，正常退出时一次应用；块内抛出异常则不做任何更改"""
+        tx = DisplayTransaction(self.enumerate(), kind, self.resolve)
+        yield tx
+        active_ids, primary_num, orientations = tx.target()
+        logging.info(f"Committing {kind}: enable {active_ids}, primary {primary_num}, "
+                     f"orientations {orientations}")
+        with registry.operation(kind):
+            tx.result = self.apply_target(kind, active_ids, primary_num, orientations)
+
+    @timed_operation('single')
+    def single_display(self, monitor: MonitorRef) -> Optional[SettleResult]:
+        """切换到单显示器"""
+        monitor_num = self.resolve(monitor)
+        logging.info(f"Switching to monitor {monitor} (#{monitor_num})")
+        return self.apply_target('single', [monitor_num], monitor_num)
+
+    @timed_operation('extend_pair')
+    def extend_pair(self, primary: MonitorRef, secondary: MonitorRef,
+                    primary_orientation: int, secondary_orientation: int) -> Optional[SettleResult]:
+        """扩展双显示器（按当前状态规划，只执行需要的步骤；两台显示器按模式策略设定模式）"""
+        primary_num, secondary_num = self.resolve(primary), self.resolve(secondary)
+        logging.info(f"Extending monitors {primary} (#{primary_num}) and {secondary} (#{secondary_num})")
+        if primary_num == secondary_num:
+            raise ValueError("主显示器和扩展副屏不能是同一台显示器")
+        orientations = {primary_num: primary_orientation, secondary_num: secondary_orientation}
+        return self.apply_target('extend_pair', [primary_num, secondary_num], primary_num, orientations,
+                                 apply_mode_policy=True)
+
+    @timed_operation('set_mode')
+    def set_mode(self, monitor: MonitorRef, width: int, height: int,
+                 frequency: Optional[int] = None) -> Optional[SettleResult]:
+        """设置分辨率（横向宽高）与刷新率，方向不变；frequency 为 None 时取该分辨率的最高刷新率"""
+        monitor_num = self.resolve(monitor)
+        current = next((m for m in self.annotate(self.backend.enumerate_monitors())
+                        if m['id'] == monitor_num), None)
+        if current is None:
+            raise ValueError(f"显示器{monitor_num}未启用，无法设置显示模式")
+        table = self.mode_table(current)
+        mode = table.best(width, height) if frequency is None else table.find(width, height, frequency)
+        if mode is None:
+            rate = f" @ {frequency}Hz" if frequency is not None else ""
+            raise ValueError(f"显示器{monitor_num}不支持 {width}x{height}{rate}")
+
+        target_width, target_height = oriented_size(mode.width, mode.height, current['orientation'])
+        if (current['width'], current['height'], current['frequency']) == (target_width, target_height,
+                                                                           mode.frequency):
+            logging.info(f"Monitor {monitor} (#{monitor_num}) already at {mode}")
+            return None
+        logging.info(f"Setting monitor {monitor} (#{monitor_num}) to {mode} ({mode.bits_per_pixel} bpp)")
+        self.report(f"设置显示器{monitor_num}: {mode}")
+        if not self.backend.set_display_mode(current['device_name'], target_width, target_height,
+                                             mode.frequency, mode.bits_per_pixel):
+            raise DisplayBackendError(f"显示器{monitor_num}设置 {mode} 失败")
+        self.backend.apply_pending()
+        self.report("等待显示设置生效...")
+        return self._settle('set_mode', expect_mode(monitor_num, target_width, target_height, mode.frequency))
+
+    def display_switch(self, arg: str) -> Optional[SettleResult]:
+        """DisplaySwitch.exe /extend 或 /clone（所有显示器）"""
+        try:
+            with registry.operation(f"displayswitch_{arg.lstrip('/')}"):
+                self.backend.display_switch(arg)
+                logging.info(f"DisplaySwitch {arg} executed successfully")
+                return self._settle(f'displayswitch{arg}', DISPLAY_SWITCH_EXPECTATIONS.get(arg))
+        except Exception as e:
+            logging.error(f"DisplaySwitch {arg} failed: {e}")
+            raise
+
+    # --- 配置 ---
+    @timed_operation('save_config')
+    def save_config(self, path: str):
+        try:
+            self.backend.save_config(path)
+            logging.info(f"Config saved to {path}")
+        except Exception as e:
+            logging.error(f"Save config failed: {e}")
+            raise
+
+    @timed_operation('load_config')
+    def load_config(self, path: str) -> Optional[SettleResult]:
+        if not os.path.exists(path):
+            raise FileNotFoundError("无已保存的配置文件")
+        try:
+            self.backend.load_config(path)
+            logging.info(f"Config loaded from {path}")
+            return self._settle('load_config')
+        except Exception as e:
+            logging.error(f"Load config failed: {e}")
+            raise
@@ -0,0 +1,144 @@
+# 显示器变更通知
+# - Win32DisplayChangeSource: 隐藏窗口监听 WM_DISPLAYCHANGE / WM_DEVICECHANGE
+# - SimulatedDisplayChangeSource: 由模拟后端或测试代码驱动
+# 回调在通知线程中调用，调用方负责切回 GUI 线程并做去抖
+
+import logging
+import threading
+from typing import Callable, Optional
+
+try:
+    import win32api
+    import win32con
+    import win32gui
+except ImportError:  # 非 Windows 平台
+    win32gui = None
+
+from .backend import DisplayBackend, SimulatedDisplayBackend
+
+WM_DISPLAYCHANGE = 0x007E
+WM_DEVICECHANGE = 0x0219
+
+# DBT_DEVNODES_CHANGED: 设备树变化（显示器插拔时广播）
+DBT_DEVNODES_CHANGED = 0x0007
+
+WINDOW_CLASS_NAME = 'MonitorManagerDisplayChangeListener'
+
+
+class DisplayChangeSource:
+    """显示器变更通知源接口，callback(reason: str)"""
+
+    def __init__(self):
+        self.callback: Optional[Callable[[str], None]] = None
+
+    def start(self, callback: Callable[[str], None]):
+        self.callback = callback
+
+    def stop(self):
+        self.callback = None
+
+    def notify(self, reason: str):
+        callback = self.callback
+        if callback is not None:
+            try:
+                callback(reason)
+            except Exception as e:
+                logging.error(f"Display change callback failed: {e}")
+
+
+class Win32DisplayChangeSource(DisplayChangeSource):
+    """在独立线程中创建隐藏的顶层窗口接收广播消息
+
+    不使用 HWND_MESSAGE 纯消息窗口，因为它收不到 WM_DISPLAYCHANGE 等广播
+    """
+
+    def __init__(self):
+        super().__init__()
+        if win32gui is None:
+            raise RuntimeError("win32gui 不可用")
+        self._thread = None
+        self._hwnd = None
+        self._ready = threading.Event()
+
+    def start(self, callback: Callable[[str], None]):
+        super().start(callback)
+        self._thread = threading.Thread(target=self._run, name='DisplayChangeListener', daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=2.0)
+
+    def stop(self):
+        super().stop()
+        if self._hwnd:
+            win32gui.PostMessage(self._hwnd, win32con.WM_CLOSE, 0, 0)
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _wnd_proc(self, hwnd, msg, wparam, lparam):
+        if msg == WM_DISPLAYCHANGE:
+            self.notify('WM_DISPLAYCHANGE')
+            return 0
+        if msg == WM_DEVICECHANGE:
+            if wparam == DBT_DEVNODES_CHANGED:
+                self.notify('WM_DEVICECHANGE')
+            return 1
+        if msg == win32con.WM_CLOSE:
+            win32gui.DestroyWindow(hwnd)
+            return 0
+        if msg == win32con.WM_DESTROY:
+            win32gui.PostQuitMessage(0)
+            return 0
+        return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
+
+    def _run(self):
+        try:
+            wc = win32gui.WNDCLASS()
+            wc.hInstance = win32api.GetModuleHandle(None)
+            wc.lpszClassName = WINDOW_CLASS_NAME
+            wc.lpfnWndProc = self._wnd_proc
+            try:
+                win32gui.RegisterClass(wc)
+            except win32gui.error:
+                pass  # 类已注册（重新启动监听时）
+            self._hwnd = win32gui.CreateWindow(
+                WINDOW_CLASS_NAME, WINDOW_CLASS_NAME, 0,
+                0, 0, 0, 0, 0, 0, wc.hInstance, None
+            )
+            logging.info("Display change listener started")
+        except Exception as e:
+            logging.error(f"Failed to create display change listener: {e}")
+            return
+        finally:
+            self._ready.set()
+        win32gui.PumpMessages()
+        self._hwnd = None
+        logging.info("Display change listener stopped")
+
+
+class SimulatedDisplayChangeSource(DisplayChangeSource):
+    """模拟通知源: 订阅模拟后端的生效事件，也可直接调用 notify 驱动"""
+
+    def __init__(self, backend: Optional[SimulatedDisplayBackend] = None):
+        super().__init__()
+        self.backend = backend
+
+    def start(self, callback: Callable[[str], None]):
+        super().start(callback)
+        if self.backend is not None:
+            self.backend.add_change_listener(self.notify)
+
+    def stop(self):
+        if self.backend is not None:
+            self.backend.remove_change_listener(self.notify)
+        super().stop()
+
+
+def create_change_source(backend: DisplayBackend) -> Optional[DisplayChangeSource]:
+    """为后端选择合适的通知源；不可用时返回 None（退回手动刷新）"""
+    if isinstance(backend, SimulatedDisplayBackend):
+        return SimulatedDisplayChangeSource(backend)
+    try:
+        return Win32DisplayChangeSource()
+    except Exception as e:
+        logging.warning(f"Display change notifications unavailable: {e}")
+        return None
@@ -0,0 +1,347 @@
+# EDID 解析
+# 读取显示器自报的厂商、型号、序列号与原生时序，用于友好名称、稳定标识和原生分辨率：
+# - 基本块（128 字节）: 厂商 PNP ID、产品码、序列号、生产日期、版本、物理尺寸，
+#   以及 4 个 18 字节描述符（详细时序 / 显示器名称 0xFC / 序列号文本 0xFF）
+# - CTA-861 扩展块（标签 0x02）: 详细时序与视频数据块（SVD，带原生标记）
+# - DisplayID 扩展块（标签 0x70）: 1.x 类型 I 详细时序（0x03）与 2.x 类型 VII 详细时序（0x22）
+# 解析结果按内容哈希缓存，同一块 EDID 只解析一次。
+# Windows 从注册表读取（见 backend.py），Linux 可直接读取 /sys/class/drm/*/edid。
+
+import os
+import glob
+import hashlib
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+EDID_HEADER = b'\x00\xff\xff\xff\xff\xff\xff\x00'
+BLOCK_SIZE = 128
+
+EXTENSION_CTA = 0x02
+EXTENSION_DISPLAYID = 0x70
+
+DESCRIPTOR_SERIAL = 0xFF
+DESCRIPTOR_NAME = 0xFC
+
+CTA_VIDEO_DATA_BLOCK = 2
+DISPLAYID_TYPE_I_TIMING = 0x03
+DISPLAYID_TYPE_VII_TIMING = 0x22
+
+# 常见的逐行 CTA-861 VIC -> (宽, 高, 刷新率)
+CTA_VICS = {
+    1: (640, 480, 60),
+    2: (720, 480, 60),
+    3: (720, 480, 60),
+    4: (1280, 720, 60),
+    16: (1920, 1080, 60),
+    17: (720, 576, 50),
+    18: (720, 576, 50),
+    19: (1280, 720, 50),
+    31: (1920, 1080, 50),
+    32: (1920, 1080, 24),
+    33: (1920, 1080, 25),
+    34: (1920, 1080, 30),
+    63: (1920, 1080, 120),
+    64: (1920, 1080, 100),
+    93: (3840, 2160, 24),
+    94: (3840, 2160, 25),
+    95: (3840, 2160, 30),
+    96: (3840, 2160, 50),
+    97: (3840, 2160, 60),
+    98: (4096, 2160, 24),
+    99: (4096, 2160, 25),
+    100: (4096, 2160, 30),
+    101: (4096, 2160, 50),
+    102: (4096, 2160, 60),
+    117: (3840, 2160, 100),
+    118: (3840, 2160, 120),
+}
+
+
+class EdidError(ValueError):
+    """EDID 数据无效（长度、头或校验和错误）"""
+
+
+class Timing(NamedTuple):
+    """一个显示时序；refresh 为实际刷新率（Hz，可能带小数）"""
+    width: int
+    height: int
+    refresh: float
+    interlaced: bool = False
+    preferred: bool = False  # 基本块首个详细时序 / DisplayID 首选标记
+    native: bool = False  # CTA-861 SVD 原生标记
+
+
+class EdidInfo(NamedTuple):
+    manufacturer: str  # PNP ID，如 DEL
+    product_code: int
+    serial_number: int  # 基本块中的 32 位序列号，0 表示未提供
+    serial_text: str  # 描述符 0xFF 中的序列号文本
+    name: str  # 描述符 0xFC 中的型号名称
+    week: int
+    year: int
+    version: str
+    width_cm: int
+    height_cm: int
+    timings: Tuple[Timing, ...]  # 所有详细时序与原生 SVD（基本块在前）
+    extensions: Tuple[int, ...]  # 扩展块标签
+    digest: str
+
+    @property
+    def hardware_id(self) -> str:
+        """与 Windows 硬件 ID 相同的形式，如 DEL4123"""
+        return f'{self.manufacturer}{self.product_code:04X}'
+
+    @property
+    def serial(self) -> str:
+        """序列号: 优先文本描述符，其次 32 位序列号；都没有时为空字符串"""
+        if self.serial_text:
+            return self.serial_text
+        return str(self.serial_number) if self.serial_number else ''
+
+    @property
+    def display_name(self) -> str:
+        return self.name or self.hardware_id
+
+    @property
+    def preferred(self) -> Optional[Timing]:
+        return next((t for t in self.timings if t.preferred), None)
+
+    @property
+    def native(self) -> Optional[Timing]:
+        """原生模式: 首选时序（基本块第一个详细时序）；没有时取逐行时序中面积最大者，
+        同分辨率取带首选/原生标记、刷新率最高的一个
+
+        不带原生标记的 SVD 不参与（电视常列出需要缩放的更高分辨率）
+        """
+        preferred = self.preferred
+        if preferred is not None and not preferred.interlaced:
+            return preferred
+        candidates = [t for t in self.timings if not t.interlaced]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda t: (t.width * t.height, t.preferred or t.native, t.refresh))
+
+
+# --- 解析 ---
+def _checksum_ok(block: bytes) -> bool:
+    return sum(block) % 256 == 0
+
+
+def _text(payload: bytes) -> str:
+    """描述符文本: 以 0x0A 结束，0x20 填充"""
+    return payload.split(b'\x0a')[0].decode('ascii', errors='replace').strip()
+
+
+def decode_manufacturer(value: int) -> str:
+    """两字节大端、每字母 5 位的 PNP ID"""
+    return ''.join(chr(((value >> shift) & 0x1F) + ord('A') - 1) for shift in (10, 5, 0))
+
+
+def decode_dtd(d: bytes) -> Optional[Timing]:
+    """18 字节详细时序描述符；像素时钟为 0 时是显示器描述符，返回 None"""
+    pixel_clock = (d[0] | d[1] << 8) * 10_000
+    if not pixel_clock:
+        return None
+    h_active = d[2] | (d[4] & 0xF0) << 4
+    h_blank = d[3] | (d[4] & 0x0F) << 8
+    v_active = d[5] | (d[7] & 0xF0) << 4
+    v_blank = d[6] | (d[7] & 0x0F) << 8
+    total = (h_active + h_blank) * (v_active + v_blank)
+    refresh = pixel_clock / total if total else 0.0
+    return Timing(h_active, v_active, round(refresh, 2), interlaced=bool(d[17] & 0x80))
+
+
+def decode_cta(block: bytes) -> List[Timing]:
+    """CTA-861 扩展块: 原生 SVD 与详细时序"""
+    timings = []
+    dtd_offset = block[2]
+    if dtd_offset >= 4:
+        offset = 4
+        while offset < dtd_offset:
+            header = block[offset]
+            tag, length = header >> 5, header & 0x1F
+            if tag == CTA_VIDEO_DATA_BLOCK:
+                for svd in block[offset + 1:offset + 1 + length]:
+                    # CTA-861-F: 129-192 为带原生标记的 VIC 1-64
+                    native = 129 <= svd <= 192
+                    vic = svd & 0x7F if native else svd
+                    if native and vic in CTA_VICS:
+                        width, height, refresh = CTA_VICS[vic]
+                        timings.append(Timing(width, height, float(refresh), native=True))
+            offset += 1 + length
+    if dtd_offset:
+        for offset in range(dtd_offset, BLOCK_SIZE - 18, 18):
+            timing = decode_dtd(block[offset:offset + 18])
+            if timing is None:
+                break
+            timings.append(timing)
+    return timings
+
+
+def decode_displayid_timing(d: bytes, clock_unit: int) -> Timing:
+    """DisplayID 20 字节详细时序（类型 I 时钟单位 10 kHz，类型 VII 为 1 kHz，均为值 +1）"""
+    pixel_clock = ((d[0] | d[1] << 8 | d[2] << 16) + 1) * clock_unit
+    h_active = (d[4] | d[5] << 8) + 1
+    h_blank = (d[6] | d[7] << 8) + 1
+    v_active = (d[12] | d[13] << 8) + 1
+    v_blank = (d[14] | d[15] << 8) + 1
+    total = (h_active + h_blank) * (v_active + v_blank)
+    refresh = pixel_clock / total if total else 0.0
+    return Timing(h_active, v_active, round(refresh, 2),
+                  interlaced=bool(d[3] & 0x10), preferred=bool(d[3] & 0x80))
+
+
+def decode_displayid(block: bytes) -> List[Timing]:
+    """DisplayID 扩展块中的类型 I / VII 详细时序"""
+    timings = []
+    section_end = min(5 + block[2], BLOCK_SIZE - 1)
+    offset = 5
+    while offset + 3 <= section_end:
+        tag, length = block[offset], block[offset + 2]
+        payload = block[offset + 3:offset + 3 + length]
+        if tag in (DISPLAYID_TYPE_I_TIMING, DISPLAYID_TYPE_VII_TIMING):
+            clock_unit = 10_000 if tag == DISPLAYID_TYPE_I_TIMING else 1_000
+            for start in range(0, len(payload) - 19, 20):
+                timings.append(decode_displayid_timing(payload[start:start + 20], clock_unit))
+        elif tag == 0 and length == 0:
+            break  # 填充
+        offset += 3 + length
+    return timings
+
+
+def parse_edid(blob: bytes) -> EdidInfo:
+    """解析 EDID（基本块与扩展块）；基本块无效时抛出 EdidError，校验和错误的扩展块被忽略"""
+    blob = bytes(blob)
+    if len(blob) < BLOCK_SIZE:
+        raise EdidError(f"EDID 长度不足: {len(blob)} 字节")
+    base = blob[:BLOCK_SIZE]
+    if base[:8] != EDID_HEADER:
+        raise EdidError("EDID 头无效")
+    if not _checksum_ok(base):
+        raise EdidError("EDID 基本块校验和错误")
+
+    name = serial_text = ''
+    timings = []
+    for offset in (54, 72, 90, 108):
+        d = base[offset:offset + 18]
+        timing = decode_dtd(d)
+        if timing is not None:
+            # EDID 1.3 起第一个详细时序即首选时序
+            timings.append(timing._replace(preferred=offset == 54))
+        elif d[3] == DESCRIPTOR_NAME:
+            name = _text(d[5:])
+        elif d[3] == DESCRIPTOR_SERIAL:
+            serial_text = _text(d[5:])
+
+    extensions = []
+    for index in range(1, min(base[126], len(blob) // BLOCK_SIZE - 1) + 1):
+        block = blob[index * BLOCK_SIZE:(index + 1) * BLOCK_SIZE]
+        extensions.append(block[0])
+        if not _checksum_ok(block):
+            logging.warning(f"EDID extension block {index} checksum mismatch, ignored")
+            continue
+        if block[0] == EXTENSION_CTA:
+            timings += decode_cta(block)
+        elif block[0] == EXTENSION_DISPLAYID:
+            timings += decode_displayid(block)
+
+    return EdidInfo(
+        manufacturer=decode_manufacturer(base[8] << 8 | base[9]),
+        product_code=base[10] | base[11] << 8,
+        serial_number=int.from_bytes(base[12:16], 'little'),
+        serial_text=serial_text,
+        name=name,
+        week=base[16],
+        year=base[17] + 1990,
+        version=f'{base[18]}.{base[19]}',
+        width_cm=base[21],
+        height_cm=base[22],
+        timings=tuple(timings),
+        extensions=tuple(extensions),
+        digest=hashlib.sha1(blob).hexdigest(),
+    )
+
+
+# --- 缓存 ---
+class EdidCache:
+    """内容哈希 -> 解析结果（线程安全）；无效的 EDID 也缓存为 None，不会每次重试"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Optional[EdidInfo]] = {}
+        self.stats = {'parsed': 0, 'hits': 0}
+
+    def get(self, blob: bytes) -> Optional[EdidInfo]:
+        digest = hashlib.sha1(blob).hexdigest()
+        with self.lock:
+            if digest in self.entries:
+                self.stats['hits'] += 1
+                return self.entries[digest]
+        try:
+            info = parse_edid(blob)
+        except EdidError as e:
+            logging.warning(f"Invalid EDID {digest[:12]}: {e}")
+            info = None
+        with self.lock:
+            self.stats['parsed'] += 1
+            self.entries[digest] = info
+        return info
+
+
+edid_cache = EdidCache()
+
+
+# --- 读取与构造 ---
+def read_sysfs_edids(root: str = '/sys/class/drm') -> Dict[str, bytes]:
+    """Linux: 连接器名（如 card0-DP-1）-> EDID；未连接的连接器 edid 文件为空，跳过"""
+    edids = {}
+    for path in sorted(glob.glob(os.path.join(root, '*', 'edid'))):
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+        except OSError:
+            continue
+        if blob:
+            edids[os.path.basename(os.path.dirname(path))] = blob
+    return edids
+
+
+def _descriptor(tag: int, text: str) -> bytes:
+    payload = text.encode('ascii')[:13]
+    if len(payload) < 13:
+        payload += b'\x0a' + b'\x20' * (12 - len(payload))
+    return bytes([0, 0, 0, tag, 0]) + payload
+
+
+def build_edid(manufacturer: str, product_code: int, serial_number: int, name: str,
+               width: int, height: int, refresh: int, serial_text: str = '') -> bytes:
+    """构造只有基本块的 EDID（模拟后端与测试数据使用），首选时序为 width x height @ refresh"""
+    h_blank, v_blank = 80, 20  # 简化的消隐，只需保证刷新率能还原
+    pixel_clock = round((width + h_blank) * (height + v_blank) * refresh / 10_000)
+    if pixel_clock > 0xFFFF:
+        raise ValueError(f"像素时钟超出详细时序范围: {width}x{height}@{refresh}")
+    dtd = bytes([
+        pixel_clock & 0xFF, pixel_clock >> 8,
+        width & 0xFF, h_blank & 0xFF, (width >> 8) << 4 | h_blank >> 8,
+        height & 0xFF, v_blank & 0xFF, (height >> 8) << 4 | v_blank >> 8,
+        8, 32, 0x11, 0,  # 同步偏移与宽度
+        0, 0, 0,  # 物理尺寸 mm
+        0, 0,  # 边框
+        0x1E,  # 逐行、数字分离同步
+    ])
+    code = sum((ord(c) - ord('A') + 1) << shift for c, shift in zip(manufacturer.upper(), (10, 5, 0)))
+    base = bytearray(EDID_HEADER)
+    base += code.to_bytes(2, 'big') + product_code.to_bytes(2, 'little') + serial_number.to_bytes(4, 'little')
+    base += bytes([1, 30, 1, 4])  # 生产周/年（2020）与 EDID 1.4
+    base += bytes([0xA5, 60, 34, 120, 0x3A])  # 数字输入、尺寸 60x34 cm、gamma、特性
+    base += bytes(10)  # 色度坐标
+    base += bytes(3)  # 既定时序
+    base += b'\x01\x01' * 8  # 标准时序（未使用）
+    base += dtd
+    base += _descriptor(DESCRIPTOR_NAME, name)
+    base += _descriptor(DESCRIPTOR_SERIAL, serial_text) if serial_text else bytes([0, 0, 0, 0x10]) + bytes(14)
+    base += bytes([0, 0, 0, 0x10]) + bytes(14)  # 空描述符
+    base += bytes([0])  # 扩展块数
+    base.append((256 - sum(base) % 256) % 256)
+    return bytes(base)
@@ -0,0 +1,164 @@
+# 显示器稳定标识
+# 枚举编号（EnumDisplayDevices 的适配器序号 / \\.\DISPLAYn）会随插拔、接口顺序和驱动重新枚举而变化，
+# 不能用来保存设置或下发命令。这里按设备接口 ID
+#   \\?\DISPLAY#DEL4123#5&2b1c3f&0&UID4352#{e6f07b5f-...}  ->  DEL4123#5&2B1C3F&0&UID4352
+# 为每台显示器分配持久键（型号码，如 DEL4123；同型号多台时 DEL4123-2），映射保存在每用户数据目录。
+# 有 EDID 序列号时（见 edid.py）同时登记 型号码#SN序列号，显示器换到别的接口后仍得到同一个键。
+# 键 -> 当前编号的内存索引只在首次使用和收到显示变更通知后用新的枚举结果重建；
+# 各键最后一次的编号也一并保存，新进程可以按键重新启用当前已禁用（不在枚举结果中）的显示器。
+# 命令与保存的设置使用键，执行时才解析为后端需要的编号。
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Union
+
+IDENTITY_VERSION = 1
+IDENTITY_FILE_NAME = 'monitor_identity.json'
+
+MonitorRef = Union[int, str]  # 当前编号（命令行手输）或持久键
+
+
+def interface_id(device_path: str) -> str:
+    """设备接口路径 -> 硬件 ID + 实例 ID（大写）；无法解析时为空字符串"""
+    parts = device_path.split('#')
+    if len(parts) < 3 or not parts[1] or not parts[2]:
+        return ''
+    return f'{parts[1]}#{parts[2]}'.upper()
+
+
+def identity_ids(monitor: Dict) -> List[str]:
+    """显示器的标识，稳定性从高到低: EDID 序列号（跨接口不变）、设备接口 ID（同一接口不变）"""
+    iid = interface_id(monitor.get('device_path') or '')
+    if not iid:
+        return []
+    serial = monitor.get('serial')
+    if serial:
+        return [f"{iid.split('#')[0]}#SN{serial.upper()}", iid]
+    return [iid]
+
+
+def parse_monitor_ref(value) -> MonitorRef:
+    """命令参数: 纯数字为当前编号，其余为持久键（不区分大小写）"""
+    text = str(value).strip()
+    if not text:
+        raise ValueError("显示器标识不能为空")
+    if not text.isdigit():
+        return text.upper()
+    if int(text) < 1:
+        raise ValueError(f"显示器编号从 1 开始: {text}")
+    return int(text)
+
+
+class IdentityResolver:
+    """接口 ID -> 持久键的分配与持久化，以及键 -> 当前编号的索引（线程安全）
+
+    path 为 None 时映射只在内存中（基准测试、模拟）
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.keys: Dict[str, str] = {}  # 标识（EDID 序列号 / 接口 ID）-> 持久键
+        self.index: Dict[str, int] = {}  # 持久键 -> 当前编号（含暂未启用的显示器上次的编号）
+        self.stale = True
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != IDENTITY_VERSION:
+                logging.info(f"Monitor identity file version {data.get('version')} ignored")
+                return
+            self.keys = {str(k): str(v) for k, v in data['keys'].items()}
+            self.index = {str(k): int(v) for k, v in data.get('last_ids', {}).items()}
+        except Exception as e:
+            logging.warning(f"Failed to load monitor identities: {e}")
+
+    def _save(self):
+        data = {'version': IDENTITY_VERSION, 'keys': self.keys, 'last_ids': self.index}
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except Exception as e:
+            logging.warning(f"Failed to save monitor identities: {e}")
+
+    def _key_for(self, monitor: Dict) -> str:
+        ids = identity_ids(monitor)
+        if not ids:
+            # 取不到设备路径时只能退回设备名：不稳定，也不持久化
+            return monitor['device_name'].lstrip('\\.').upper()
+        key = next((self.keys[i] for i in ids if i in self.keys), None)
+        if key is None:
+            base = ids[-1].split('#')[0]
+            taken = set(self.keys.values())
+            key, n = base, 2
+            while key in taken:
+                key = f'{base}-{n}'
+                n += 1
+            logging.info(f"New monitor identity {key} for {ids}")
+        # 登记其余标识（如首次读到 EDID 序列号、显示器换了接口）
+        for i in ids:
+            if self.keys.get(i) != key:
+                self.keys[i] = key
+                self._dirty = True
+        return key
+
+    def invalidate(self):
+        """显示变更通知：下次解析前用新的枚举结果重建索引"""
+        with self.lock:
+            self.stale = True
+
+    def annotate(self, monitors: List[Dict]) -> List[Dict]:
+        """为枚举结果附加持久键 'key'；索引失效时顺带重建"""
+        with self.lock:
+            for monitor in monitors:
+                monitor['key'] = self._key_for(monitor)
+            if self.stale:
+                self._rebuild(monitors)
+            if self._dirty and self.path:
+                self._save()
+        return monitors
+
+    def _rebuild(self, monitors: List[Dict]):
+        index = {m['key']: m['id'] for m in monitors}
+        seen_ids = set(index.values())
+        # 禁用的显示器不在枚举结果中：保留上次的编号以便重新启用，编号已被别的显示器占用时丢弃
+        for key, num in self.index.items():
+            if key not in index and num not in seen_ids:
+                index[key] = num
+        if index != self.index:
+            self._dirty = True
+        self.index = index
+        self.stale = False
+        logging.info(f"Monitor identity index rebuilt: {index}")
+
+    def key_of(self, num: int) -> Optional[str]:
+        """当前编号 -> 持久键（含暂未启用的显示器上次的编号）；索引失效时返回 None"""
+        with self.lock:
+            if self.stale:
+                return None
+            return next((key for key, value in self.index.items() if value == num), None)
+
+    def resolve(self, ref: MonitorRef) -> Optional[int]:
+        """键或编号 -> 当前编号；索引失效、键或编号未知时返回 None，由调用方重新枚举后再试
+
+        编号须在索引中（当前枚举到的，或暂未启用的显示器上次的编号）
+        """
+        with self.lock:
+            if self.stale:
+                return None
+            if isinstance(ref, int):
+                return ref if ref in self.index.values() else None
+            return self.index.get(ref.upper())
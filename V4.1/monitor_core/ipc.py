@@ -0,0 +1,205 @@
+# 单实例命令通道（协议与客户端）
+# 常驻实例用 QLocalServer 监听本地地址（Windows 命名管道 / Unix 域套接字，见 instance.py），
+# 之后的启动只用标准库连接该地址转发命令并立即退出，不创建 QApplication、不加载后端。
+#
+# 协议：每条消息一行 UTF-8 JSON
+#   请求 {"command": "single", "args": [2], "wait": false}   （显示器参数为编号或持久键，如 "DEL4123"）
+#   响应 {"ok": true, "message": "...", "op_id": 7, "state": "pending"}
+# wait 为 true 时，切换类命令在操作完成后才响应（state 为最终状态）
+
+import os
+import sys
+import json
+import time
+import socket
+import getpass
+import tempfile
+from typing import Dict, List, Optional
+
+from .identity import parse_monitor_ref
+
+INSTANCE_NAME = 'MonitorManagerV7'
+
+CONNECT_TIMEOUT = 2.0  # 秒
+WAIT_TIMEOUT = 60.0  # wait 请求等待操作完成的上限
+
+# 命名管道打开失败的错误码
+ERROR_FILE_NOT_FOUND = 2
+ERROR_PIPE_BUSY = 231
+
+# 命令 -> 参数个数
+COMMANDS = {
+    'ping': 0,
+    'show': 0,
+    'refresh': 0,
+    'status': 0,
+    'single': 1,
+    'extend': 0,
+    'clone': 0,
+    'save_config': 0,
+    'load_config': 0,
+    'quit': 0,
+}
+
+
+class IPCError(Exception):
+    """请求格式错误或通信失败"""
+    pass
+
+
+def server_address() -> str:
+    """每用户的本地监听地址；QLocalServer 与标准库客户端共用"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = 'default'
+    name = f'{INSTANCE_NAME}-{user}'
+    if sys.platform == 'win32':
+        return '\\\\.\\pipe\\' + name
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(base, f'{name}.sock')
+
+
+# --- 编解码 ---
+def make_request(command: str, args: Optional[List] = None, wait: bool = False) -> Dict:
+    if command not in COMMANDS:
+        raise IPCError(f"未知命令: {command}")
+    args = list(args or [])
+    if len(args) != COMMANDS[command]:
+        raise IPCError(f"命令 {command} 需要 {COMMANDS[command]} 个参数")
+    try:
+        args = [parse_monitor_ref(arg) for arg in args]
+    except ValueError as e:
+        raise IPCError(str(e))
+    return {'command': command, 'args': args, 'wait': wait}
+
+
+def encode(message: Dict) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def decode(line: bytes) -> Dict:
+    try:
+        message = json.loads(line.decode('utf-8'))
+    except ValueError as e:
+        raise IPCError(f"无法解析消息: {e}")
+    if not isinstance(message, dict):
+        raise IPCError("消息必须是 JSON 对象")
+    return message
+
+
+def validate_request(message: Dict) -> Dict:
+    """服务端校验收到的请求，返回规范化的请求"""
+    return make_request(message.get('command'), message.get('args'), bool(message.get('wait')))
+
+
+# --- 命令行 ---
+# 命令行参数 -> 命令；--single 需要显示器编号或持久键
+ARGUMENT_COMMANDS = {
+    '--show': 'show',
+    '--refresh': 'refresh',
+    '--status': 'status',
+    '--single': 'single',
+    '--extend': 'extend',
+    '--clone': 'clone',
+    '--save-config': 'save_config',
+    '--load-config': 'load_config',
+    '--quit': 'quit',
+}
+
+
+def parse_command_args(argv: List[str]) -> Optional[Dict]:
+    """从命令行参数中取出要转发的命令；没有命令时返回 None，其他参数（--silent 等）忽略"""
+    request = None
+    wait = '--wait' in argv
+    for index, arg in enumerate(argv):
+        command = ARGUMENT_COMMANDS.get(arg)
+        if command is None:
+            continue
+        if request is not None:
+            raise IPCError("一次只能指定一个命令")
+        args = []
+        if COMMANDS[command]:
+            if index + 1 >= len(argv) or argv[index + 1].startswith('--'):
+                raise IPCError(f"{arg} 需要显示器编号或标识")
+            args = [argv[index + 1]]
+        request = make_request(command, args, wait)
+    return request
+
+
+def format_response(response: Dict) -> str:
+    text = response.get('message') or ('成功' if response.get('ok') else '失败')
+    if response.get('op_id') is not None:
+        text = f"#{response['op_id']} {text} ({response.get('state')})"
+    if response.get('status') is not None:
+        text += '\n' + json.dumps(response['status'], indent=4, ensure_ascii=False)
+    return text
+
+
+# --- 客户端 ---
+def _read_line(read) -> bytes:
+    data = b''
+    while not data.endswith(b'\n'):
+        chunk = read(4096)
+        if not chunk:
+            break
+        data += chunk
+    if not data:
+        raise IPCError("实例未响应即关闭了连接")
+    return data
+
+
+def _open_pipe(address: str, timeout: float):
+    """打开实例的命名管道；管道不存在（没有实例）时返回 None
+
+    所有管道实例都忙（ERROR_PIPE_BUSY）说明实例存在，用 WaitNamedPipe 等待空闲，
+    超过 timeout 仍忙时报错，而不是当作没有实例再启动一个
+    """
+    import ctypes
+    wait_named_pipe = ctypes.WinDLL('kernel32', use_last_error=True).WaitNamedPipeW
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return open(address, 'r+b', buffering=0)
+        except OSError as e:
+            error = getattr(e, 'winerror', None)
+            if error != ERROR_PIPE_BUSY:
+                if error not in (None, ERROR_FILE_NOT_FOUND):
+                    raise IPCError(f"无法连接实例: {e}")
+                return None
+        remaining = deadline - time.monotonic()
+        if remaining > 0 and wait_named_pipe(address, max(1, int(remaining * 1000))):
+            continue
+        if remaining > 0 and ctypes.get_last_error() == ERROR_FILE_NOT_FOUND:
+            return None  # 等待期间实例已退出
+        raise IPCError(f"实例忙，连接超时（{timeout:.0f} 秒）")
+
+
+def send_command(request: Dict, address: Optional[str] = None,
+                 timeout: Optional[float] = None) -> Optional[Dict]:
+    """发送到运行中的实例并返回响应；没有实例在监听时返回 None"""
+    address = address or server_address()
+    if timeout is None:
+        timeout = WAIT_TIMEOUT if request.get('wait') else CONNECT_TIMEOUT
+    if sys.platform == 'win32':
+        pipe = _open_pipe(address, CONNECT_TIMEOUT)
+        if pipe is None:
+            return None
+        with pipe:
+            pipe.write(encode(request))
+            return decode(_read_line(pipe.read))
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        try:
+            sock.connect(address)
+        except OSError:
+            return None
+        try:
+            sock.sendall(encode(request))
+            return decode(_read_line(sock.recv))
+        except socket.timeout:
+            raise IPCError(f"等待实例响应超时（{timeout:.0f} 秒）")
+    finally:
+        sock.close()
@@ -0,0 +1,169 @@
+# 非阻塞日志管道
+# 所有线程只把 LogRecord 放入内存队列（QueueHandler），由 QueueListener 的后台线程写文件，
+# GUI 事件循环和执行中的拓扑切换不会因磁盘 I/O 卡顿。
+# - 文本日志: 按大小轮转，轮转出的旧文件 gzip 压缩
+# - 可选 JSON-lines: 每条记录一行 JSON，附带操作编号（op_id）与耗时（duration_ms）
+# 日志目录位于每用户数据目录，不再依赖当前工作目录（--onefile 时为临时解压目录）
+
+import os
+import sys
+import json
+import queue
+import logging
+import threading
+import logging.handlers
+from contextlib import contextmanager
+from typing import List, Optional
+
+APP_DIR_NAME = 'MonitorManager'
+DATA_DIR_ENV_VAR = 'MONITOR_MANAGER_DATA_DIR'
+JSON_LOG_ENV_VAR = 'MONITOR_MANAGER_JSON_LOG'
+
+LOG_FILE_NAME = 'monitor_manager.log'
+JSON_LOG_FILE_NAME = 'monitor_manager.jsonl'
+LOG_MAX_BYTES = 2 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_context = threading.local()
+
+
+def user_data_dir() -> str:
+    """每用户数据目录: %LOCALAPPDATA%\\MonitorManager 或 ~/.local/state/MonitorManager"""
+    override = os.environ.get(DATA_DIR_ENV_VAR)
+    if override:
+        return override
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    else:
+        base = os.environ.get('XDG_STATE_HOME') or os.path.expanduser('~/.local/state')
+    return os.path.join(base, APP_DIR_NAME)
+
+
+def log_dir() -> str:
+    return os.path.join(user_data_dir(), 'logs')
+
+
+# --- 操作上下文 ---
+@contextmanager
+def operation_context(op_id: int):
+    """在当前线程内为日志记录附加操作编号"""
+    previous = getattr(_context, 'op_id', None)
+    _context.op_id = op_id
+    try:
+        yield
+    finally:
+        _context.op_id = previous
+
+
+def current_op_id() -> Optional[int]:
+    return getattr(_context, 'op_id', None)
+
+
+class OperationContextFilter(logging.Filter):
+    """在产生记录的线程中读取当前操作编号（入队前执行，监听线程中已无上下文）"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, 'op_id', None) is None:
+            record.op_id = current_op_id()
+        return True
+
+
+# --- 格式与写入 ---
+class JsonLinesFormatter(logging.Formatter):
+    """每条记录一行 JSON；op_id / duration_ms 可通过 extra 传入"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        op_id = getattr(record, 'op_id', None)
+        if op_id is not None:
+            entry['op_id'] = op_id
+        duration = getattr(record, 'duration_ms', None)
+        if duration is not None:
+            entry['duration_ms'] = round(duration, 3)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _gzip_namer(name: str) -> str:
+    return name + '.gz'
+
+
+def _gzip_rotator(source: str, dest: str):
+    import gzip
+    import shutil
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def compressed_rotating_handler(path: str, max_bytes: int = LOG_MAX_BYTES,
+                                backup_count: int = LOG_BACKUP_COUNT) -> logging.Handler:
+    """按大小轮转的文件 handler，旧文件压缩为 .1.gz、.2.gz …"""
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes,
+                                                   backupCount=backup_count, encoding='utf-8')
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    return handler
+
+
+class LogPipeline:
+    """QueueHandler → QueueListener → 文件 handler；stop() 时写完队列中的剩余记录"""
+
+    def __init__(self, listener: logging.handlers.QueueListener,
+                 queue_handler: logging.Handler, paths: List[str]):
+        self.listener = listener
+        self.queue_handler = queue_handler
+        self.paths = paths
+        self._stopped = False
+
+    def stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        logging.getLogger().removeHandler(self.queue_handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+def setup_logging(directory: Optional[str] = None, level: int = logging.INFO,
+                  json_lines: Optional[bool] = None, max_bytes: int = LOG_MAX_BYTES,
+                  backup_count: int = LOG_BACKUP_COUNT) -> LogPipeline:
+    """配置根 logger；json_lines 为 None 时读取环境变量 MONITOR_MANAGER_JSON_LOG"""
+    directory = directory or log_dir()
+    os.makedirs(directory, exist_ok=True)
+    if json_lines is None:
+        json_lines = os.environ.get(JSON_LOG_ENV_VAR, '') not in ('', '0')
+
+    text_path = os.path.join(directory, LOG_FILE_NAME)
+    text_handler = compressed_rotating_handler(text_path, max_bytes, backup_count)
+    text_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers = [text_handler]
+    paths = [text_path]
+
+    if json_lines:
+        json_path = os.path.join(directory, JSON_LOG_FILE_NAME)
+        json_handler = compressed_rotating_handler(json_path, max_bytes, backup_count)
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+        paths.append(json_path)
+
+    record_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(record_queue)
+    queue_handler.addFilter(OperationContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(record_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return LogPipeline(listener, queue_handler, paths)
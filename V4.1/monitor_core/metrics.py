@@ -0,0 +1,258 @@
+# 耗时指标
+# 对每个操作（单屏、双屏扩展、DisplaySwitch、配置加载…）和每个步骤
+# （MultiMonitorTool 进程、ChangeDisplaySettingsEx、全局应用、SetDisplayConfig、生效等待、刷新）计时:
+# - 累计直方图（固定分桶，Prometheus histogram 语义，可跨机器/驱动版本比较）
+# - 最近 N 个样本的滚动窗口，用于 p50/p95/p99
+# 按需导出为 JSON 与 Prometheus 文本格式（可交给 node_exporter textfile collector 收集）
+
+import os
+import json
+import math
+import time
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+# 分桶上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROLLING_WINDOW = 500
+QUANTILES = (0.5, 0.95, 0.99)
+
+METRIC_PREFIX = 'monitor_manager'
+
+# 步骤名称
+STEP_MULTIMONITORTOOL = 'multimonitortool'
+STEP_DISPLAYSWITCH = 'displayswitch'
+STEP_CHANGE_SETTINGS = 'change_display_settings'
+STEP_GLOBAL_APPLY = 'global_apply'
+STEP_SET_DISPLAY_CONFIG = 'set_display_config'
+STEP_SETTLE = 'settle'
+STEP_REFRESH = 'refresh'
+
+# 启动到首次填充控件（可交互）的耗时，记入操作族
+OPERATION_TIME_TO_INTERACTIVE = 'time_to_interactive'
+
+# 指标族: 操作（用户可见的一次切换）与步骤（操作内部的单个调用）
+OPERATION = 'operation'
+STEP = 'step'
+
+
+def _quantile(ordered: List[float], q: float) -> float:
+    """最近秩法分位数（ordered 已排序，q 为 0~1）"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """最近秩法百分位数（基准测试报告使用，pct 为 0~100）"""
+    return _quantile(sorted(samples), pct / 100.0)
+
+
+class LatencyHistogram:
+    """单个 (族, 名称) 的耗时统计"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, window: int = ROLLING_WINDOW):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds: float, error: bool = False):
+        self.count += 1
+        self.total += seconds
+        if error:
+            self.errors += 1
+        self.recent.append(seconds)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """Prometheus 累计分桶 (上界, 小于等于该上界的样本数)"""
+        running = 0
+        result = []
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+    def quantiles(self) -> Dict[float, float]:
+        ordered = sorted(self.recent)
+        return {q: _quantile(ordered, q) for q in QUANTILES}
+
+    def to_dict(self) -> Dict:
+        quantiles = self.quantiles()
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'sum_seconds': round(self.total, 6),
+            'mean_seconds': round(self.total / self.count, 6) if self.count else 0.0,
+            'buckets': [{'le': bound, 'count': count} for bound, count in self.cumulative_buckets()],
+            'recent': {
+                'samples': len(self.recent),
+                'p50_seconds': round(quantiles[0.5], 6),
+                'p95_seconds': round(quantiles[0.95], 6),
+                'p99_seconds': round(quantiles[0.99], 6),
+                'max_seconds': round(max(self.recent), 6) if self.recent else 0.0,
+            },
+        }
+
+
+class MetricsRegistry:
+    """线程安全的指标注册表；labels 为导出时附带的机器信息"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, window: int = ROLLING_WINDOW):
+        self.buckets = tuple(buckets)
+        self.window = window
+        self.lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.labels: Dict[str, str] = {}
+        self.started_at = time.time()
+
+    def export_labels(self) -> Dict[str, str]:
+        """导出时附带的标签；机器信息在首次导出时才查询，不拖慢启动"""
+        import socket
+        import platform
+        labels = {'host': socket.gethostname(), 'platform': platform.platform()}
+        labels.update(self.labels)
+        return labels
+
+    def set_label(self, key: str, value: str):
+        with self.lock:
+            self.labels[key] = str(value)
+
+    def observe(self, family: str, name: str, seconds: float, error: bool = False):
+        with self.lock:
+            histogram = self.histograms.get((family, name))
+            if histogram is None:
+                histogram = LatencyHistogram(self.buckets, self.window)
+                self.histograms[(family, name)] = histogram
+            histogram.observe(seconds, error)
+
+    @contextmanager
+    def timed(self, family: str, name: str):
+        """计时上下文；抛出异常时计入 errors 并继续抛出"""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(family, name, time.perf_counter() - start, error)
+
+    def step(self, name: str):
+        return self.timed(STEP, name)
+
+    def operation(self, name: str):
+        return self.timed(OPERATION, name)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.started_at = time.time()
+
+    # --- 导出 ---
+    def to_dict(self) -> Dict:
+        with self.lock:
+            families = {OPERATION: {}, STEP: {}}
+            for (family, name), histogram in sorted(self.histograms.items()):
+                families.setdefault(family, {})[name] = histogram.to_dict()
+            return {
+                'labels': self.export_labels(),
+                'started_at': self.started_at,
+                'exported_at': time.time(),
+                'operations': families[OPERATION],
+                'steps': families[STEP],
+            }
+
+    def to_prometheus(self) -> str:
+        with self.lock:
+            return self._render_prometheus()
+
+    def _render_prometheus(self) -> str:
+        items = sorted(self.histograms.items())
+        base = ','.join(f'{k}="{_escape(v)}"' for k, v in sorted(self.export_labels().items()))
+        lines = [
+            f'# HELP {METRIC_PREFIX}_info Machine the metrics were collected on.',
+            f'# TYPE {METRIC_PREFIX}_info gauge',
+            f'{METRIC_PREFIX}_info{{{base}}} 1',
+        ]
+        for family in (OPERATION, STEP):
+            metric = f'{METRIC_PREFIX}_{family}_duration_seconds'
+            lines.append(f'# HELP {metric} Duration of each {family}.')
+            lines.append(f'# TYPE {metric} histogram')
+            for (item_family, name), histogram in items:
+                if item_family != family:
+                    continue
+                label = f'{family}="{_escape(name)}"'
+                for bound, count in histogram.cumulative_buckets():
+                    lines.append(f'{metric}_bucket{{{label},le="{bound:g}"}} {count}')
+                lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{{label}}} {histogram.total:.6f}')
+                lines.append(f'{metric}_count{{{label}}} {histogram.count}')
+
+            recent = f'{METRIC_PREFIX}_{family}_recent_duration_seconds'
+            lines.append(f'# HELP {recent} Quantiles over the last {self.window} samples of each {family}.')
+            lines.append(f'# TYPE {recent} gauge')
+            for (item_family, name), histogram in items:
+                if item_family != family:
+                    continue
+                for q, value in histogram.quantiles().items():
+                    lines.append(f'{recent}{{{family}="{_escape(name)}",quantile="{q:g}"}} {value:.6f}')
+
+            errors = f'{METRIC_PREFIX}_{family}_errors_total'
+            lines.append(f'# HELP {errors} Failed {family} count.')
+            lines.append(f'# TYPE {errors} counter')
+            for (item_family, name), histogram in items:
+                if item_family == family:
+                    lines.append(f'{errors}{{{family}="{_escape(name)}"}} {histogram.errors}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, directory: str, basename: str = 'metrics') -> Tuple[str, str]:
+        """写出 <basename>.json 与 <basename>.prom，返回两个路径"""
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f'{basename}.json')
+        prom_path = os.path.join(directory, f'{basename}.prom')
+        _write_atomic(json_path, json.dumps(self.to_dict(), indent=4, ensure_ascii=False))
+        _write_atomic(prom_path, self.to_prometheus())
+        return json_path, prom_path
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _write_atomic(path: str, text: str):
+    # textfile collector 可能随时读取，先写临时文件再替换
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# 进程内默认注册表，后端、生效检测与界面共用
+registry = MetricsRegistry()
+
+
+def timed_step(name: str):
+    return registry.step(name)
+
+
+def timed_operation(name: str):
+    """装饰器：记录整个操作的耗时"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with registry.operation(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,184 @@
+# 显示模式表
+# 每台显示器的完整模式列表（EnumDisplaySettings 按序号递增枚举，动辄数百项）只在首次使用时读取一次，
+# 存入按列排布的 array（宽、高、刷新率、色深），并建立 (宽, 高, 刷新率, 色深) -> 行号 的索引：
+# 界面与托盘列出分辨率、刷新率以及切换时查找目标模式都是查表，不再调用后端。
+# 模式按横向记录（与原生模式一致）；表按持久键缓存，收到 WM_DEVICECHANGE（插拔）后整体失效，
+# 同一键换了面板或设备名时也会重新读取。
+# 模式策略（每台显示器可设置）决定扩展时的目标模式: 原生分辨率下的最高刷新率（默认）、
+# 保持当前模式或用户指定的模式；选出的模式并入拓扑切换的同一次应用（见 planner.py）。
+
+import logging
+import threading
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .backend import DisplayBackend
+from .native_modes import panel_fingerprint
+
+MODE_POLICY_BEST = 'best'  # 原生分辨率下的最高刷新率
+MODE_POLICY_KEEP = 'keep'  # 保持当前模式
+MODE_POLICY_PREFERRED = 'preferred'  # 用户指定的模式
+MODE_POLICIES = (MODE_POLICY_BEST, MODE_POLICY_KEEP, MODE_POLICY_PREFERRED)
+
+
+class DisplayMode(NamedTuple):
+    width: int  # 横向
+    height: int
+    frequency: int
+    bits_per_pixel: int
+
+    def __str__(self):
+        return f"{self.width}x{self.height} @ {self.frequency}Hz"
+
+
+class ModePolicy(NamedTuple):
+    """显示器的模式策略；width / height / frequency 只用于 preferred（frequency 为 0 时取最高刷新率）"""
+    kind: str = MODE_POLICY_BEST
+    width: int = 0
+    height: int = 0
+    frequency: int = 0
+
+    def __str__(self):
+        if self.kind != MODE_POLICY_PREFERRED:
+            return self.kind
+        rate = f"@{self.frequency}" if self.frequency else ""
+        return f"{self.width}x{self.height}{rate}"
+
+
+DEFAULT_MODE_POLICY = ModePolicy()
+
+
+class ModeTable:
+    """一台显示器的全部模式（只读）
+
+    列: widths / heights / frequencies (array 'H')、depths (array 'B')；行按 面积、刷新率、色深 降序
+    index: (宽, 高, 刷新率, 色深) -> 行号；同一 (宽, 高, 刷新率) 取色深最高的一行
+    """
+
+    def __init__(self, modes: Iterable[Tuple[int, int, int, int]]):
+        rows = sorted(set(modes), key=lambda m: (m[0] * m[1], m[0], m[2], m[3]), reverse=True)
+        self.widths = array('H', (m[0] for m in rows))
+        self.heights = array('H', (m[1] for m in rows))
+        self.frequencies = array('H', (m[2] for m in rows))
+        self.depths = array('B', (m[3] for m in rows))
+        self.index: Dict[Tuple[int, int, int, int], int] = {}
+        self._deepest: Dict[Tuple[int, int, int], int] = {}
+        self._rates: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        for row, (width, height, frequency, depth) in enumerate(rows):
+            self.index[(width, height, frequency, depth)] = row
+            self._deepest.setdefault((width, height, frequency), row)
+            rates = self._rates.get((width, height), ())
+            if frequency not in rates:
+                self._rates[(width, height)] = rates + (frequency,)
+        self._resolutions = tuple(self._rates)
+
+    def __len__(self) -> int:
+        return len(self.widths)
+
+    def mode(self, row: int) -> DisplayMode:
+        return DisplayMode(self.widths[row], self.heights[row], self.frequencies[row], self.depths[row])
+
+    def find(self, width: int, height: int, frequency: int, bits_per_pixel: int = 0) -> Optional[DisplayMode]:
+        """精确查找；bits_per_pixel 为 0 时取该模式色深最高的一行"""
+        if bits_per_pixel:
+            row = self.index.get((width, height, frequency, bits_per_pixel))
+        else:
+            row = self._deepest.get((width, height, frequency))
+        return None if row is None else self.mode(row)
+
+    def best(self, width: int, height: int) -> Optional[DisplayMode]:
+        """该分辨率刷新率最高的模式"""
+        rates = self._rates.get((width, height))
+        return self.find(width, height, rates[0]) if rates else None
+
+    def resolutions(self) -> Tuple[Tuple[int, int], ...]:
+        """支持的分辨率，面积从大到小"""
+        return self._resolutions
+
+    def refresh_rates(self, width: int, height: int) -> Tuple[int, ...]:
+        """该分辨率支持的刷新率，从高到低"""
+        return self._rates.get((width, height), ())
+
+
+def select_mode(table: ModeTable, native: Optional[Tuple[int, int]], policy: ModePolicy) -> Optional[DisplayMode]:
+    """按策略从模式表选出目标模式（横向）；keep 或表中没有合适的模式时返回 None
+
+    native: 横向原生分辨率，未知时取表中面积最大的分辨率
+    """
+    if policy.kind == MODE_POLICY_KEEP or not len(table):
+        return None
+    if policy.kind == MODE_POLICY_PREFERRED:
+        mode = (table.find(policy.width, policy.height, policy.frequency) if policy.frequency
+                else table.best(policy.width, policy.height))
+        if mode is not None:
+            return mode
+        logging.warning(f"Preferred mode {policy} not supported, using native mode")
+    mode = table.best(*native) if native else None
+    return mode or table.best(*table.resolutions()[0])
+
+
+class ModeTableCache:
+    """持久键 -> ModeTable（线程安全）
+
+    generation 在表重建或失效时递增，托盘菜单缓存据此判断模式子菜单是否需要重建；
+    读取模式列表（逐项枚举，较慢）时不持有锁，GUI 线程的 peek 不会被阻塞
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables: Dict[str, Tuple[Tuple[str, str], ModeTable]] = {}
+        self.generation = 0
+        self._epoch = 0  # 每次 invalidate 递增：读取期间发生插拔时，读到的表不再缓存
+        self.stats = {'builds': 0, 'hits': 0}
+
+    @staticmethod
+    def _table_key(monitor: Dict) -> Tuple[str, Tuple[str, str]]:
+        return monitor.get('key') or monitor['device_name'], (monitor['device_name'], panel_fingerprint(monitor))
+
+    def invalidate(self):
+        """显示器插拔（WM_DEVICECHANGE）：下次使用时重新读取模式列表"""
+        with self.lock:
+            self._epoch += 1
+            if self.tables:
+                self.tables.clear()
+                self.generation += 1
+
+    def peek(self, monitor: Dict) -> Optional[ModeTable]:
+        """只取已缓存的表，不调用后端（GUI 线程构建菜单、填充下拉框时使用）"""
+        key, source = self._table_key(monitor)
+        with self.lock:
+            cached = self.tables.get(key)
+            return cached[1] if cached is not None and cached[0] == source else None
+
+    def last(self, key: str) -> Optional[ModeTable]:
+        """该持久键最近一次的表，不校验来源（为当前未启用的显示器选择模式时使用）"""
+        with self.lock:
+            cached = self.tables.get(key)
+            return cached[1] if cached is not None else None
+
+    def get(self, monitor: Dict, backend: DisplayBackend) -> ModeTable:
+        """取缓存的表，没有时读取一次后端的模式列表"""
+        key, source = self._table_key(monitor)
+        with self.lock:
+            cached = self.tables.get(key)
+            if cached is not None and cached[0] == source:
+                self.stats['hits'] += 1
+                return cached[1]
+            epoch = self._epoch
+        table = ModeTable(backend.list_modes(monitor['device_name']))
+        with self.lock:
+            cached = self.tables.get(key)
+            if cached is not None and cached[0] == source:
+                return cached[1]  # 其他线程已先读取完成
+            self.stats['builds'] += 1
+            if epoch != self._epoch:
+                logging.info(f"Mode table for {key} read across a device change, not cached")
+                return table
+            self.tables[key] = (source, table)
+            self.generation += 1
+        logging.info(f"Mode table for {key}: {len(table)} modes, {len(table.resolutions())} resolutions")
+        return table
+
+    def load(self, monitors: List[Dict], backend: DisplayBackend) -> List[ModeTable]:
+        """预先读取各显示器的模式表（已缓存的直接返回）"""
+        return [self.get(monitor, backend) for monitor in monitors]
@@ -0,0 +1,112 @@
+# 原生模式缓存
+# 每台显示器（按持久键）的横向原生分辨率与刷新率，只在首次见到该面板时从首选模式获取：
+# EDID 原生时序，没有 EDID 时取后端列出的最大显示模式（EnumDisplaySettings 模式列表）。
+# 面板指纹（EDID 内容哈希，无 EDID 时为设备接口 ID）变化时才重新获取；结果保存在每用户数据目录。
+# 旋转时直接使用缓存的原生尺寸，不再由当前模式反推（显示器在非原生模式下被枚举时反推结果是错的），
+# 也不需要为此再查询当前设置。
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from .backend import DisplayBackend
+from .identity import interface_id
+
+NATIVE_MODES_VERSION = 1
+NATIVE_MODES_FILE_NAME = 'native_modes.json'
+
+
+class NativeMode(NamedTuple):
+    width: int  # 横向
+    height: int
+    frequency: int
+    panel: str  # 面板指纹
+    source: str  # 'edid' / 'modes'
+
+
+def panel_fingerprint(monitor: Dict) -> str:
+    """EDID 内容哈希，无 EDID 时为设备接口 ID；都没有时为空字符串（不缓存）"""
+    return monitor.get('edid_digest') or interface_id(monitor.get('device_path') or '')
+
+
+class NativeModeCache:
+    """持久键 -> 原生模式（线程安全）；path 为 None 时只在内存中"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.modes: Dict[str, NativeMode] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != NATIVE_MODES_VERSION:
+                logging.info(f"Native mode cache version {data.get('version')} ignored")
+                return
+            self.modes = {key: NativeMode(**mode) for key, mode in data['modes'].items()}
+        except Exception as e:
+            logging.warning(f"Failed to load native mode cache: {e}")
+
+    def _save(self):
+        data = {'version': NATIVE_MODES_VERSION,
+                'modes': {key: mode._asdict() for key, mode in self.modes.items()}}
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except Exception as e:
+            logging.warning(f"Failed to save native mode cache: {e}")
+
+    def invalidate(self, keys: Iterable[str]):
+        """强制刷新：丢弃这些持久键的原生模式，下次附加时重新获取"""
+        with self.lock:
+            removed = [key for key in keys if self.modes.pop(key, None) is not None]
+            if removed and self.path:
+                self._save()
+        if removed:
+            logging.info(f"Native modes invalidated: {removed}")
+
+    def _mode_for(self, monitor: Dict, backend: DisplayBackend) -> Optional[NativeMode]:
+        key, panel = monitor.get('key'), panel_fingerprint(monitor)
+        if not key or not panel:
+            return None
+        mode = self.modes.get(key)
+        if mode is not None and mode.panel == panel:
+            return mode
+        # 首次见到该面板（或换了面板）：从首选模式获取一次
+        if monitor.get('native_width') and monitor.get('native_height'):
+            mode = NativeMode(monitor['native_width'], monitor['native_height'],
+                              monitor.get('native_frequency', 0), panel, 'edid')
+        else:
+            preferred = backend.preferred_mode(monitor['device_name'])
+            if preferred is None:
+                return None
+            mode = NativeMode(*preferred, panel, 'modes')
+        self.modes[key] = mode
+        self._dirty = True
+        logging.info(f"Native mode for {key}: {mode.width}x{mode.height} @ {mode.frequency}Hz ({mode.source})")
+        return mode
+
+    def attach(self, monitors: List[Dict], backend: DisplayBackend) -> List[Dict]:
+        """为带持久键的枚举结果附加 native_width / native_height / native_frequency"""
+        with self.lock:
+            for monitor in monitors:
+                mode = self._mode_for(monitor, backend)
+                if mode is not None:
+                    monitor['native_width'], monitor['native_height'] = mode.width, mode.height
+                    monitor['native_frequency'] = mode.frequency
+            if self._dirty and self.path:
+                self._save()
+        return monitors
@@ -0,0 +1,216 @@
+# 合并式操作队列（后到者优先）
+# 执行中的操作不被打断；排队中的同类操作只保留最新的目标，
+# 被替换的请求在替换者完成时一并完成（状态为 superseded，结果与替换者相同）。
+# 因此连续点击 N 次同类操作最多执行两次：正在执行的一次 + 最后一次。
+#
+# 队列本身不依赖 Qt，线程安全；由调用方（GUI 工作线程、守护进程、CLI）负责取出并执行。
+
+import time
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SUPERSEDED = 'superseded'
+
+FINISHED_STATES = (SUCCEEDED, FAILED, SUPERSEDED)
+
+_next_op_id = itertools.count(1)
+
+
+class OperationProgress(NamedTuple):
+    """执行器进度通道中的一条消息"""
+    op_id: int
+    description: str
+    message: str
+
+
+class OperationResult(NamedTuple):
+    """执行器结果通道中的一条消息
+
+    result: 操作函数的返回值（切换类操作为 SettleResult）
+    merged: 被本请求替换、随之完成的请求数
+    queued: 排队等待时间（秒）
+    elapsed: 执行耗时（秒）
+    """
+    op_id: int
+    kind: str
+    description: str
+    success: bool
+    result: Any
+    error: Optional[BaseException]
+    merged: int
+    queued: float
+    elapsed: float
+
+
+class OperationHandle:
+    """单个请求的句柄，可等待完成或注册完成回调
+
+    kind: 合并键，同类请求在排队时只保留最新一个
+    merged: 被本请求替换掉的旧请求
+    """
+
+    def __init__(self, kind: str, description: str, func: Callable, args: tuple, kwargs: Dict):
+        self.op_id = next(_next_op_id)
+        self.kind = kind
+        self.description = description
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.state = PENDING
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.superseded_by: Optional['OperationHandle'] = None
+        self.merged: List['OperationHandle'] = []
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+        self._callbacks: List[Callable[['OperationHandle'], None]] = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<OperationHandle #{self.op_id} {self.description} {self.state}>"
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def succeeded(self) -> bool:
+        """本请求或替换它的请求是否成功"""
+        return self.done and self.error is None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待完成，返回是否已完成"""
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, callback: Callable[['OperationHandle'], None]):
+        """完成时回调（在完成该请求的线程中调用）；已完成则立即调用"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def run(self):
+        return self.func(*self.args, **self.kwargs)
+
+    def outcome(self, merged: int = 0) -> OperationResult:
+        """已完成请求的结果记录"""
+        started = self.started_at if self.started_at is not None else self.submitted_at
+        finished = self.finished_at if self.finished_at is not None else started
+        return OperationResult(self.op_id, self.kind, self.description, self.error is None,
+                               self.result, self.error, merged,
+                               started - self.submitted_at, finished - started)
+
+    def _finish(self, state: str, result: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            if self._done.is_set():
+                return
+            self.state = state
+            self.result = result
+            self.error = error
+            self.finished_at = time.monotonic()
+            callbacks, self._callbacks = self._callbacks, []
+            self._done.set()
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logging.error(f"Operation callback failed for #{self.op_id}: {e}")
+
+
+class OperationQueue:
+    """按 kind 合并的 FIFO 队列，同一时刻只有一个请求处于执行状态"""
+
+    def __init__(self):
+        self._pending: 'OrderedDict[str, OperationHandle]' = OrderedDict()
+        self._running: Optional[OperationHandle] = None
+        self._cond = threading.Condition()
+        self.stats = {'submitted': 0, 'coalesced': 0, 'executed': 0}
+
+    def submit(self, kind: str, func: Callable, *args, description: Optional[str] = None,
+               **kwargs) -> OperationHandle:
+        """提交请求；排队中已有同类请求时替换之"""
+        handle = OperationHandle(kind, description or kind, func, args, kwargs)
+        with self._cond:
+            self.stats['submitted'] += 1
+            previous = self._pending.get(kind)
+            if previous is not None:
+                # 原地替换：新请求沿用旧请求的队列位置，不因合并而被推后
+                self.stats['coalesced'] += 1
+                previous.superseded_by = handle
+                handle.merged = previous.merged + [previous]
+                previous.merged = []
+                logging.info(f"Coalesced: #{previous.op_id} {previous.description} -> "
+                             f"#{handle.op_id} {handle.description}")
+            self._pending[kind] = handle
+            self._cond.notify_all()
+        return handle
+
+    def take(self, timeout: Optional[float] = 0) -> Optional[OperationHandle]:
+        """取出下一个请求并标记为执行中
+
+        timeout=0 不阻塞；None 一直等待。已有执行中的请求或队列为空时返回 None
+        """
+        with self._cond:
+            if timeout != 0:
+                self._cond.wait_for(lambda: self._pending and self._running is None, timeout)
+            if self._running is not None or not self._pending:
+                return None
+            _, handle = self._pending.popitem(last=False)
+            handle.state = RUNNING
+            handle.started_at = time.monotonic()
+            self._running = handle
+            self.stats['executed'] += 1
+            return handle
+
+    def complete(self, handle: OperationHandle, result: Any = None,
+                 error: Optional[BaseException] = None) -> OperationResult:
+        """标记执行完成，并完成被它替换的请求，返回结果记录"""
+        with self._cond:
+            if self._running is handle:
+                self._running = None
+            merged, handle.merged = handle.merged, []
+            self._cond.notify_all()
+        handle._finish(FAILED if error is not None else SUCCEEDED, result, error)
+        for old in merged:
+            old._finish(SUPERSEDED, result, error)
+        return handle.outcome(len(merged))
+
+    def cancel_pending(self) -> List[OperationHandle]:
+        """丢弃所有排队中的请求（退出时使用），返回被丢弃的句柄"""
+        with self._cond:
+            dropped = list(self._pending.values())
+            self._pending.clear()
+            self._cond.notify_all()
+        cancelled = RuntimeError("操作已取消")
+        for handle in dropped:
+            for old in handle.merged:
+                old._finish(FAILED, None, cancelled)
+            handle._finish(FAILED, None, cancelled)
+        return dropped
+
+    @property
+    def running(self) -> Optional[OperationHandle]:
+        return self._running
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def is_idle(self) -> bool:
+        with self._cond:
+            return self._running is None and not self._pending
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """等待队列清空且没有执行中的请求"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._running is None and not self._pending, timeout)
@@ -0,0 +1,24 @@
+# 方向与分辨率换算
+# 纵向模式下宽高互换；原生分辨率按横向记录
+# 有原生模式时（native_width / native_height，来自 EDID 或原生模式缓存）以它为准，
+# 否则由当前模式推算（当前不是原生分辨率时会得到错误的结果）
+
+from typing import Dict, Tuple
+
+from .backend import PORTRAIT_ORIENTATIONS
+
+
+def native_size(monitor: Dict) -> Tuple[int, int]:
+    """横向原生分辨率: 优先已知的原生模式，其次由当前模式推算"""
+    if monitor.get('native_width') and monitor.get('native_height'):
+        return monitor['native_width'], monitor['native_height']
+    if monitor['orientation'] in PORTRAIT_ORIENTATIONS:
+        return monitor['height'], monitor['width']
+    return monitor['width'], monitor['height']
+
+
+def oriented_size(native_width: int, native_height: int, orientation: int) -> Tuple[int, int]:
+    """原生分辨率在指定方向下的宽高"""
+    if orientation in PORTRAIT_ORIENTATIONS:
+        return native_height, native_width
+    return native_width, native_height
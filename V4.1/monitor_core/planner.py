@@ -0,0 +1,182 @@
+# 最小差异拓扑规划
+# 比较当前枚举状态与目标状态，只生成真正需要执行的步骤:
+# - 已满足的步骤直接跳过（重复点击同一扩展设置不再付出完整代价）
+# - 仅主显示器不同时只执行 /setprimary
+# - 仅方向不同时只执行 ChangeDisplaySettingsEx + 一次全局应用
+# - 目标显示模式（模式策略选出）与方向写入同一个 DEVMODE、随同一次全局应用生效，不另做一轮模式切换
+# - 原子后端（CCD）把所有需要的更改合并为一次 apply_topology
+# plan_topology 处理任意目标（启用集合 + 主显示器 + 方向 + 模式），单屏与双屏扩展直接以目标调用它
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .backend import DisplayBackend
+from .orientation import native_size, oriented_size
+
+
+class PlanStep(NamedTuple):
+    """单个后端调用: action 为 DisplayBackend 方法名"""
+    action: str
+    args: tuple
+
+
+class TopologyPlan(NamedTuple):
+    """规划结果
+
+    steps: 需要执行的步骤
+    skipped: 因已满足而跳过的步骤名
+    unresolved: 当前未启用、无法规划方向的显示器编号（启用后需重新规划）
+    """
+    steps: List[PlanStep]
+    skipped: List[str]
+    unresolved: List[int]
+
+    @property
+    def is_noop(self) -> bool:
+        return not self.steps and not self.unresolved
+
+
+def _index(monitors: List[Dict]) -> Dict[int, Dict]:
+    return {m['id']: m for m in monitors}
+
+
+def _primary_id(monitors: List[Dict]) -> Optional[int]:
+    """唯一位于 (0, 0) 的显示器；复制模式下返回 None"""
+    primaries = [m['id'] for m in monitors if m['is_primary']]
+    return primaries[0] if len(primaries) == 1 else None
+
+
+def _is_extended(monitors: List[Dict]) -> bool:
+    """是否为扩展模式（没有重叠位置的显示器）"""
+    positions = {(m['position_x'], m['position_y']) for m in monitors}
+    return len(positions) == len(monitors)
+
+
+def topology_mode(monitors: List[Dict]) -> str:
+    """当前显示模式: 'none' / 'single' / 'extend' / 'clone' / 'mixed'"""
+    if not monitors:
+        return 'none'
+    if len(monitors) == 1:
+        return 'single'
+    if _is_extended(monitors):
+        return 'extend'
+    positions = {(m['position_x'], m['position_y']) for m in monitors}
+    return 'clone' if len(positions) == 1 else 'mixed'
+
+
+def primary_monitor_id(monitors: List[Dict]) -> Optional[int]:
+    """主显示器编号（复制模式下取第一台标记为主的显示器）"""
+    for monitor in monitors:
+        if monitor['is_primary']:
+            return monitor['id']
+    return None
+
+
+def plan_topology(current: List[Dict], active_ids: List[int], primary_num: int,
+                  orientations: Optional[Dict[int, int]] = None,
+                  atomic: bool = False,
+                  modes: Optional[Dict[int, Tuple[int, int, int, int]]] = None) -> TopologyPlan:
+    """规划目标拓扑（事务与各切换操作共用）
+
+    active_ids: 启用的显示器（两台及以上时为扩展模式），其余禁用
+    primary_num: 主显示器，必须在 active_ids 中
+    orientations: 需要设定的方向 {显示器编号: 方向}，未列出的保持不变
+    modes: 需要设定的显示模式 {显示器编号: (横向宽, 高, 刷新率, 色深)}，未列出的保持当前模式
+    """
+    orientations = orientations or {}
+    modes = modes or {}
+    steps = []
+    skipped = []
+    unresolved = []
+    by_id = _index(current)
+    active = set(by_id)
+    target = set(active_ids)
+
+    # 步骤1：启用/禁用与主显示器
+    same_set = active == target
+    if same_set and _primary_id(current) == primary_num:
+        skipped.append('set_topology')
+    elif same_set:
+        # 仅主显示器不同：只执行 /setprimary
+        steps.append(PlanStep('set_topology', ([], [], primary_num)))
+    else:
+        disable = [mid for mid in sorted(active) if mid not in target]
+        steps.append(PlanStep('set_topology', (list(active_ids), disable, primary_num)))
+
+    # 步骤2：方向与显示模式（使用 NORESET 延迟应用）
+    for num, orientation in orientations.items():
+        monitor = by_id.get(num)
+        if monitor is None:
+            unresolved.append(num)
+        elif monitor['orientation'] == orientation:
+            skipped.append(f'set_orientation:{num}')
+        elif num in modes:
+            # 旋转与模式写入同一个 DEVMODE
+            width, height, frequency, _ = modes[num]
+            width, height = oriented_size(width, height, orientation)
+            steps.append(PlanStep('set_orientation',
+                                  (monitor['device_name'], orientation, width, height, frequency)))
+        else:
+            native = native_size(monitor)
+            width, height = oriented_size(*native, orientation)
+            # 分辨率不变时保持当前刷新率；当前不是原生分辨率时改用原生刷新率（未知时由驱动选择）
+            current_size = oriented_size(monitor['width'], monitor['height'], monitor['orientation'])
+            frequency = monitor['frequency'] if current_size == native else monitor.get('native_frequency', 0)
+            steps.append(PlanStep('set_orientation',
+                                  (monitor['device_name'], orientation, width, height, frequency)))
+
+    rotated = {step.args[0] for step in steps if step.action == 'set_orientation'}
+    for num, (width, height, frequency, bits_per_pixel) in modes.items():
+        monitor = by_id.get(num)
+        if monitor is None:
+            if num not in unresolved:
+                unresolved.append(num)
+            continue
+        if monitor['device_name'] in rotated:
+            continue
+        width, height = oriented_size(width, height, monitor['orientation'])
+        if (monitor['width'], monitor['height'], monitor['frequency']) == (width, height, frequency):
+            skipped.append(f'set_display_mode:{num}')
+        else:
+            steps.append(PlanStep('set_display_mode',
+                                  (monitor['device_name'], width, height, frequency, bits_per_pixel)))
+
+    # 步骤3：一次性应用所有方向与模式更改
+    if any(step.action in ('set_orientation', 'set_display_mode') for step in steps):
+        steps.append(PlanStep('apply_pending', ()))
+    elif orientations or modes:
+        skipped.append('apply_pending')
+
+    # 步骤4：多台显示器时启用扩展模式（已是这些显示器的扩展模式时跳过）
+    if len(target) >= 2:
+        if same_set and _is_extended(current):
+            skipped.append('display_switch')
+        else:
+            steps.append(PlanStep('display_switch', ('/extend',)))
+
+    if atomic and (steps or unresolved):
+        # 原子后端能直接启用未枚举到的显示器，一次调用完成全部更改
+        step = PlanStep('apply_topology', (list(active_ids), primary_num, dict(orientations), dict(modes)))
+        return TopologyPlan([step], skipped, [])
+
+    return TopologyPlan(steps, skipped, unresolved)
+
+
+def execute_plan(backend: DisplayBackend, plan: TopologyPlan) -> bool:
+    """按顺序执行规划步骤，返回所有方向与模式设置是否成功"""
+    success = True
+    for step in plan.steps:
+        result = getattr(backend, step.action)(*step.args)
+        if step.action in ('set_orientation', 'set_display_mode') and not result:
+            success = False
+    return success
+
+
+def describe_plan(plan: TopologyPlan) -> str:
+    """用于日志的规划摘要"""
+    actions = [step.action for step in plan.steps] or ['no-op']
+    text = f"steps: {', '.join(actions)}"
+    if plan.skipped:
+        text += f"; skipped: {', '.join(plan.skipped)}"
+    if plan.unresolved:
+        text += f"; unresolved: {plan.unresolved}"
+    return text
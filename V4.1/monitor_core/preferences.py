@@ -0,0 +1,73 @@
+# 用户偏好持久化
+# 每台显示器上次在双屏扩展中选择的方向 {持久键: 方向}，界面据此预选方向下拉框
+# 旧版本以枚举编号为键（{"1": 0}），首次枚举后按当时的编号换成持久键
+# 每台显示器的模式策略 {持久键: {"kind": ..., "width": ..., ...}}（见 modes.py），保存在每用户数据目录
+
+import json
+import logging
+import os
+from typing import Dict, List
+
+from .modes import MODE_POLICIES, ModePolicy
+
+MODE_POLICIES_FILE_NAME = 'mode_policies.json'
+
+
+def load_orientation_preferences(path: str) -> Dict[str, int]:
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return {str(k): int(v) for k, v in json.load(f).items()}
+        except Exception as e:
+            logging.error(f"Failed to load orientation config: {e}")
+    return {}
+
+
+def save_orientation_preferences(path: str, preferences: Dict[str, int]) -> bool:
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(preferences, f, indent=4, ensure_ascii=False)
+        logging.info("Orientation config saved")
+        return True
+    except Exception as e:
+        logging.error(f"Failed to save orientation config: {e}")
+        return False
+
+
+def migrate_orientation_preferences(preferences: Dict[str, int], monitors: List[Dict]) -> bool:
+    """把以编号为键的旧条目就地换成对应显示器的持久键，返回是否有改动"""
+    keys = {str(m['id']): m['key'] for m in monitors if m.get('key')}
+    changed = False
+    for name in [name for name in preferences if name.isdigit()]:
+        if name in keys:
+            orientation = preferences.pop(name)
+            preferences.setdefault(keys[name], orientation)
+            changed = True
+    if changed:
+        logging.info("Orientation config migrated to monitor identity keys")
+    return changed
+
+
+def load_mode_policies(path: str) -> Dict[str, ModePolicy]:
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                policies = {str(k): ModePolicy(**v) for k, v in json.load(f).items()}
+            return {k: v for k, v in policies.items() if v.kind in MODE_POLICIES}
+        except Exception as e:
+            logging.error(f"Failed to load mode policies: {e}")
+    return {}
+
+
+def save_mode_policies(path: str, policies: Dict[str, ModePolicy]) -> bool:
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({k: v._asdict() for k, v in policies.items()}, f, indent=4, ensure_ascii=False)
+        logging.info("Mode policies saved")
+        return True
+    except Exception as e:
+        logging.error(f"Failed to save mode policies: {e}")
+        return False
@@ -0,0 +1,165 @@
+# 生效检测
+# DisplaySwitch / SetDisplayConfig 返回时 Windows 往往还没有完成切换。
+# SettleDetector 以退避间隔轮询拓扑，直到符合目标且摘要稳定或超时，
+# 并按操作类型记录本机的历史生效耗时：下一次先等待历史典型值再开始细粒度轮询，
+# 使典型等待时间收敛到硬件实际需要的时间。
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .backend import DisplayBackend, topology_digest
+from .metrics import registry, STEP, STEP_SETTLE
+from .planner import plan_topology
+
+SETTLE_HISTORY_FILE_NAME = 'settle_history.json'
+HISTORY_LIMIT = 50
+
+Predicate = Callable[[List[Dict]], bool]
+
+
+class SettleResult(NamedTuple):
+    kind: str
+    settled: bool
+    elapsed: float
+    polls: int
+
+    def __str__(self):
+        if self.settled:
+            return f"显示设置生效耗时 {self.elapsed:.2f}s"
+        return f"等待显示设置生效超时 ({self.elapsed:.2f}s)"
+
+
+# --- 目标判定 ---
+def expect_topology(active_ids: List[int], primary_num: int,
+                    orientations: Optional[Dict[int, int]] = None,
+                    modes: Optional[Dict[int, tuple]] = None) -> Predicate:
+    return lambda monitors: plan_topology(monitors, active_ids, primary_num, orientations,
+                                          modes=modes).is_noop
+
+
+def expect_mode(monitor_num: int, width: int, height: int, frequency: int) -> Predicate:
+    """显示器以指定宽高（当前方向）与刷新率启用"""
+    target = (monitor_num, width, height, frequency)
+    return lambda monitors: any((m['id'], m['width'], m['height'], m['frequency']) == target
+                                for m in monitors)
+
+
+def expect_extended(monitors: List[Dict]) -> bool:
+    positions = {(m['position_x'], m['position_y']) for m in monitors}
+    return len(monitors) >= 2 and len(positions) == len(monitors)
+
+
+def expect_clone(monitors: List[Dict]) -> bool:
+    positions = {(m['position_x'], m['position_y']) for m in monitors}
+    return len(monitors) >= 2 and len(positions) == 1
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2.0
+
+
+class SettleDetector:
+    """轮询直到拓扑符合目标且连续两次摘要一致
+
+    min_interval / max_interval: 退避轮询间隔范围（秒）
+    learn_factor: 首次轮询前等待历史中位数的比例，留出余量避免等过头
+    """
+
+    def __init__(self, backend: DisplayBackend, history_file: Optional[str] = None,
+                 timeout: float = 5.0, min_interval: float = 0.02, max_interval: float = 0.4,
+                 learn_factor: float = 0.8):
+        self.backend = backend
+        self.history_file = history_file
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.learn_factor = learn_factor
+        self.lock = threading.Lock()
+        self.history = self._load_history()
+
+    def _load_history(self) -> Dict[str, List[float]]:
+        if self.history_file and os.path.exists(self.history_file):
+            try:
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    return {k: [float(v) for v in vs][-HISTORY_LIMIT:] for k, vs in json.load(f).items()}
+            except Exception as e:
+                logging.error(f"Failed to load settle history: {e}")
+        return {}
+
+    def _save_history(self):
+        if not self.history_file:
+            return
+        try:
+            directory = os.path.dirname(self.history_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.history_file, 'w', encoding='utf-8') as f:
+                json.dump(self.history, f, indent=4)
+        except Exception as e:
+            logging.error(f"Failed to save settle history: {e}")
+
+    def typical_settle(self, kind: str) -> Optional[float]:
+        """本机该类操作的历史生效耗时中位数"""
+        with self.lock:
+            samples = self.history.get(kind)
+            return _median(samples) if samples else None
+
+    def record(self, kind: str, elapsed: float):
+        with self.lock:
+            samples = self.history.setdefault(kind, [])
+            samples.append(round(elapsed, 4))
+            del samples[:-HISTORY_LIMIT]
+            self._save_history()
+
+    def wait(self, kind: str, expected: Optional[Predicate] = None) -> SettleResult:
+        """等待生效；expected 为 None 时只要求摘要稳定
+
+        学习的是从调用到首次轮询符合目标的耗时，不含预等待之后的确认轮询，
+        预等待也始终短于该值，否则每次记录都会偏大，典型值逐次上漂
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        typical = self.typical_settle(kind)
+        if typical:
+            time.sleep(max(0.0, min(typical * self.learn_factor, typical - self.min_interval, self.timeout)))
+
+        interval = self.min_interval
+        previous = None
+        first_match = None
+        polls = 0
+        while True:
+            polled_at = time.monotonic()
+            monitors = self.backend.enumerate_monitors()
+            polls += 1
+            digest = topology_digest(monitors)
+            matched = expected is None or expected(monitors)
+            if matched and digest == previous:
+                elapsed = time.monotonic() - start
+                self.record(kind, first_match - start)
+                registry.observe(STEP, STEP_SETTLE, elapsed)
+                logging.info(f"Settled {kind} in {elapsed:.3f}s after {polls} polls",
+                             extra={'duration_ms': elapsed * 1000.0})
+                return SettleResult(kind, True, elapsed, polls)
+            # 摘要仍在变化时以最近一次符合目标的轮询为准
+            first_match = polled_at if matched else None
+            previous = digest if matched else None
+
+            now = time.monotonic()
+            if now >= deadline:
+                elapsed = now - start
+                registry.observe(STEP, STEP_SETTLE, elapsed, error=True)
+                logging.warning(f"Settle timeout for {kind} after {elapsed:.3f}s ({polls} polls)",
+                                extra={'duration_ms': elapsed * 1000.0})
+                return SettleResult(kind, False, elapsed, polls)
+            # 目标已满足时只需短间隔确认一次稳定
+            time.sleep(min(self.min_interval if matched else interval, deadline - now))
+            interval = min(interval * 2, self.max_interval)
@@ -0,0 +1,83 @@
+# 显示器快照缓存（stale-while-revalidate）
+# 每次枚举得到新拓扑后把快照（显示器列表含分辨率/方向/位置、原生分辨率、拓扑摘要）写入每用户数据目录；
+# 下次启动时先用快照渲染界面与托盘菜单，后台枚举完成后只应用差异。
+# 文件带版本号与后端名称，格式不符、后端不同或内容损坏时直接忽略，按无缓存处理。
+
+import os
+import json
+import time
+import logging
+from typing import Dict, List, NamedTuple, Optional
+
+from .backend import topology_digest
+
+SNAPSHOT_VERSION = 2  # 2: 显示器带持久键 key
+SNAPSHOT_FILE_NAME = 'display_snapshot.json'
+
+
+class DisplaySnapshot(NamedTuple):
+    """上一次已知的显示器快照
+
+    native_resolutions: device_name -> {'width', 'height'}
+    """
+    backend: str
+    digest: str
+    monitors: List[Dict]
+    native_resolutions: Dict[str, Dict]
+    saved_at: float
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.saved_at)
+
+
+def load_snapshot(path: str, backend_name: str) -> Optional[DisplaySnapshot]:
+    """读取快照；不存在、版本或后端不符、摘要与内容不一致时返回 None"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != SNAPSHOT_VERSION:
+            logging.info(f"Snapshot cache version {data.get('version')} ignored")
+            return None
+        if data.get('backend') != backend_name:
+            logging.info(f"Snapshot cache from backend {data.get('backend')} ignored")
+            return None
+        monitors = data['monitors']
+        # 摘要按内容重新计算，防止手工修改或写入不完整
+        if topology_digest(monitors) != data['digest']:
+            logging.warning("Snapshot cache digest mismatch, ignored")
+            return None
+        return DisplaySnapshot(data['backend'], data['digest'], monitors,
+                               data.get('native_resolutions', {}), float(data.get('saved_at', 0.0)))
+    except Exception as e:
+        logging.warning(f"Failed to load snapshot cache: {e}")
+        return None
+
+
+def save_snapshot(path: str, backend_name: str, monitors: List[Dict],
+                  native_resolutions: Dict[str, Dict]) -> Optional[DisplaySnapshot]:
+    """写入快照（先写临时文件再替换），返回写入的快照；失败时返回 None"""
+    snapshot = DisplaySnapshot(backend_name, topology_digest(monitors), monitors,
+                               native_resolutions, time.time())
+    data = {
+        'version': SNAPSHOT_VERSION,
+        'backend': snapshot.backend,
+        'digest': snapshot.digest,
+        'saved_at': snapshot.saved_at,
+        'monitors': snapshot.monitors,
+        'native_resolutions': snapshot.native_resolutions,
+    }
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logging.error(f"Failed to save snapshot cache: {e}")
+        return None
+    return snapshot
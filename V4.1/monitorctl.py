@@ -0,0 +1,350 @@
+# monitorctl - 无界面的显示器切换命令行
+# 供登录脚本、会议室自动化等场景直接调用，不导入 Qt / pystray / PIL，不创建托盘和窗口。
+#
+# 用法:
+#   python monitorctl.py list [--json]
+#   python monitorctl.py status
+#   python monitorctl.py single 2
+#   python monitorctl.py extend 1 2 --rotate-b 90
+#   python monitorctl.py extend-all | clone
+#   python monitorctl.py save [PATH] | load [PATH]
+#   python monitorctl.py edid [--json] [--sysfs | FILE ...]   （解码当前显示器、文件或 /sys/class/drm 的 EDID）
+#   python monitorctl.py apply --only 1 2 --primary 2 --rotate 1=90   （批量更改，一次应用）
+#   python monitorctl.py modes 2 [--json]   （列出支持的分辨率与刷新率）
+#   python monitorctl.py mode 2 2560x1440@144   （省略 @刷新率 时取该分辨率的最高刷新率）
+#   python monitorctl.py policy 2 [best | keep | 2560x1440@144]   （查看/设置扩展时的模式策略）
+#
+# 显示器可以用当前编号，也可以用 list 输出中的持久键（如 DEL4123），后者不受插拔和接口顺序影响。
+# 退出码: 0 成功，1 操作失败，2 参数错误（含未知的显示器编号或键），3 等待显示设置生效超时
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from monitor_core import (ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT,
+                          ORIENTATION_LANDSCAPE_FLIPPED, ORIENTATION_PORTRAIT_FLIPPED,
+                          BACKEND_ENV_VAR, create_display_backend)
+from monitor_core.controller import DisplayController
+from monitor_core.edid import EdidError, EdidInfo, parse_edid, read_sysfs_edids
+from monitor_core.identity import IDENTITY_FILE_NAME, IdentityResolver, MonitorRef, parse_monitor_ref
+from monitor_core.log_pipeline import user_data_dir
+from monitor_core.modes import (MODE_POLICY_BEST, MODE_POLICY_KEEP, MODE_POLICY_PREFERRED,
+                                DEFAULT_MODE_POLICY, ModePolicy)
+from monitor_core.native_modes import NATIVE_MODES_FILE_NAME, NativeModeCache
+from monitor_core.preferences import MODE_POLICIES_FILE_NAME, load_mode_policies, save_mode_policies
+from monitor_core.settle import SETTLE_HISTORY_FILE_NAME, SettleDetector
+
+# 与 main.py 相同的文件位置，命令行与界面共用配置和生效历史
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOL_PATH = os.path.join(APP_DIR, 'MultiMonitorTool.exe')
+CONFIG_FILE = os.path.join(APP_DIR, 'monitor_config.cfg')
+SETTLE_HISTORY_FILE = os.path.join(user_data_dir(), SETTLE_HISTORY_FILE_NAME)
+IDENTITY_FILE = os.path.join(user_data_dir(), IDENTITY_FILE_NAME)
+NATIVE_MODES_FILE = os.path.join(user_data_dir(), NATIVE_MODES_FILE_NAME)
+MODE_POLICIES_FILE = os.path.join(user_data_dir(), MODE_POLICIES_FILE_NAME)
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2  # 与 argparse 的参数错误一致
+EXIT_SETTLE_TIMEOUT = 3
+
+# 顺时针旋转角度 -> 方向
+ROTATIONS = {
+    0: ORIENTATION_LANDSCAPE,
+    90: ORIENTATION_PORTRAIT,
+    180: ORIENTATION_LANDSCAPE_FLIPPED,
+    270: ORIENTATION_PORTRAIT_FLIPPED,
+}
+
+
+def parse_monitor(value: str) -> MonitorRef:
+    try:
+        return parse_monitor_ref(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_rotation(value: str) -> Tuple[MonitorRef, int]:
+    """N=DEG -> (显示器编号或持久键, 方向)"""
+    try:
+        monitor, degrees = value.rsplit('=', 1)
+        monitor, degrees = parse_monitor_ref(monitor), int(degrees)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"格式应为 N=角度: {value}")
+    if degrees not in ROTATIONS:
+        raise argparse.ArgumentTypeError(f"角度必须是 {sorted(ROTATIONS)} 之一: {value}")
+    return monitor, ROTATIONS[degrees]
+
+
+def parse_mode(value: str) -> Tuple[int, int, Optional[int]]:
+    """WxH[@HZ] -> (横向宽, 高, 刷新率或 None)"""
+    try:
+        resolution, _, frequency = value.lower().partition('@')
+        width, height = (int(part) for part in resolution.split('x'))
+        return width, height, int(frequency.rstrip('hz')) if frequency else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"格式应为 宽x高[@刷新率]: {value}")
+
+
+def parse_policy(value: str) -> ModePolicy:
+    """best / keep / WxH[@HZ]"""
+    if value.lower() in (MODE_POLICY_BEST, MODE_POLICY_KEEP):
+        return ModePolicy(value.lower())
+    width, height, frequency = parse_mode(value)
+    return ModePolicy(MODE_POLICY_PREFERRED, width, height, frequency or 0)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='monitorctl', description="显示器切换命令行（无界面）")
+    parser.add_argument('--backend', choices=['win32', 'ccd', 'simulated'],
+                        default=os.environ.get(BACKEND_ENV_VAR, 'win32'), help="显示后端")
+    parser.add_argument('--no-wait', action='store_true', help="切换后不等待显示设置生效")
+    parser.add_argument('--verbose', action='store_true', help="输出详细日志到 stderr")
+    parser.add_argument('--timing', action='store_true', help="在 stderr 输出命令耗时")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help="列出显示器")
+    list_parser.add_argument('--json', action='store_true', help="以 JSON 输出")
+    commands.add_parser('status', help="以 JSON 输出当前模式与显示器状态")
+
+    single = commands.add_parser('single', help="只保留一台显示器")
+    single.add_argument('monitor', type=parse_monitor, help="显示器编号或持久键")
+
+    extend = commands.add_parser('extend', help="扩展两台显示器（第一台为主显示器）")
+    extend.add_argument('primary', type=parse_monitor, help="主显示器编号或持久键")
+    extend.add_argument('secondary', type=parse_monitor, help="副显示器编号或持久键")
+    extend.add_argument('--rotate-a', type=int, choices=sorted(ROTATIONS), default=0,
+                        help="主显示器顺时针旋转角度")
+    extend.add_argument('--rotate-b', type=int, choices=sorted(ROTATIONS), default=0,
+                        help="副显示器顺时针旋转角度")
+
+    commands.add_parser('extend-all', help="扩展所有显示器 (DisplaySwitch /extend)")
+    commands.add_parser('clone', help="复制所有显示器 (DisplaySwitch /clone)")
+
+    apply = commands.add_parser('apply', help="批量更改启用/主显示器/方向，一次规划、一次应用")
+    apply.add_argument('--only', type=parse_monitor, nargs='+', metavar='N', help="只启用这些显示器")
+    apply.add_argument('--enable', type=parse_monitor, nargs='+', default=[], metavar='N', help="启用显示器")
+    apply.add_argument('--disable', type=parse_monitor, nargs='+', default=[], metavar='N', help="禁用显示器")
+    apply.add_argument('--primary', type=parse_monitor, metavar='N', help="主显示器")
+    apply.add_argument('--rotate', type=parse_rotation, action='append', default=[], metavar='N=DEG',
+                       help="显示器顺时针旋转角度，例如 2=90，可重复")
+
+    edid = commands.add_parser('edid', help="解码 EDID（默认为当前各显示器）")
+    edid.add_argument('files', nargs='*', metavar='FILE', help="原始 EDID 文件")
+    edid.add_argument('--sysfs', action='store_true', help="读取 /sys/class/drm/*/edid（Linux）")
+    edid.add_argument('--json', action='store_true', help="以 JSON 输出")
+
+    modes = commands.add_parser('modes', help="列出显示器支持的分辨率与刷新率")
+    modes.add_argument('monitor', type=parse_monitor, help="显示器编号或持久键")
+    modes.add_argument('--json', action='store_true', help="以 JSON 输出")
+
+    mode = commands.add_parser('mode', help="设置分辨率与刷新率（方向不变）")
+    mode.add_argument('monitor', type=parse_monitor, help="显示器编号或持久键")
+    mode.add_argument('mode', type=parse_mode, metavar='WxH[@HZ]', help="横向分辨率与刷新率，例如 2560x1440@144")
+
+    policy = commands.add_parser('policy', help="查看或设置扩展时的模式策略")
+    policy.add_argument('monitor', type=parse_monitor, help="显示器编号或持久键")
+    policy.add_argument('policy', type=parse_policy, nargs='?', metavar='best|keep|WxH[@HZ]',
+                        help="原生分辨率最高刷新率（默认）、保持当前模式或指定模式；省略时显示当前策略")
+
+    save = commands.add_parser('save', help="保存当前配置")
+    save.add_argument('path', nargs='?', default=CONFIG_FILE, help="配置文件（默认与界面相同）")
+    load = commands.add_parser('load', help="加载保存的配置")
+    load.add_argument('path', nargs='?', default=CONFIG_FILE, help="配置文件（默认与界面相同）")
+    return parser.parse_args(argv)
+
+
+def format_monitors(monitors: List[Dict]) -> str:
+    lines = [f"检测到 {len(monitors)} 台显示器"]
+    for monitor in monitors:
+        is_primary_str = " (主)" if monitor['is_primary'] else ""
+        lines.append(f"{monitor['description']} [{monitor['key']}]{is_primary_str}")
+    return '\n'.join(lines)
+
+
+def edid_to_dict(info: EdidInfo) -> Dict:
+    data = info._asdict()
+    data['timings'] = [timing._asdict() for timing in info.timings]
+    data['hardware_id'] = info.hardware_id
+    data['serial'] = info.serial
+    data['native'] = info.native._asdict() if info.native is not None else None
+    return data
+
+
+def format_edid(label: str, info: Optional[EdidInfo]) -> str:
+    if info is None:
+        return f"{label}: 无 EDID"
+    lines = [f"{label}: {info.display_name}",
+             f"  型号 {info.hardware_id}  序列号 {info.serial or '-'}  生产 {info.year} 第{info.week}周  "
+             f"EDID {info.version}  尺寸 {info.width_cm}x{info.height_cm} cm"]
+    native, preferred = info.native, info.preferred
+    if native is not None:
+        lines.append(f"  原生 {native.width}x{native.height} @ {native.refresh:g}Hz")
+    if preferred is not None and preferred != native:
+        lines.append(f"  首选 {preferred.width}x{preferred.height} @ {preferred.refresh:g}Hz")
+    return '\n'.join(lines)
+
+
+def read_edids(controller: DisplayController, args: argparse.Namespace) -> List[Tuple[str, Optional[EdidInfo]]]:
+    """-> [(来源, 解析结果)]；文件与 sysfs 直接解析，不使用缓存"""
+    if args.files or args.sysfs:
+        blobs = []
+        for path in args.files:
+            with open(path, 'rb') as f:
+                blobs.append((path, f.read()))
+        if args.sysfs:
+            blobs += sorted(read_sysfs_edids().items())
+        results = []
+        for label, blob in blobs:
+            try:
+                results.append((label, parse_edid(blob)))
+            except EdidError as e:
+                raise ValueError(f"{label}: {e}")
+        return results
+    monitors = controller.enumerate()
+    return [(f"显示器{m['id']} [{m['key']}]", controller.edids.get(m['device_path'])) for m in monitors]
+
+
+def list_modes(controller: DisplayController, args: argparse.Namespace) -> str:
+    monitor_num = controller.resolve(args.monitor)
+    monitor = next((m for m in controller.enumerate() if m['id'] == monitor_num), None)
+    if monitor is None:
+        raise ValueError(f"显示器{monitor_num}未启用")
+    table = controller.mode_table(monitor)
+    if args.json:
+        return json.dumps([{'width': width, 'height': height, 'refresh_rates': list(table.refresh_rates(width, height))}
+                           for width, height in table.resolutions()], indent=4)
+    lines = [f"{monitor['description']} [{monitor['key']}]: {len(table)} 个模式"]
+    for width, height in table.resolutions():
+        rates = ', '.join(str(frequency) for frequency in table.refresh_rates(width, height))
+        lines.append(f"  {width}x{height} @ {rates}Hz")
+    return '\n'.join(lines)
+
+
+def set_policy(controller: DisplayController, args: argparse.Namespace) -> str:
+    controller.enumerate()  # 重建持久键索引，编号也能换成键
+    key = controller.identity.key_of(controller.resolve(args.monitor))
+    if key is None:
+        raise ValueError(f"显示器{args.monitor}没有持久键")
+    if args.policy is None:
+        return f"{key}: {controller.mode_policies.get(key, DEFAULT_MODE_POLICY)}"
+    controller.mode_policies[key] = args.policy
+    if not save_mode_policies(MODE_POLICIES_FILE, controller.mode_policies):
+        raise OSError(f"无法写入 {MODE_POLICIES_FILE}")
+    return f"{key}: {args.policy}"
+
+
+def monitor_refs(args: argparse.Namespace) -> List[MonitorRef]:
+    """命令行中出现的全部显示器参数"""
+    refs = [getattr(args, name, None) for name in ('monitor', 'primary', 'secondary')]
+    refs += getattr(args, 'only', None) or []
+    refs += getattr(args, 'enable', [])
+    refs += getattr(args, 'disable', [])
+    refs += [monitor for monitor, _ in getattr(args, 'rotate', [])]
+    return [ref for ref in refs if ref is not None]
+
+
+def check_monitors(controller: DisplayController, args: argparse.Namespace):
+    """执行前按当前枚举结果校验显示器参数，未知的编号或键抛出 ValueError（不做任何更改）
+
+    暂未启用的显示器按上次的编号仍可指定（见 identity.py）
+    """
+    refs = monitor_refs(args)
+    if not refs:
+        return
+    controller.enumerate()
+    for ref in refs:
+        controller.resolve(ref)
+
+
+def run_command(controller: DisplayController, args: argparse.Namespace) -> Tuple[str, int]:
+    """执行命令，返回 (要输出的文本, 退出码)"""
+    command = args.command
+    if command == 'list':
+        monitors = controller.enumerate()
+        return (json.dumps(monitors, indent=4, ensure_ascii=False) if args.json
+                else format_monitors(monitors)), EXIT_OK
+    if command == 'status':
+        return json.dumps(controller.status(), indent=4, ensure_ascii=False), EXIT_OK
+    if command == 'edid':
+        results = read_edids(controller, args)
+        if args.json:
+            return json.dumps({label: edid_to_dict(info) if info is not None else None
+                               for label, info in results}, indent=4, ensure_ascii=False), EXIT_OK
+        return '\n'.join(format_edid(label, info) for label, info in results) or "没有找到 EDID", EXIT_OK
+    if command == 'modes':
+        return list_modes(controller, args), EXIT_OK
+    if command == 'policy':
+        return set_policy(controller, args), EXIT_OK
+    if command == 'save':
+        controller.save_config(args.path)
+        return f"配置已保存到 {args.path}", EXIT_OK
+
+    if command == 'single':
+        result = controller.single_display(args.monitor)
+    elif command == 'extend':
+        result = controller.extend_pair(args.primary, args.secondary,
+                                        ROTATIONS[args.rotate_a], ROTATIONS[args.rotate_b])
+    elif command == 'mode':
+        result = controller.set_mode(args.monitor, *args.mode)
+    elif command == 'extend-all':
+        result = controller.display_switch('/extend')
+    elif command == 'clone':
+        result = controller.display_switch('/clone')
+    elif command == 'apply':
+        with controller.transaction('apply') as tx:
+            if args.only:
+                tx.only(*args.only)
+            tx.enable(*args.enable)
+            tx.disable(*args.disable)
+            if args.primary is not None:
+                tx.set_primary(args.primary)
+            for monitor, orientation in args.rotate:
+                tx.rotate(monitor, orientation)
+        result = tx.result
+    else:  # load
+        result = controller.load_config(args.path)
+
+    if result is not None:
+        return str(result), EXIT_OK if result.settled else EXIT_SETTLE_TIMEOUT
+    return "已提交，未等待生效" if args.no_wait else "当前状态已满足，无需更改", EXIT_OK
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    start = time.perf_counter()
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+
+    if args.backend != 'simulated' and not os.path.exists(TOOL_PATH):
+        print(f"错误: 缺少 {TOOL_PATH}", file=sys.stderr)
+        return EXIT_ERROR
+
+    backend = create_display_backend(args.backend, tool_path=TOOL_PATH)
+    controller = DisplayController(backend, SettleDetector(backend, SETTLE_HISTORY_FILE),
+                                   wait_settle=not args.no_wait, identity=IdentityResolver(IDENTITY_FILE),
+                                   native_modes=NativeModeCache(NATIVE_MODES_FILE),
+                                   mode_policies=load_mode_policies(MODE_POLICIES_FILE))
+    try:
+        try:
+            check_monitors(controller, args)
+        except ValueError as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return EXIT_USAGE
+        output, code = run_command(controller, args)
+    except Exception as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        if args.timing:
+            print(f"耗时 {(time.perf_counter() - start) * 1000.0:.1f} ms", file=sys.stderr)
+    print(output)
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# 启动耗时分析（--profile-startup）
+# 只依赖标准库，在 main.py 最开始导入，记录各组模块的导入耗时与启动里程碑:
+# - imports: 每组导入耗时及新加载的模块数
+# - marks: QApplication 创建、主窗口构建、托盘可见、窗口首次显示、首次枚举完成（可交互）等时间点
+#   （相对 main.py 开始执行）
+# 报告写入 JSON，并与启动预算比较
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+# 启动预算：托盘（静默启动）或窗口出现的最长时间
+STARTUP_BUDGET_MS = 1500.0
+# 计入预算的里程碑；首次枚举在后台进行，不计入
+BUDGET_MARKS = ('tray', 'window')
+
+
+class StartupProfiler:
+    """记录导入与启动里程碑；expected 中的里程碑全部到达后调用 on_complete"""
+
+    def __init__(self, t0: Optional[float] = None, enabled: bool = True):
+        self.t0 = t0 if t0 is not None else time.perf_counter()
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.imports: List[Dict] = []
+        self.marks: Dict[str, float] = {}
+        self.info: Dict[str, object] = {}
+        self.expected: Iterable[str] = ()
+        self.on_complete: Optional[Callable[['StartupProfiler'], None]] = None
+        self._last = self.t0
+        self._last_modules = len(sys.modules)
+
+    def _ms(self, t: float) -> float:
+        return round((t - self.t0) * 1000.0, 2)
+
+    def imported(self, group: str):
+        """记录自上一次 imported() 以来的导入耗时（模块顶层按组调用）"""
+        now = time.perf_counter()
+        modules = len(sys.modules)
+        with self.lock:
+            self.imports.append({
+                'group': group,
+                'ms': round((now - self._last) * 1000.0, 2),
+                'modules': modules - self._last_modules,
+            })
+            self._last = now
+            self._last_modules = modules
+
+    @contextmanager
+    def importing(self, group: str):
+        """记录延迟导入（函数内部首次使用时）"""
+        start = time.perf_counter()
+        modules = len(sys.modules)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.imports.append({
+                    'group': group,
+                    'ms': round((time.perf_counter() - start) * 1000.0, 2),
+                    'modules': len(sys.modules) - modules,
+                    'lazy': True,
+                })
+
+    def mark(self, name: str, at: Optional[float] = None):
+        """记录里程碑（线程安全，只记录第一次）；at 为 perf_counter 时间，默认当前"""
+        now = at if at is not None else time.perf_counter()
+        with self.lock:
+            if name in self.marks:
+                return
+            self.marks[name] = self._ms(now)
+            complete = (self.enabled and self.on_complete is not None and self.expected
+                        and all(m in self.marks for m in self.expected))
+        if complete:
+            callback, self.on_complete = self.on_complete, None
+            callback(self)
+
+    def report(self, budget_ms: float = STARTUP_BUDGET_MS) -> Dict:
+        with self.lock:
+            marks = dict(self.marks)
+            imports = list(self.imports)
+        eager = [entry for entry in imports if not entry.get('lazy')]
+        ready = [marks[m] for m in self.expected if m in marks and m in BUDGET_MARKS]
+        time_to_ready = max(ready) if ready else None
+        return {
+            'budget_ms': budget_ms,
+            'time_to_tray_ms': marks.get('tray'),
+            'time_to_window_ms': marks.get('window'),
+            'time_to_interactive_ms': marks.get('interactive'),
+            'over_budget': time_to_ready is None or time_to_ready > budget_ms,
+            'import_ms': round(sum(entry['ms'] for entry in eager), 2),
+            'imports': imports,
+            'marks': marks,
+            'info': dict(self.info),
+        }
+
+    def write(self, path: str, budget_ms: float = STARTUP_BUDGET_MS) -> Dict:
+        report = self.report(budget_ms)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        return report
+
+
+def format_report(report: Dict) -> str:
+    lines = ["启动耗时分析 (相对 main.py 开始执行, ms)", "-" * 50]
+    for entry in report['imports']:
+        lazy = " (延迟)" if entry.get('lazy') else ""
+        lines.append(f"  import {entry['group']:<24}{entry['ms']:>9.1f}  {entry['modules']:>4} 模块{lazy}")
+    lines.append(f"  {'导入合计':<29}{report['import_ms']:>9.1f}")
+    for name, value in report['marks'].items():
+        lines.append(f"  {name:<31}{value:>9.1f}")
+    status = "超出预算" if report['over_budget'] else "在预算内"
+    lines.append(f"预算 {report['budget_ms']:.0f} ms: {status}")
+    return '\n'.join(lines)
@@ -0,0 +1,91 @@
+# 合成的 QueryDisplayConfig 输出: 路径/模式数组与源、目标名称表
+# 布局与 QDC_ALL_PATHS 的结果一致: 活动路径带源模式与目标模式，非活动路径的模式下标无效
+
+from typing import List, NamedTuple, Optional
+
+from monitor_core.ccd import (DISPLAYCONFIG_MODE_INFO, DISPLAYCONFIG_MODE_INFO_TYPE_SOURCE,
+                              DISPLAYCONFIG_MODE_INFO_TYPE_TARGET, DISPLAYCONFIG_PATH_ACTIVE,
+                              DISPLAYCONFIG_PATH_INFO, DISPLAYCONFIG_PATH_MODE_IDX_INVALID,
+                              DISPLAYCONFIG_PIXELFORMAT_32BPP, source_key, target_key)
+
+ADAPTER = 0x1234
+
+
+class PathSpec(NamedTuple):
+    source: int  # 源 id，设备名为 \\.\DISPLAY{source + 1}
+    target: int
+    active: bool = False
+    width: int = 1920
+    height: int = 1080
+    x: int = 0
+    y: int = 0
+    rotation: int = 1
+    refresh: int = 60
+    available: bool = True
+    name: str = ''
+
+
+class Topology:
+    def __init__(self, specs: List[PathSpec]):
+        paths, modes = [], []
+        self.source_names, self.target_names = {}, {}
+        for spec in specs:
+            path = DISPLAYCONFIG_PATH_INFO()
+            path.sourceInfo.adapterId.LowPart = ADAPTER
+            path.sourceInfo.id = spec.source
+            path.targetInfo.adapterId.LowPart = ADAPTER
+            path.targetInfo.id = spec.target
+            path.targetInfo.targetAvailable = int(spec.available)
+            path.sourceInfo.modeInfoIdx = DISPLAYCONFIG_PATH_MODE_IDX_INVALID
+            path.targetInfo.modeInfoIdx = DISPLAYCONFIG_PATH_MODE_IDX_INVALID
+            if spec.active:
+                path.flags = DISPLAYCONFIG_PATH_ACTIVE
+                path.targetInfo.rotation = spec.rotation
+                path.targetInfo.refreshRate.Numerator = spec.refresh * 1000
+                path.targetInfo.refreshRate.Denominator = 1000
+                path.sourceInfo.modeInfoIdx = len(modes)
+                modes.append(source_mode(spec))
+                path.targetInfo.modeInfoIdx = len(modes)
+                modes.append(target_mode(spec))
+            paths.append(path)
+            self.source_names[source_key(path)] = device_name(spec.source)
+            self.target_names[target_key(path)] = (spec.name or f"Monitor {spec.target}",
+                                                   f"\\\\?\\DISPLAY#TGT{spec.target}")
+        self.paths = (DISPLAYCONFIG_PATH_INFO * len(paths))(*paths)
+        self.modes = (DISPLAYCONFIG_MODE_INFO * len(modes))(*modes)
+
+    def buffers(self):
+        """录制的原始缓冲区（与 decode_display_config 的输入一致）"""
+        return bytes(self.paths), bytes(self.modes)
+
+
+def device_name(source: int) -> str:
+    return f"\\\\.\\DISPLAY{source + 1}"
+
+
+def source_mode(spec: PathSpec) -> DISPLAYCONFIG_MODE_INFO:
+    mode = DISPLAYCONFIG_MODE_INFO()
+    mode.infoType = DISPLAYCONFIG_MODE_INFO_TYPE_SOURCE
+    mode.id = spec.source
+    mode.adapterId.LowPart = ADAPTER
+    mode.sourceMode.width = spec.width
+    mode.sourceMode.height = spec.height
+    mode.sourceMode.pixelFormat = DISPLAYCONFIG_PIXELFORMAT_32BPP
+    mode.sourceMode.position.x = spec.x
+    mode.sourceMode.position.y = spec.y
+    return mode
+
+
+def target_mode(spec: PathSpec) -> DISPLAYCONFIG_MODE_INFO:
+    mode = DISPLAYCONFIG_MODE_INFO()
+    mode.infoType = DISPLAYCONFIG_MODE_INFO_TYPE_TARGET
+    mode.id = spec.target
+    mode.adapterId.LowPart = ADAPTER
+    signal = mode.targetMode.targetVideoSignalInfo
+    signal.activeSize.cx, signal.activeSize.cy = spec.width, spec.height
+    signal.vSyncFreq.Numerator, signal.vSyncFreq.Denominator = spec.refresh, 1
+    return mode
+
+
+def find_mode(modes, index: int) -> Optional[DISPLAYCONFIG_MODE_INFO]:
+    return None if index == DISPLAYCONFIG_PATH_MODE_IDX_INVALID else modes[index]
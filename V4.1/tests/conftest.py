@@ -0,0 +1,5 @@
+# 测试从 V4.1 目录导入 monitor_core 与入口模块
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
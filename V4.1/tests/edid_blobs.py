@@ -0,0 +1,65 @@
+# EDID 测试数据: 基本块由 build_edid 构造，扩展块按规范逐字节拼出
+
+from monitor_core.edid import BLOCK_SIZE, build_edid
+
+# 1920x1080@60（CTA-861 的 148.5 MHz 标准时序）
+DTD_1080P60 = bytes.fromhex('023a801871382d40582c4500c48e2100001e')
+
+
+def with_checksum(block: bytearray) -> bytes:
+    block[-1] = (256 - sum(block[:-1]) % 256) % 256
+    return bytes(block)
+
+
+def base_block(extensions: int = 0, preferred: bool = True, **kwargs) -> bytes:
+    """基本块；preferred 为 False 时第一个描述符换成空描述符（没有详细时序）"""
+    params = dict(manufacturer='DEL', product_code=0x4123, serial_number=0x3432_4C42,
+                  name='DELL U2720Q', width=1920, height=1080, refresh=60, serial_text='7XK1F23')
+    params.update(kwargs)
+    block = bytearray(build_edid(**params))
+    if not preferred:
+        block[54:72] = bytes([0, 0, 0, 0x10]) + bytes(14)
+    block[126] = extensions
+    return with_checksum(block)
+
+
+def cta_block(svds, dtds=(DTD_1080P60,)) -> bytes:
+    """CTA-861 扩展块: 一个视频数据块（SVD 列表）+ 详细时序"""
+    video = bytes([2 << 5 | len(svds)]) + bytes(svds)
+    block = bytearray(BLOCK_SIZE)
+    block[0:4] = bytes([0x02, 3, 4 + len(video), 0xF0])
+    block[4:4 + len(video)] = video
+    offset = 4 + len(video)
+    for dtd in dtds:
+        block[offset:offset + 18] = dtd
+        offset += 18
+    return with_checksum(block)
+
+
+def displayid_timing(width: int, height: int, h_blank: int, v_blank: int, clock: int,
+                     preferred: bool = False) -> bytes:
+    """DisplayID 20 字节详细时序；各字段按规范存储为 值 - 1，clock 为时钟单位数"""
+    def word(value):
+        return (value - 1).to_bytes(2, 'little')
+    return ((clock - 1).to_bytes(3, 'little') + bytes([0x80 if preferred else 0])
+            + word(width) + word(h_blank) + word(48) + word(32)
+            + word(height) + word(v_blank) + word(3) + word(5))
+
+
+def displayid_block(tag: int, timings) -> bytes:
+    payload = b''.join(timings)
+    section = bytes([tag, 0, len(payload)]) + payload
+    block = bytearray(BLOCK_SIZE)
+    block[0:5] = bytes([0x70, 0x20, len(section), 0x03, 0])
+    block[5:5 + len(section)] = section
+    return with_checksum(block)
+
+
+def uhd_type_i(preferred: bool = False) -> bytes:
+    """3840x2160@60，类型 I（时钟单位 10 kHz）"""
+    return displayid_timing(3840, 2160, 80, 62, 52_261, preferred)
+
+
+def uhd_type_vii(preferred: bool = False) -> bytes:
+    """3840x2160@60，类型 VII（时钟单位 1 kHz）"""
+    return displayid_timing(3840, 2160, 80, 62, 522_614, preferred)
@@ -0,0 +1,145 @@
+# build_extend_config / select_paths: 用合成的路径/模式数组构造扩展、单屏与旋转拓扑
+
+import pytest
+
+from monitor_core.backend import ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT
+from monitor_core.ccd import (DISPLAYCONFIG_MODE_INFO_TYPE_SOURCE, DISPLAYCONFIG_PATH_MODE_IDX_INVALID,
+                              CcdError, LayoutEntry, build_extend_config, is_active, select_paths,
+                              target_key)
+
+from ccd_buffers import PathSpec, Topology, device_name, find_mode
+
+DISPLAY1, DISPLAY2, DISPLAY3 = device_name(0), device_name(1), device_name(2)
+
+
+@pytest.fixture
+def topology():
+    """DISPLAY1（2560x1440，主）与 DISPLAY2（1920x1080）扩展，DISPLAY3 未启用；
+    含 QDC_ALL_PATHS 返回的交叉路径（DISPLAY3 -> 目标 10、DISPLAY1 -> 目标 12）"""
+    return Topology([
+        PathSpec(source=0, target=10, active=True, width=2560, height=1440, refresh=165),
+        PathSpec(source=1, target=11, active=True, x=2560),
+        PathSpec(source=2, target=10),
+        PathSpec(source=2, target=12),
+        PathSpec(source=0, target=12),
+        PathSpec(source=1, target=13, available=False),
+    ])
+
+
+def source_modes(paths, modes):
+    return [find_mode(modes, path.sourceInfo.modeInfoIdx) for path in paths]
+
+
+def test_select_paths_prefers_active_and_skips_used_targets(topology):
+    assert select_paths(topology.paths, topology.source_names, [DISPLAY1, DISPLAY3]) == [0, 3]
+
+
+def test_select_paths_reserves_active_targets_first(topology):
+    # DISPLAY3 排在前面也不能占用 DISPLAY1 仍在使用的目标 10
+    indices = select_paths(topology.paths, topology.source_names, [DISPLAY3, DISPLAY1])
+    assert indices == [3, 0]
+    assert len({topology.paths[i].targetInfo.id for i in indices}) == 2
+
+
+def test_select_paths_prefers_remembered_target(topology):
+    topology.paths[0].flags = 0
+    wanted = topology.target_names[target_key(topology.paths[4])][1]
+    assert select_paths(topology.paths, topology.source_names, [DISPLAY1],
+                        topology.target_names, [wanted.upper()]) == [4]
+    assert select_paths(topology.paths, topology.source_names, [DISPLAY1],
+                        topology.target_names, ['']) == [0]
+
+
+def test_select_paths_skips_unavailable_targets(topology):
+    topology.paths[1].flags = 0
+    topology.paths[1].targetInfo.targetAvailable = 0
+    with pytest.raises(CcdError):
+        select_paths(topology.paths, topology.source_names, [DISPLAY2])
+
+
+def test_select_paths_unknown_device(topology):
+    with pytest.raises(CcdError):
+        select_paths(topology.paths, topology.source_names, [device_name(7)])
+
+
+def test_extend_swaps_primary(topology):
+    paths, modes = build_extend_config(topology.paths, topology.modes, topology.source_names,
+                                       [LayoutEntry(DISPLAY2, None), LayoutEntry(DISPLAY1, None)])
+    assert [path.sourceInfo.id for path in paths] == [1, 0]
+    assert all(is_active(path) for path in paths)
+    assert len(modes) == 4
+    positions = [(m.sourceMode.position.x, m.sourceMode.position.y) for m in source_modes(paths, modes)]
+    assert positions == [(0, 0), (1920, 0)]
+    for path in paths:
+        source = modes[path.sourceInfo.modeInfoIdx]
+        target = modes[path.targetInfo.modeInfoIdx]
+        assert source.infoType == DISPLAYCONFIG_MODE_INFO_TYPE_SOURCE
+        assert source.id == path.sourceInfo.id
+        assert target.id == path.targetInfo.id
+
+
+def test_single_display(topology):
+    paths, modes = build_extend_config(topology.paths, topology.modes, topology.source_names,
+                                       [LayoutEntry(DISPLAY2, None)])
+    assert len(paths) == 1 and len(modes) == 2
+    assert paths[0].sourceInfo.id == 1 and paths[0].targetInfo.id == 11
+    mode = modes[paths[0].sourceInfo.modeInfoIdx].sourceMode
+    assert (mode.width, mode.height, mode.position.x, mode.position.y) == (1920, 1080, 0, 0)
+
+
+def test_extend_enables_inactive_display(topology):
+    paths, modes = build_extend_config(topology.paths, topology.modes, topology.source_names,
+                                       [LayoutEntry(DISPLAY1, None), LayoutEntry(DISPLAY3, None)])
+    new = paths[1]
+    assert is_active(new)
+    assert new.targetInfo.id == 12
+    assert new.sourceInfo.modeInfoIdx == DISPLAYCONFIG_PATH_MODE_IDX_INVALID
+    assert new.targetInfo.modeInfoIdx == DISPLAYCONFIG_PATH_MODE_IDX_INVALID
+    assert len(modes) == 2
+    # 原始数组不被修改
+    assert not is_active(topology.paths[3])
+
+
+def test_rotation_to_portrait_swaps_size(topology):
+    paths, modes = build_extend_config(topology.paths, topology.modes, topology.source_names,
+                                       [LayoutEntry(DISPLAY1, ORIENTATION_PORTRAIT),
+                                        LayoutEntry(DISPLAY2, None)])
+    assert paths[0].targetInfo.rotation == 2
+    assert paths[1].targetInfo.rotation == 1
+    first, second = source_modes(paths, modes)
+    assert (first.sourceMode.width, first.sourceMode.height) == (1440, 2560)
+    assert second.sourceMode.position.x == 1440
+
+
+def test_rotation_back_to_landscape(topology):
+    topology.paths[0].targetInfo.rotation = 2
+    source = topology.modes[0].sourceMode
+    source.width, source.height = 1440, 2560
+    paths, modes = build_extend_config(topology.paths, topology.modes, topology.source_names,
+                                       [LayoutEntry(DISPLAY1, ORIENTATION_LANDSCAPE)])
+    assert paths[0].targetInfo.rotation == 1
+    mode = modes[paths[0].sourceInfo.modeInfoIdx].sourceMode
+    assert (mode.width, mode.height) == (2560, 1440)
+
+
+def test_mode_applied_to_active_display(topology):
+    paths, modes = build_extend_config(topology.paths, topology.modes, topology.source_names,
+                                       [LayoutEntry(DISPLAY1, ORIENTATION_PORTRAIT, (1920, 1080, 144, 32))])
+    path = paths[0]
+    mode = modes[path.sourceInfo.modeInfoIdx].sourceMode
+    assert (mode.width, mode.height) == (1080, 1920)
+    # 刷新率由 DEVMODE 写入，路径上保留原值
+    assert path.targetInfo.refreshRate.Numerator == 165 * 1000
+    assert path.targetInfo.modeInfoIdx == DISPLAYCONFIG_PATH_MODE_IDX_INVALID
+    assert len(modes) == 1
+
+
+def test_mode_creates_source_mode_for_inactive_display(topology):
+    paths, modes = build_extend_config(topology.paths, topology.modes, topology.source_names,
+                                       [LayoutEntry(DISPLAY1, None),
+                                        LayoutEntry(DISPLAY3, None, (1920, 1080, 60, 32))])
+    mode = modes[paths[1].sourceInfo.modeInfoIdx]
+    assert mode.infoType == DISPLAYCONFIG_MODE_INFO_TYPE_SOURCE
+    assert mode.id == 2
+    assert (mode.sourceMode.width, mode.sourceMode.height) == (1920, 1080)
+    assert (mode.sourceMode.position.x, mode.sourceMode.position.y) == (2560, 0)
@@ -0,0 +1,68 @@
+# decode_display_config: 从录制的 QueryDisplayConfig 缓冲区解码快照
+
+from monitor_core.backend import gdi_device_name, monitor_number
+from monitor_core.ccd import decode_display_config
+
+from ccd_buffers import PathSpec, Topology
+
+
+def decode(topology):
+    return decode_display_config(*topology.buffers(), topology.source_names, topology.target_names)
+
+
+def test_extend_snapshot():
+    topology = Topology([
+        PathSpec(source=1, target=11, active=True, x=2560, name='DELL U2720Q'),
+        PathSpec(source=0, target=10, active=True, width=2560, height=1440, refresh=165),
+        PathSpec(source=2, target=12),
+    ])
+    first, second = decode(topology)
+    assert (first.id, first.device_name) == (1, '\\\\.\\DISPLAY1')
+    assert (first.width, first.height, first.frequency) == (2560, 1440, 165)
+    assert first.is_primary and (first.position_x, first.position_y) == (0, 0)
+    assert (second.id, second.position_x, second.is_primary) == (2, 2560, False)
+    assert second.target_name == 'DELL U2720Q'
+    assert second.device_path == '\\\\?\\DISPLAY#TGT11'
+
+
+def test_clone_paths_share_one_source():
+    topology = Topology([
+        PathSpec(source=0, target=10, active=True),
+        PathSpec(source=0, target=11, active=True),
+        PathSpec(source=1, target=12, active=True, x=1920),
+    ])
+    monitors = decode(topology)
+    assert [m.id for m in monitors] == [1, 2]
+    assert monitors[0].target_name == 'Monitor 10'
+
+
+def test_rotation_and_fractional_refresh():
+    topology = Topology([PathSpec(source=0, target=10, active=True, width=1080, height=1920, rotation=4)])
+    rate = topology.paths[0].targetInfo.refreshRate
+    rate.Numerator, rate.Denominator = 59940, 1000
+    (monitor,) = decode(topology)
+    assert monitor.orientation == 3
+    assert (monitor.width, monitor.height, monitor.frequency) == (1080, 1920, 59)
+
+
+def test_missing_source_mode_is_skipped():
+    topology = Topology([PathSpec(source=0, target=10, active=True),
+                         PathSpec(source=1, target=11, active=True, x=1920)])
+    topology.paths[1].sourceInfo.modeInfoIdx = 0xFFFFFFFF
+    assert [m.id for m in decode(topology)] == [1]
+
+
+def test_numbering_matches_gdi_device_names():
+    # 编号与 GDI 设备名一一对应，CCD 后端与 MultiMonitorTool 参数都由编号还原设备名
+    topology = Topology([PathSpec(source=4, target=10, active=True)])
+    (monitor,) = decode(topology)
+    assert monitor.id == 5
+    assert gdi_device_name(monitor.id) == monitor.device_name
+    assert monitor_number(monitor.device_name) == monitor.id
+
+
+def test_unnamed_source_falls_back_to_order():
+    topology = Topology([PathSpec(source=0, target=10, active=True)])
+    topology.source_names.clear()
+    (monitor,) = decode(topology)
+    assert (monitor.id, monitor.device_name) == (1, '')
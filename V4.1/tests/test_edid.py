@@ -0,0 +1,89 @@
+# parse_edid: 基本块、CTA-861 与 DisplayID 扩展块，以及原生模式的选择
+
+import pytest
+
+from monitor_core.edid import EdidError, Timing, parse_edid
+
+from edid_blobs import DTD_1080P60, base_block, cta_block, displayid_block, uhd_type_i, uhd_type_vii
+
+
+def test_base_block():
+    info = parse_edid(base_block(width=2560, height=1440, refresh=165))
+    assert (info.manufacturer, info.product_code, info.hardware_id) == ('DEL', 0x4123, 'DEL4123')
+    assert info.name == 'DELL U2720Q' and info.display_name == 'DELL U2720Q'
+    assert info.serial == '7XK1F23'
+    assert (info.year, info.version, info.width_cm, info.height_cm) == (2020, '1.4', 60, 34)
+    assert info.extensions == ()
+    (timing,) = info.timings
+    assert (timing.width, timing.height, round(timing.refresh)) == (2560, 1440, 165)
+    assert timing.preferred
+    assert info.native == info.preferred == timing
+
+
+def test_numeric_serial_without_text():
+    info = parse_edid(base_block(serial_text=''))
+    assert info.serial == str(0x3432_4C42)
+
+
+def test_cta_block():
+    # 0x90: 带原生标记的 VIC 16；VIC 4 与 97 不带原生标记（97 超出可标记范围）
+    blob = base_block(extensions=1) + cta_block([0x90, 4, 97])
+    info = parse_edid(blob)
+    assert info.extensions == (0x02,)
+    assert info.timings[1:] == (Timing(1920, 1080, 60.0, native=True), Timing(1920, 1080, 60.0))
+
+
+def test_displayid_type_i_and_vii():
+    blob = (base_block(extensions=2)
+            + displayid_block(0x03, [uhd_type_i(preferred=True)])
+            + displayid_block(0x22, [uhd_type_vii()]))
+    info = parse_edid(blob)
+    assert info.extensions == (0x70, 0x70)
+    type_i, type_vii = info.timings[1:]
+    assert (type_i.width, type_i.height, type_i.refresh, type_i.preferred) == (3840, 2160, 60.0, True)
+    assert (type_vii.width, type_vii.height, type_vii.refresh, type_vii.preferred) == (3840, 2160, 60.0, False)
+
+
+def test_native_is_preferred_timing_even_with_larger_modes():
+    # 电视类 EDID: 扩展块列出比面板更大的时序，原生模式仍是基本块的首选时序
+    blob = base_block(extensions=1) + displayid_block(0x03, [uhd_type_i()])
+    info = parse_edid(blob)
+    assert (info.native.width, info.native.height) == (1920, 1080)
+    assert info.native == info.preferred
+
+
+def test_native_falls_back_to_largest_timing():
+    blob = base_block(extensions=2, preferred=False) + cta_block([0x90]) + displayid_block(0x22, [uhd_type_vii()])
+    info = parse_edid(blob)
+    assert info.preferred is None
+    assert (info.native.width, info.native.height, info.native.refresh) == (3840, 2160, 60.0)
+
+
+def test_native_fallback_prefers_flagged_timing_at_same_size():
+    blob = base_block(extensions=1, preferred=False) + cta_block([0x90], dtds=(DTD_1080P60,))
+    native = parse_edid(blob).native
+    assert native.native
+
+
+def test_extension_with_bad_checksum_is_ignored():
+    extension = bytearray(cta_block([0x90]))
+    extension[-1] ^= 0xFF
+    info = parse_edid(base_block(extensions=1) + bytes(extension))
+    assert info.extensions == (0x02,)
+    assert len(info.timings) == 1
+
+
+@pytest.mark.parametrize('blob', [
+    b'\x00' * 64,
+    b'\x01' + base_block()[1:],
+])
+def test_invalid_base_block(blob):
+    with pytest.raises(EdidError):
+        parse_edid(blob)
+
+
+def test_base_checksum_error():
+    blob = bytearray(base_block())
+    blob[20] ^= 0x01
+    with pytest.raises(EdidError):
+        parse_edid(bytes(blob))
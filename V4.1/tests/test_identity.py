@@ -0,0 +1,29 @@
+# IdentityResolver: 持久键分配与 键/编号 -> 当前编号 的解析
+
+from monitor_core.identity import IdentityResolver
+
+
+def monitor(num, model):
+    return {'id': num, 'device_name': f'\\\\.\\DISPLAY{num}',
+            'device_path': f'\\\\?\\DISPLAY#{model}#5&{num}&0&UID{num}#{{e6f07b5f}}'}
+
+
+def test_resolve_checks_numbers_against_index():
+    resolver = IdentityResolver()
+    assert resolver.resolve(1) is None  # 尚未枚举
+    resolver.annotate([monitor(1, 'DEL4123'), monitor(2, 'SAM0B4A')])
+    assert resolver.resolve(1) == 1
+    assert resolver.resolve(2) == 2
+    assert resolver.resolve(9) is None
+    assert resolver.resolve('sam0b4a') == 2
+
+
+def test_disabled_monitor_keeps_last_number():
+    resolver = IdentityResolver()
+    resolver.annotate([monitor(1, 'DEL4123'), monitor(2, 'SAM0B4A')])
+    resolver.invalidate()
+    resolver.annotate([monitor(1, 'DEL4123')])
+    assert resolver.resolve(2) == 2
+    assert resolver.key_of(2) == 'SAM0B4A'
+    resolver.invalidate()
+    assert resolver.resolve(1) is None
@@ -0,0 +1,27 @@
+# 命令转发客户端: 只导入 ipc，不加载后端与控制器
+
+import os
+import subprocess
+import sys
+
+V41_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_core_modules(code):
+    script = f"import sys\n{code}\nprint(' '.join(sorted(m for m in sys.modules if m.startswith('monitor_core'))))"
+    output = subprocess.run([sys.executable, '-c', script], cwd=V41_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+def test_client_import_does_not_load_backend():
+    modules = loaded_core_modules("from monitor_core import ipc\nipc.parse_command_args(['--single', '1'])")
+    assert 'monitor_core.ipc' in modules
+    assert 'monitor_core.backend' not in modules
+    assert 'monitor_core.controller' not in modules
+
+
+def test_package_exports_load_on_first_use():
+    modules = loaded_core_modules("from monitor_core import SimulatedDisplayBackend")
+    assert 'monitor_core.backend' in modules
+    assert 'monitor_core.controller' not in modules
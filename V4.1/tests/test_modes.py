@@ -0,0 +1,57 @@
+# ModeTable / ModeTableCache: 查表与缓存（读取模式列表时不持有锁）
+
+from monitor_core.backend import DisplayBackend
+from monitor_core.modes import (MODE_POLICY_KEEP, MODE_POLICY_PREFERRED, ModePolicy, ModeTable,
+                                ModeTableCache, select_mode)
+
+MODES = [(2560, 1440, 165, 32), (2560, 1440, 60, 32), (1920, 1080, 144, 32),
+         (1920, 1080, 60, 32), (1920, 1080, 60, 16)]
+MONITOR = {'key': 'DEL4123', 'device_name': '\\\\.\\DISPLAY1', 'target_name': 'DELL', 'device_path': ''}
+
+
+class RecordingBackend(DisplayBackend):
+    def __init__(self, cache, on_read=None):
+        self.cache = cache
+        self.on_read = on_read
+        self.reads = 0
+        self.locked_during_read = []
+
+    def list_modes(self, device_name):
+        self.reads += 1
+        self.locked_during_read.append(self.cache.lock.locked())
+        if self.on_read is not None:
+            self.on_read()
+        return list(MODES)
+
+
+def test_table_lookups():
+    table = ModeTable(MODES)
+    assert table.resolutions() == ((2560, 1440), (1920, 1080))
+    assert table.refresh_rates(1920, 1080) == (144, 60)
+    assert table.find(1920, 1080, 60).bits_per_pixel == 32
+    assert table.best(2560, 1440).frequency == 165
+
+
+def test_select_mode_policies():
+    table = ModeTable(MODES)
+    assert select_mode(table, (2560, 1440), ModePolicy()).frequency == 165
+    assert select_mode(table, (2560, 1440), ModePolicy(MODE_POLICY_KEEP)) is None
+    preferred = ModePolicy(MODE_POLICY_PREFERRED, 1920, 1080, 0)
+    assert select_mode(table, (2560, 1440), preferred)[:3] == (1920, 1080, 144)
+
+
+def test_list_modes_runs_outside_lock_and_is_cached():
+    cache = ModeTableCache()
+    backend = RecordingBackend(cache)
+    table = cache.get(MONITOR, backend)
+    assert backend.locked_during_read == [False]
+    assert cache.get(MONITOR, backend) is table
+    assert cache.peek(MONITOR) is table
+    assert backend.reads == 1 and cache.generation == 1
+
+
+def test_table_read_across_invalidate_is_not_cached():
+    cache = ModeTableCache()
+    backend = RecordingBackend(cache, on_read=cache.invalidate)
+    assert len(cache.get(MONITOR, backend)) == len(MODES)
+    assert cache.peek(MONITOR) is None
@@ -0,0 +1,53 @@
+# monitorctl: 显示器参数校验与退出码（模拟后端）
+
+import pytest
+
+import monitorctl
+from monitor_core.backend import SimulatedDisplayBackend
+from monitor_core.controller import DisplayController
+from monitor_core.settle import SettleDetector
+
+
+def make_controller(settle_delay=0.0, timeout=5.0):
+    backend = SimulatedDisplayBackend(monitor_count=3, settle_delay=settle_delay)
+    return DisplayController(backend, SettleDetector(backend, timeout=timeout))
+
+
+def test_unknown_monitor_is_rejected_before_any_change():
+    controller = make_controller()
+    args = monitorctl.parse_args(['--backend', 'simulated', 'single', '9'])
+    with pytest.raises(ValueError):
+        monitorctl.check_monitors(controller, args)
+    assert len(controller.enumerate()) == 3
+
+
+def test_apply_checks_every_monitor_argument():
+    controller = make_controller()
+    args = monitorctl.parse_args(['--backend', 'simulated', 'apply', '--only', '1', '2', '--rotate', '7=90'])
+    assert monitorctl.monitor_refs(args) == [1, 2, 7]
+    with pytest.raises(ValueError):
+        monitorctl.check_monitors(controller, args)
+
+
+def test_single_exit_codes():
+    controller = make_controller()
+    args = monitorctl.parse_args(['--backend', 'simulated', 'single', '2'])
+    monitorctl.check_monitors(controller, args)
+    _, code = monitorctl.run_command(controller, args)
+    assert code == monitorctl.EXIT_OK
+    assert [m['id'] for m in controller.enumerate()] == [2]
+
+
+def test_settle_timeout_exit_code():
+    controller = make_controller(settle_delay=0.5, timeout=0.05)
+    args = monitorctl.parse_args(['--backend', 'simulated', 'single', '2'])
+    _, code = monitorctl.run_command(controller, args)
+    assert code == monitorctl.EXIT_SETTLE_TIMEOUT
+
+
+def test_main_unknown_monitor(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(monitorctl, 'SETTLE_HISTORY_FILE', str(tmp_path / 'settle_history.json'))
+    monkeypatch.setattr(monitorctl, 'IDENTITY_FILE', str(tmp_path / 'monitor_identity.json'))
+    monkeypatch.setattr(monitorctl, 'NATIVE_MODES_FILE', str(tmp_path / 'native_modes.json'))
+    assert monitorctl.main(['--backend', 'simulated', 'single', '9']) == monitorctl.EXIT_USAGE
+    assert '9' in capsys.readouterr().err
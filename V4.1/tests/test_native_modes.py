@@ -0,0 +1,38 @@
+# NativeModeCache: 每块面板只获取一次原生模式，强制刷新时按持久键重新获取
+
+import json
+
+from monitor_core.backend import DisplayBackend
+from monitor_core.native_modes import NativeModeCache
+
+MONITOR = {'key': 'DEL4123', 'device_name': '\\\\.\\DISPLAY1', 'device_path': '\\\\?\\DISPLAY#DEL4123#5&1&0'}
+
+
+class PreferredModeBackend(DisplayBackend):
+    def __init__(self):
+        self.calls = 0
+
+    def preferred_mode(self, device_name):
+        self.calls += 1
+        return 2560, 1440, 165
+
+
+def test_native_mode_fetched_once_per_panel():
+    backend = PreferredModeBackend()
+    cache = NativeModeCache()
+    first = cache.attach([dict(MONITOR)], backend)[0]
+    assert (first['native_width'], first['native_height'], first['native_frequency']) == (2560, 1440, 165)
+    cache.attach([dict(MONITOR)], backend)
+    assert backend.calls == 1
+
+
+def test_invalidate_refetches_and_persists(tmp_path):
+    path = tmp_path / 'native_modes.json'
+    backend = PreferredModeBackend()
+    cache = NativeModeCache(str(path))
+    cache.attach([dict(MONITOR)], backend)
+    cache.invalidate([MONITOR['key'], 'UNKNOWN'])
+    assert json.loads(path.read_text(encoding='utf-8'))['modes'] == {}
+    cache.attach([dict(MONITOR)], backend)
+    assert backend.calls == 2
+    assert MONITOR['key'] in NativeModeCache(str(path)).modes
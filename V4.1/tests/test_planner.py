@@ -0,0 +1,128 @@
+# plan_topology: 最小差异规划（无操作、仅主显示器、仅方向、先启用再旋转）
+
+from monitor_core.backend import ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT, SimulatedDisplayBackend
+from monitor_core.controller import DisplayController
+from monitor_core.modes import MODE_POLICY_PREFERRED, ModePolicy, ModeTable, select_mode
+from monitor_core.planner import execute_plan, plan_topology
+from monitor_core.settle import SettleDetector
+
+
+def monitor(num, x, width=1920, height=1080, frequency=60, orientation=ORIENTATION_LANDSCAPE):
+    return {'id': num, 'device_name': f'\\\\.\\DISPLAY{num}', 'width': width, 'height': height,
+            'frequency': frequency, 'orientation': orientation, 'position_x': x, 'position_y': 0,
+            'is_primary': x == 0, 'target_name': '', 'device_path': ''}
+
+
+EXTENDED = [monitor(1, 0, 2560, 1440, 165), monitor(2, 2560)]
+
+
+def actions(plan):
+    return [step.action for step in plan.steps]
+
+
+def test_noop_when_target_is_current():
+    plan = plan_topology(EXTENDED, [1, 2], 1, {1: ORIENTATION_LANDSCAPE, 2: ORIENTATION_LANDSCAPE})
+    assert plan.is_noop
+    assert {'set_topology', 'display_switch', 'apply_pending'} <= set(plan.skipped)
+
+
+def test_primary_only():
+    plan = plan_topology(EXTENDED, [2, 1], 2)
+    assert plan.steps[0].action == 'set_topology'
+    assert plan.steps[0].args == ([], [], 2)
+    assert actions(plan) == ['set_topology']
+
+
+def test_orientation_only():
+    plan = plan_topology(EXTENDED, [1, 2], 1, {2: ORIENTATION_PORTRAIT})
+    assert actions(plan) == ['set_orientation', 'apply_pending']
+    assert plan.steps[0].args == ('\\\\.\\DISPLAY2', ORIENTATION_PORTRAIT, 1080, 1920, 60)
+
+
+def test_orientation_uses_native_size_when_current_mode_is_scaled():
+    current = [monitor(1, 0, 1920, 1080, 60), monitor(2, 1920)]
+    current[0].update(native_width=2560, native_height=1440, native_frequency=165)
+    plan = plan_topology(current, [1, 2], 1, {1: ORIENTATION_PORTRAIT})
+    assert plan.steps[0].args == ('\\\\.\\DISPLAY1', ORIENTATION_PORTRAIT, 1440, 2560, 165)
+
+
+def test_single_disables_others():
+    plan = plan_topology(EXTENDED, [2], 2)
+    assert actions(plan) == ['set_topology']
+    assert plan.steps[0].args == ([2], [1], 2)
+
+
+def test_enable_then_rotate():
+    single = [monitor(1, 0, 2560, 1440, 165)]
+    plan = plan_topology(single, [1, 2], 1, {1: ORIENTATION_LANDSCAPE, 2: ORIENTATION_PORTRAIT})
+    assert actions(plan) == ['set_topology', 'display_switch']
+    assert plan.unresolved == [2]
+    assert not plan.is_noop
+    # 启用生效后重新规划: 只剩新显示器的旋转
+    replan = plan_topology(EXTENDED, [1, 2], 1, {1: ORIENTATION_LANDSCAPE, 2: ORIENTATION_PORTRAIT})
+    assert actions(replan) == ['set_orientation', 'apply_pending']
+    assert replan.unresolved == []
+
+
+def test_atomic_folds_everything_into_one_step():
+    single = [monitor(1, 0, 2560, 1440, 165)]
+    plan = plan_topology(single, [1, 2], 1, {2: ORIENTATION_PORTRAIT}, atomic=True)
+    assert actions(plan) == ['apply_topology']
+    assert plan.steps[0].args == ([1, 2], 1, {2: ORIENTATION_PORTRAIT}, {})
+    assert plan.unresolved == []
+
+
+MODES = ModeTable([(2560, 1440, 165, 32), (2560, 1440, 60, 32), (1920, 1080, 144, 32), (1920, 1080, 60, 32)])
+
+
+def test_selected_mode_becomes_set_display_mode_step():
+    mode = select_mode(MODES, (2560, 1440), ModePolicy(MODE_POLICY_PREFERRED, 1920, 1080, 0))
+    plan = plan_topology(EXTENDED, [1, 2], 1, modes={1: mode})
+    assert actions(plan) == ['set_display_mode', 'apply_pending']
+    assert plan.steps[0].args == ('\\\\.\\DISPLAY1', 1920, 1080, 144, 32)
+
+
+def test_best_mode_already_current_is_skipped():
+    mode = select_mode(MODES, (2560, 1440), ModePolicy())
+    plan = plan_topology(EXTENDED, [1, 2], 1, modes={1: mode})
+    assert plan.is_noop
+    assert 'set_display_mode:1' in plan.skipped
+
+
+def test_mode_follows_current_orientation():
+    current = [monitor(1, 0, 1440, 2560, 165, ORIENTATION_PORTRAIT), monitor(2, 1440)]
+    mode = select_mode(MODES, (2560, 1440), ModePolicy(MODE_POLICY_PREFERRED, 2560, 1440, 60))
+    plan = plan_topology(current, [1, 2], 1, modes={1: mode})
+    assert plan.steps[0].args == ('\\\\.\\DISPLAY1', 1440, 2560, 60, 32)
+
+
+def test_rotation_and_mode_share_one_devmode():
+    mode = select_mode(MODES, (2560, 1440), ModePolicy(MODE_POLICY_PREFERRED, 1920, 1080, 60))
+    plan = plan_topology(EXTENDED, [1, 2], 1, {1: ORIENTATION_PORTRAIT}, modes={1: mode})
+    assert actions(plan) == ['set_orientation', 'apply_pending']
+    assert plan.steps[0].args == ('\\\\.\\DISPLAY1', ORIENTATION_PORTRAIT, 1080, 1920, 60)
+
+
+def test_set_display_mode_step_executes_on_backend():
+    backend = SimulatedDisplayBackend(monitor_count=2)
+    table = ModeTable(backend.list_modes('\\\\.\\DISPLAY1'))
+    mode = select_mode(table, (2560, 1440), ModePolicy(MODE_POLICY_PREFERRED, 1920, 1080, 0))
+    plan = plan_topology(backend.enumerate_monitors(), [1, 2], 1, modes={1: mode})
+    assert execute_plan(backend, plan)
+    first = next(m for m in backend.enumerate_monitors() if m['id'] == 1)
+    assert (first['width'], first['height'], first['frequency']) == mode[:3]
+    assert plan_topology(backend.enumerate_monitors(), [1, 2], 1, modes={1: mode}).is_noop
+
+
+def test_enable_then_rotate_waits_for_async_enable():
+    # 启用异步生效时，须等启用可见后再重新规划，不重复执行拓扑切换
+    backend = SimulatedDisplayBackend(monitor_count=2, settle_delay=0.1)
+    controller = DisplayController(backend, SettleDetector(backend, timeout=2.0))
+    controller.single_display(1)
+    backend.reset_stats()
+    result = controller.extend_pair(1, 2, ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT)
+    assert result.settled
+    assert backend.stats['subprocess_spawns'] == 2
+    monitors = {m['id']: m for m in backend.enumerate_monitors()}
+    assert sorted(monitors) == [1, 2]
+    assert monitors[2]['orientation'] == ORIENTATION_PORTRAIT
@@ -0,0 +1,44 @@
+# SettleDetector: 生效判定与本机生效耗时学习
+
+from monitor_core.backend import SimulatedDisplayBackend
+from monitor_core.settle import SettleDetector, expect_topology
+
+SETTLE_DELAY = 0.1
+
+
+def switch(backend, detector, extend):
+    if extend:
+        backend.set_topology([2], [], 1)
+    else:
+        backend.set_topology([], [2], 1)
+    return detector.wait('switch', expect_topology([1, 2] if extend else [1], 1))
+
+
+def test_learned_settle_tracks_first_match():
+    backend = SimulatedDisplayBackend(monitor_count=2, settle_delay=SETTLE_DELAY)
+    detector = SettleDetector(backend, timeout=2.0)
+    result = switch(backend, detector, extend=False)
+    assert result.settled
+    # 记录的是首次符合目标的时刻，不含随后的确认轮询
+    assert SETTLE_DELAY <= detector.typical_settle('switch') < result.elapsed
+
+
+def test_learned_settle_does_not_drift_upward():
+    # 生效较慢时退避间隔较大，若把预等待后的确认轮询计入耗时，中位数会逐次上漂
+    delay = 0.3
+    backend = SimulatedDisplayBackend(monitor_count=2, settle_delay=delay)
+    detector = SettleDetector(backend, timeout=2.0)
+    learned = []
+    for i in range(8):
+        assert switch(backend, detector, extend=bool(i % 2)).settled
+        learned.append(detector.typical_settle('switch'))
+    assert max(learned) <= learned[0] + 0.01
+    assert learned[-1] < delay + 0.02
+
+
+def test_timeout_is_not_learned():
+    backend = SimulatedDisplayBackend(monitor_count=2)
+    detector = SettleDetector(backend, timeout=0.05)
+    result = detector.wait('switch', expect_topology([1], 1))
+    assert not result.settled
+    assert detector.typical_settle('switch') is None
@@ -0,0 +1,173 @@
+# 后端抽象与模拟后端上的切换: 断言生效后的枚举状态、API 调用次数与外部进程次数
+
+import time
+
+import pytest
+
+from monitor_core.backend import (ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT, DisplayBackend,
+                                  SimulatedDisplayBackend, create_display_backend, topology_digest)
+from monitor_core.controller import DisplayController
+from monitor_core.settle import SettleDetector
+
+
+def active(backend):
+    return [m['id'] for m in backend.enumerate_monitors()]
+
+
+def by_id(backend):
+    return {m['id']: m for m in backend.enumerate_monitors()}
+
+
+def make_controller(backend):
+    return DisplayController(backend, SettleDetector(backend, timeout=2.0))
+
+
+def test_base_backend_interface():
+    backend = DisplayBackend()
+    assert backend.read_edid('x') is None
+    assert backend.list_modes('x') == []
+    with pytest.raises(NotImplementedError):
+        backend.enumerate_monitors()
+    with pytest.raises(NotImplementedError):
+        backend.apply_topology([1], 1, {})
+
+
+def test_create_simulated_backend(monkeypatch):
+    monkeypatch.setenv('MONITOR_MANAGER_SIM_MONITORS', '3')
+    backend = create_display_backend('simulated')
+    assert isinstance(backend, SimulatedDisplayBackend)
+    assert active(backend) == [1, 2, 3]
+
+
+def test_initial_enumeration():
+    backend = SimulatedDisplayBackend(monitor_count=2)
+    monitors = backend.enumerate_monitors()
+    assert [(m['id'], m['width'], m['height'], m['frequency']) for m in monitors] == [
+        (1, 2560, 1440, 165), (2, 1920, 1080, 60)]
+    assert [(m['position_x'], m['is_primary']) for m in monitors] == [(0, True), (2560, False)]
+    assert backend.stats == {'subprocess_spawns': 0, 'api_calls': 1}
+
+
+def test_set_topology_spawns_once():
+    backend = SimulatedDisplayBackend(monitor_count=3)
+    backend.set_topology([2], [1, 3], 2)
+    assert backend.stats['subprocess_spawns'] == 1
+    (monitor,) = backend.enumerate_monitors()
+    assert (monitor['id'], monitor['is_primary'], monitor['position_x']) == (2, True, 0)
+
+
+def test_orientation_is_deferred_until_apply_pending():
+    backend = SimulatedDisplayBackend(monitor_count=2)
+    assert backend.set_orientation('\\\\.\\DISPLAY2', ORIENTATION_PORTRAIT, 1080, 1920, 60)
+    assert by_id(backend)[2]['orientation'] == ORIENTATION_LANDSCAPE
+    backend.apply_pending()
+    monitor = by_id(backend)[2]
+    assert (monitor['orientation'], monitor['width'], monitor['height']) == (ORIENTATION_PORTRAIT, 1080, 1920)
+    assert backend.stats['subprocess_spawns'] == 0
+
+
+def test_set_display_mode_rejects_unsupported_modes():
+    backend = SimulatedDisplayBackend(monitor_count=1)
+    assert not backend.set_display_mode('\\\\.\\DISPLAY1', 1920, 1080, 240)
+    assert backend.set_display_mode('\\\\.\\DISPLAY1', 1920, 1080, 144)
+    backend.apply_pending()
+    monitor = by_id(backend)[1]
+    assert (monitor['width'], monitor['height'], monitor['frequency']) == (1920, 1080, 144)
+
+
+def test_display_switch_clone_and_extend():
+    backend = SimulatedDisplayBackend(monitor_count=2)
+    backend.display_switch('/clone')
+    assert {m['position_x'] for m in backend.enumerate_monitors()} == {0}
+    backend.display_switch('/extend')
+    assert [m['position_x'] for m in backend.enumerate_monitors()] == [0, 2560]
+    assert backend.stats['subprocess_spawns'] == 2
+
+
+def test_atomic_topology_is_one_api_call():
+    backend = SimulatedDisplayBackend(monitor_count=3, atomic=True)
+    backend.reset_stats()
+    backend.apply_topology([2, 3], 3, {2: ORIENTATION_PORTRAIT})
+    assert backend.stats == {'subprocess_spawns': 0, 'api_calls': 1}
+    monitors = by_id(backend)
+    assert sorted(monitors) == [2, 3]
+    assert monitors[3]['is_primary'] and monitors[2]['orientation'] == ORIENTATION_PORTRAIT
+
+
+def test_settle_delay_hides_changes_until_applied():
+    backend = SimulatedDisplayBackend(monitor_count=2, settle_delay=0.05)
+    digest = topology_digest(backend.enumerate_monitors())
+    backend.set_topology([1], [2], 1)
+    assert not backend.is_settled()
+    assert topology_digest(backend.enumerate_monitors()) == digest
+    time.sleep(0.08)
+    assert backend.is_settled()
+    assert active(backend) == [1]
+
+
+def test_hotplug_notifies_listeners():
+    backend = SimulatedDisplayBackend(monitor_count=2)
+    reasons = []
+    backend.add_change_listener(reasons.append)
+    backend.hotplug(1, False)
+    assert reasons == ['WM_DEVICECHANGE']
+    (monitor,) = backend.enumerate_monitors()
+    assert monitor['id'] == 2 and monitor['is_primary']
+
+
+def test_list_modes_counts_one_call_per_mode():
+    backend = SimulatedDisplayBackend(monitor_count=1)
+    backend.reset_stats()
+    modes = backend.list_modes('\\\\.\\DISPLAY1')
+    assert (2560, 1440, 165, 32) in modes
+    assert backend.stats['api_calls'] == len(modes) + 1
+
+
+# --- 控制器上的切换 ---
+def test_single_display():
+    backend = SimulatedDisplayBackend(monitor_count=3)
+    controller = make_controller(backend)
+    backend.reset_stats()
+    result = controller.single_display(2)
+    assert result.settled
+    assert active(backend) == [2]
+    assert backend.stats['subprocess_spawns'] == 1
+    backend.reset_stats()
+    assert controller.single_display(2) is None  # 已满足，不执行任何步骤
+    assert backend.stats['subprocess_spawns'] == 0
+
+
+def test_extend_pair_with_rotation():
+    backend = SimulatedDisplayBackend(monitor_count=3)
+    controller = make_controller(backend)
+    controller.single_display(1)
+    backend.reset_stats()
+    result = controller.extend_pair(2, 1, ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT)
+    assert result.settled
+    monitors = by_id(backend)
+    assert sorted(monitors) == [1, 2]
+    assert monitors[2]['is_primary']
+    assert monitors[1]['orientation'] == ORIENTATION_PORTRAIT
+    assert (monitors[1]['width'], monitors[1]['height']) == (1440, 2560)
+    # set_topology 与 DisplaySwitch /extend 各一次外部进程；旋转为进程内调用
+    assert backend.stats['subprocess_spawns'] == 2
+
+
+def test_rotation_only_spawns_nothing():
+    backend = SimulatedDisplayBackend(monitor_count=2)
+    controller = make_controller(backend)
+    backend.reset_stats()
+    controller.extend_pair(1, 2, ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT)
+    assert backend.stats['subprocess_spawns'] == 0
+    assert by_id(backend)[2]['orientation'] == ORIENTATION_PORTRAIT
+
+
+def test_atomic_extend_pair_is_one_call():
+    backend = SimulatedDisplayBackend(monitor_count=3, atomic=True)
+    controller = make_controller(backend)
+    controller.single_display(3)
+    backend.reset_stats()
+    controller.extend_pair(1, 2, ORIENTATION_LANDSCAPE, ORIENTATION_PORTRAIT)
+    assert backend.stats['subprocess_spawns'] == 0
+    monitors = by_id(backend)
+    assert sorted(monitors) == [1, 2] and monitors[2]['orientation'] == ORIENTATION_PORTRAIT
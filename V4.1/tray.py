@@ -0,0 +1,189 @@
+# 系统托盘图标与菜单
+# 由 main.py 在主窗口创建后才导入: pystray 与 PIL 不计入主模块的导入时间
+
+import os
+import logging
+from collections import OrderedDict
+from threading import Thread
+from typing import Callable, Dict, List, Optional
+
+import pystray
+from PIL import Image, ImageDraw, ImageFont
+
+from monitor_core.orientation import oriented_size
+from monitor_core.planner import topology_mode, primary_monitor_id
+
+# 托盘菜单缓存的拓扑数量（来回切换几种常用布局时无需重建菜单）
+TRAY_MENU_CACHE_LIMIT = 8
+
+MODE_NAMES = {
+    'none': "无显示器",
+    'single': "单显示器",
+    'extend': "扩展模式",
+    'clone': "复制模式",
+    'mixed': "混合模式",
+}
+
+
+def create_dummy_icon(width=64, height=64):
+    image = Image.new('RGB', (width, height), color='dodgerblue')
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("msyh.ttc", 40)
+    except IOError:
+        font = ImageFont.load_default()
+    draw.text((15, 5), "M", fill="white", font=font)
+    return image
+
+
+class TrayMenuCache:
+    """按 (拓扑摘要, 模式表 generation) 缓存托盘菜单
+
+    菜单项的回调只捕获显示器的持久键（见 identity.py）而不捕获快照或枚举编号，
+    执行时再解析为当前编号，同一缓存键下构建的菜单可以直接复用；
+    快照未变化的刷新不重建菜单，也不触发 pystray 的菜单更新。
+    显示模式子菜单来自已缓存的模式表，模式表重新读取后（generation 变化）才重建
+    """
+
+    def __init__(self, main_window, limit: int = TRAY_MENU_CACHE_LIMIT):
+        self.main_window = main_window
+        self.limit = limit
+        self.menus = OrderedDict()
+
+    def menu_for(self, monitors: List[Dict], digest: str) -> pystray.Menu:
+        key = (digest, self.main_window.controller.mode_tables.generation)
+        menu = self.menus.get(key)
+        if menu is not None:
+            self.menus.move_to_end(key)
+            return menu
+        menu = self.build(monitors)
+        self.menus[key] = menu
+        while len(self.menus) > self.limit:
+            self.menus.popitem(last=False)
+        logging.info(f"Tray menu built for topology {digest}")
+        return menu
+
+    def build(self, monitors: List[Dict]) -> pystray.Menu:
+        main_window = self.main_window
+        mode = topology_mode(monitors)
+        primary_id = primary_monitor_id(monitors)
+
+        def on_show_window(icon, item):
+            main_window.toggle_window_signal.emit()
+
+        def on_quit(icon, item):
+            icon.stop()
+            main_window.quit_app_signal.emit()
+
+        def on_extend(icon, item):
+            main_window.switch_mode_signal.emit('/extend')
+
+        def on_clone(icon, item):
+            main_window.switch_mode_signal.emit('/clone')
+
+        def make_handler(monitor_key):
+            def handler(icon, item):
+                main_window.request_single_display(monitor_key)
+            return handler
+
+        def make_mode_handler(monitor_key, width, height, frequency):
+            def handler(icon, item):
+                main_window.request_set_mode(monitor_key, width, height, frequency)
+            return handler
+
+        def checked(value):
+            return lambda item: value
+
+        def mode_menu(monitor) -> Optional[pystray.Menu]:
+            """当前分辨率的各刷新率 + 各分辨率（最高刷新率）；模式表尚未读取时为 None"""
+            table = main_window.controller.mode_tables.peek(monitor)
+            if table is None or not len(table):
+                return None
+            key = monitor['key']
+            current = oriented_size(monitor['width'], monitor['height'], monitor['orientation'])
+            items = [pystray.MenuItem(f'{frequency}Hz', make_mode_handler(key, *current, frequency),
+                                      checked=checked(frequency == monitor['frequency']), radio=True)
+                     for frequency in table.refresh_rates(*current)]
+            if items:
+                items.append(pystray.Menu.SEPARATOR)
+            for width, height in table.resolutions():
+                best = table.best(width, height)
+                items.append(pystray.MenuItem(
+                    f'{width}x{height} @ {best.frequency}Hz',
+                    make_mode_handler(key, width, height, best.frequency),
+                    checked=checked((width, height) == current), radio=True))
+            return pystray.Menu(*items)
+
+        if not main_window.monitors_loaded:
+            status = "正在检测显示器…"
+        else:
+            status = f"当前: {MODE_NAMES[mode]}"
+            if primary_id is not None:
+                status += f" | 主显示器: 显示器{primary_id}"
+
+        menu_items = [
+            pystray.MenuItem('显示主窗口', on_show_window, default=True),
+            pystray.MenuItem(status, None, enabled=False),
+            pystray.Menu.SEPARATOR,
+            pystray.MenuItem('扩展模式(所有)', on_extend, checked=checked(mode == 'extend')),
+            pystray.MenuItem('复制模式(所有)', on_clone, checked=checked(mode == 'clone')),
+            pystray.Menu.SEPARATOR,
+        ]
+
+        if monitors:
+            for monitor in monitors:
+                menu_items.append(pystray.MenuItem(
+                    f'仅 {monitor["description"]}',
+                    make_handler(monitor['key']),
+                    checked=checked(mode == 'single' and monitor['id'] == primary_id)
+                ))
+            menu_items.append(pystray.Menu.SEPARATOR)
+            mode_items = [pystray.MenuItem(f'显示器{monitor["id"]} 分辨率/刷新率', submenu)
+                          for monitor, submenu in ((m, mode_menu(m)) for m in monitors)
+                          if submenu is not None]
+            if mode_items:
+                menu_items.extend(mode_items)
+                menu_items.append(pystray.Menu.SEPARATOR)
+
+        menu_items.append(pystray.MenuItem('退出', on_quit))
+        return pystray.Menu(*menu_items)
+
+
+def setup_tray_icon(main_window, on_ready: Optional[Callable[[], None]] = None):
+    """设置系统托盘图标；on_ready 在图标显示后于托盘线程中调用"""
+    icon_path = 'icon.png'
+    if os.path.exists(icon_path):
+        try:
+            icon_image = Image.open(icon_path)
+        except:
+            icon_image = create_dummy_icon()
+    else:
+        icon_image = create_dummy_icon()
+
+    menu_cache = TrayMenuCache(main_window)
+    tray_icon = pystray.Icon(
+        "monitor_manager", 
+        icon_image, 
+        "显示器切换工具 V7.0", 
+        menu_cache.menu_for(main_window.monitors, main_window.monitors_digest)
+    )
+
+    def sync_menu():
+        # 在 GUI 线程中执行；摘要未变化时取回同一菜单对象，直接跳过
+        menu = menu_cache.menu_for(main_window.monitors, main_window.monitors_digest)
+        if menu is not tray_icon.menu:
+            tray_icon.menu = menu
+
+    main_window.monitors_updated.connect(sync_menu)
+
+    def on_setup(icon):
+        icon.visible = True
+        if on_ready is not None:
+            on_ready()
+
+    def run_tray():
+        tray_icon.run(setup=on_setup)
+
+    tray_thread = Thread(target=run_tray, daemon=True)
+    tray_thread.start()
+    return tray_icon